@@ -1,9 +1,18 @@
-from django.views.generic.base import TemplateView
+from django.utils.decorators import method_decorator
 
+from core.decorators import (
+    conditional_page, skip_anonymous_session, started_at
+)
+from core.views import PrerenderedTemplateView
 
-class AuthorStaticPage(TemplateView):
+
+@method_decorator(
+    (skip_anonymous_session, conditional_page(started_at)), name='dispatch')
+class AuthorStaticPage(PrerenderedTemplateView):
     template_name = 'about/author.html'
 
 
-class TechStaticPage(TemplateView):
+@method_decorator(
+    (skip_anonymous_session, conditional_page(started_at)), name='dispatch')
+class TechStaticPage(PrerenderedTemplateView):
     template_name = 'about/tech.html'
@@ -0,0 +1,28 @@
+from django.conf import settings
+from django.contrib.auth.backends import ModelBackend
+from django.core.cache import cache
+
+
+USER_KEY = 'user:{}'
+
+
+class CachedModelBackend(ModelBackend):
+    """ModelBackend that keeps session users in the cache.
+
+    Saves the auth_user lookup performed by AuthenticationMiddleware
+    on every authenticated request.
+    """
+
+    def get_user(self, user_id):
+        key = USER_KEY.format(user_id)
+        user = cache.get(key)
+        if user is None:
+            user = super().get_user(user_id)
+            if user is None:
+                return None
+            cache.set(key, user, settings.USER_CACHE_TIMEOUT)
+        return user if self.user_can_authenticate(user) else None
+
+
+def invalidate_user(user_id: int) -> None:
+    cache.delete(USER_KEY.format(user_id))
@@ -0,0 +1,134 @@
+"""cache_page with single-flight refresh and stale-while-revalidate.
+
+Django's cache_page drops an expired page for everybody at once, so all
+the requests arriving at that moment render it again. Here a page is
+kept `stale` seconds past its freshness window: the first request after
+expiry takes a lock in the cache and renders the page, the others get
+the stale copy meanwhile. With a shared cache backend the lock is shared
+by the whole cluster. Requests for a page that is not cached at all wait
+for the request holding the lock instead of rendering it too, until the
+page shows up or the lock is released without it, then one of them takes
+the lock over. Requests carrying a session get private pages, they never
+take or wait on the lock.
+"""
+import hashlib
+import time
+from functools import wraps
+from typing import Optional, Tuple
+
+from django.conf import settings
+from django.core.cache import caches
+from django.utils.cache import (
+    get_cache_key, get_max_age, has_vary_header, learn_cache_key,
+    patch_response_headers
+)
+
+
+def get_lock_key(request, key_prefix: str, cache_key: Optional[str]) -> str:
+    """Lock of the cached page, or of its URL while the key is unknown."""
+    if cache_key is None:
+        url = hashlib.md5(request.build_absolute_uri().encode()).hexdigest()
+        cache_key = f'{key_prefix}.{url}'
+    return f'single_flight.{cache_key}'
+
+
+def should_cache(request, response) -> bool:
+    """The rules of Django's UpdateCacheMiddleware, 304s excluded."""
+    if response.streaming or response.status_code != 200:
+        return False
+    if ('private' in response.get('Cache-Control', ())
+            or get_max_age(response) == 0):
+        return False
+    return not (not request.COOKIES and response.cookies
+                and has_vary_header(response, 'Cookie'))
+
+
+def get_entry(cache, request, key_prefix: str):
+    """Return the cache key of the page and its cached entry."""
+    cache_key = get_cache_key(request, key_prefix, 'GET', cache=cache)
+    if cache_key is None:
+        return None, None
+    return cache_key, cache.get(cache_key)
+
+
+def has_session(request) -> bool:
+    return settings.SESSION_COOKIE_NAME in request.COOKIES
+
+
+def wait_for_entry(cache, request, key_prefix: str,
+                   lock_key: str) -> Tuple[Optional[dict], bool]:
+    """Poll for the page rendered by the request holding the lock.
+
+    Return the entry, or whether the lock was taken over after its holder
+    released it without caching the page.
+    """
+    deadline = time.monotonic() + settings.CACHE_LOCK_WAIT
+    while time.monotonic() < deadline:
+        time.sleep(settings.CACHE_LOCK_POLL)
+        _, entry = get_entry(cache, request, key_prefix)
+        if entry is not None:
+            return entry, False
+        if cache.add(lock_key, True, settings.CACHE_LOCK_TIMEOUT):
+            return None, True
+    return None, False
+
+
+def store(cache, request, response, key_prefix: str, fresh: int,
+          stale: int) -> None:
+    patch_response_headers(response, fresh)
+    timeout = fresh + stale
+    cache_key = learn_cache_key(
+        request, response, timeout, key_prefix, cache=cache)
+    cache.set(cache_key, {
+        'response': response,
+        'fresh_until': time.time() + fresh,
+    }, timeout)
+
+
+def render(view_func, cache, request, args, kwargs, key_prefix: str,
+           fresh: int, stale: int):
+    """Call the view and cache its response if it may be shared."""
+    response = view_func(request, *args, **kwargs)
+    if should_cache(request, response):
+        store(cache, request, response, key_prefix, fresh, stale)
+    return response
+
+
+def cache_page(fresh: int, stale: Optional[int] = None, key_prefix: str = '',
+               cache_alias: Optional[str] = None):
+    """Cache the view like django.views.decorators.cache.cache_page.
+
+    `fresh` is the freshness window in seconds, `stale` how long an
+    expired page may still be served while it is being refreshed,
+    CACHE_STALE_SECONDS by default.
+    """
+    def decorator(view_func):
+        @wraps(view_func)
+        def wrapped_view(request, *args, **kwargs):
+            if request.method != 'GET':
+                return view_func(request, *args, **kwargs)
+            cache = caches[cache_alias or settings.CACHE_MIDDLEWARE_ALIAS]
+            render_args = (
+                view_func, cache, request, args, kwargs, key_prefix, fresh,
+                settings.CACHE_STALE_SECONDS if stale is None else stale)
+            cache_key, entry = get_entry(cache, request, key_prefix)
+            if entry is not None and entry['fresh_until'] > time.time():
+                return entry['response']
+            if has_session(request):
+                return render(*render_args)
+
+            lock_key = get_lock_key(request, key_prefix, cache_key)
+            locked = cache.add(lock_key, True, settings.CACHE_LOCK_TIMEOUT)
+            if not locked and entry is None:
+                entry, locked = wait_for_entry(
+                    cache, request, key_prefix, lock_key)
+            if not locked:
+                if entry is not None:
+                    return entry['response']
+                return view_func(request, *args, **kwargs)
+            try:
+                return render(*render_args)
+            finally:
+                cache.delete(lock_key)
+        return wrapped_view
+    return decorator
@@ -0,0 +1,65 @@
+import gzip
+import re
+from io import BytesIO
+from typing import Iterable, Iterator, Optional
+
+from django.conf import settings
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+
+re_accepts_gzip = re.compile(r'\bgzip\b')
+re_accepts_brotli = re.compile(r'\bbr\b')
+
+
+def brotli_enabled() -> bool:
+    return brotli is not None and settings.COMPRESSION_BROTLI
+
+
+def get_encoding(accept_encoding: str) -> Optional[str]:
+    """Pick the best encoding the client accepts, brotli over gzip."""
+    if brotli_enabled() and re_accepts_brotli.search(accept_encoding):
+        return 'br'
+    if re_accepts_gzip.search(accept_encoding):
+        return 'gzip'
+    return None
+
+
+def compress(data: bytes, encoding: str, level: Optional[int] = None) -> bytes:
+    """Compress bytes, `level` defaults to the response compression level."""
+    if encoding == 'br':
+        return brotli.compress(
+            data, quality=level or settings.COMPRESSION_BROTLI_QUALITY)
+    return gzip.compress(
+        data, compresslevel=level or settings.COMPRESSION_GZIP_LEVEL, mtime=0)
+
+
+def compress_sequence(sequence: Iterable[bytes],
+                      encoding: str) -> Iterator[bytes]:
+    """Compress a streaming body chunk by chunk.
+
+    Every chunk is flushed, so the client gets the data as soon as the
+    view yields it.
+    """
+    if encoding == 'br':
+        compressor = brotli.Compressor(
+            quality=settings.COMPRESSION_BROTLI_QUALITY)
+        for chunk in sequence:
+            data = compressor.process(chunk) + compressor.flush()
+            if data:
+                yield data
+        yield compressor.finish()
+        return
+    buffer = BytesIO()
+    with gzip.GzipFile(mode='wb', fileobj=buffer, mtime=0,
+                       compresslevel=settings.COMPRESSION_GZIP_LEVEL) as file:
+        for chunk in sequence:
+            file.write(chunk)
+            file.flush()
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue()
@@ -0,0 +1,43 @@
+import random
+import time
+from functools import wraps
+
+from django.conf import settings
+from django.db import OperationalError, transaction
+
+
+def apply_sqlite_pragmas(connection) -> None:
+    """Apply SQLITE_PRAGMAS to a new SQLite connection."""
+    with connection.cursor() as cursor:
+        for name, value in settings.SQLITE_PRAGMAS.items():
+            cursor.execute('PRAGMA {} = {}'.format(name, value))
+
+
+def is_locked_error(error: OperationalError) -> bool:
+    return 'database is locked' in str(error)
+
+
+def retry_on_locked(func, using=None):
+    """Retry a write that failed with `database is locked`.
+
+    Each attempt runs in its own transaction, the delay between them grows
+    exponentially with a random jitter. Inside an outer transaction the
+    write can't be repeated, so func is called as is.
+
+    retry_on_locked(comment.save)()
+    """
+    @wraps(func)
+    def wrapped(*args, **kwargs):
+        if transaction.get_connection(using).in_atomic_block:
+            return func(*args, **kwargs)
+        attempts = settings.DB_WRITE_RETRIES + 1
+        for attempt in range(attempts):
+            try:
+                with transaction.atomic(using=using):
+                    return func(*args, **kwargs)
+            except OperationalError as error:
+                if not is_locked_error(error) or attempt == attempts - 1:
+                    raise
+                delay = settings.DB_WRITE_RETRY_DELAY * 2 ** attempt
+                time.sleep(delay * random.uniform(0.5, 1.5))
+    return wrapped
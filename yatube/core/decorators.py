@@ -0,0 +1,122 @@
+import hashlib
+import time
+from functools import wraps
+
+from django.conf import settings
+from django.contrib.auth.models import AnonymousUser
+from django.core.cache import cache
+from django.utils import timezone
+from django.utils.cache import patch_cache_control, patch_vary_headers
+from django.views.decorators.http import condition
+
+from .routers import replica_reads
+
+STARTED_AT = timezone.now()
+USER_PAGES_KEY = 'user:{}:pages_changed_at'
+
+
+def skip_anonymous_session(view_func):
+    """Resolve cookieless visitors as anonymous without touching the session.
+
+    Requests without a session cookie can't be authenticated, so the lazy
+    request.user is replaced up front and the session store is never
+    loaded. Vary: Cookie is still set, keeping cached anonymous pages apart
+    from the pages of logged-in users.
+    """
+    @wraps(view_func)
+    def wrapped_view(request, *args, **kwargs):
+        if settings.SESSION_COOKIE_NAME not in request.COOKIES:
+            request.user = AnonymousUser()
+        response = view_func(request, *args, **kwargs)
+        patch_vary_headers(response, ('Cookie',))
+        return response
+    return wrapped_view
+
+
+def touch_user_pages(user_id: int) -> None:
+    """Change the ETags of the pages of one user, e.g. after a reaction."""
+    cache.set(USER_PAGES_KEY.format(user_id), time.time(), None)
+
+
+def get_visitor_key(request) -> str:
+    """The logged-in visitor with their touch_user_pages() time."""
+    if not request.user.is_authenticated:
+        return ''
+    return '{}:{}'.format(request.user.pk, cache.get(
+        USER_PAGES_KEY.format(request.user.pk), ''))
+
+
+def started_at(request, *args, **kwargs):
+    """Last-Modified of the pages that change only with a deploy."""
+    return STARTED_AT
+
+
+def conditional_page(last_modified_func, etag_extra_func=None):
+    """Answer conditional GETs with 304 before the view renders anything.
+
+    last_modified_func(request, *args, **kwargs) returns the timestamp of
+    the newest content shown on the page. The ETag adds the visitor with
+    their touch_user_pages() time, the fragment mode and the footer year
+    to it, since the layout depends on them, and the string returned by
+    etag_extra_func for the content without a timestamp, e.g. counters.
+    Anonymous pages are public and logged-in ones private, both are
+    revalidated on every use unless the view sets its own max-age.
+    """
+    def get_last_modified(request, *args, **kwargs):
+        if not hasattr(request, '_last_modified'):
+            request._last_modified = last_modified_func(
+                request, *args, **kwargs)
+        return request._last_modified
+
+    def get_etag(request, *args, **kwargs):
+        last_modified = get_last_modified(request, *args, **kwargs)
+        if last_modified is None:
+            return None
+        extra = ''
+        if etag_extra_func is not None:
+            extra = etag_extra_func(request, *args, **kwargs)
+        key = '{}:{}:{}:{}:{}:{}'.format(
+            last_modified.isoformat(),
+            get_visitor_key(request),
+            request.get_full_path(),
+            request.META.get('HTTP_X_PARTIAL', ''),
+            timezone.now().year,
+            extra,
+        )
+        return hashlib.md5(key.encode()).hexdigest()
+
+    def decorator(view_func):
+        conditional_view = condition(
+            etag_func=get_etag, last_modified_func=get_last_modified
+        )(view_func)
+
+        @wraps(view_func)
+        def wrapped_view(request, *args, **kwargs):
+            response = conditional_view(request, *args, **kwargs)
+            if request.user.is_authenticated:
+                patch_cache_control(response, private=True)
+            else:
+                patch_cache_control(response, public=True)
+            if 'max-age' not in response.get('Cache-Control', ''):
+                patch_cache_control(response, no_cache=True)
+            patch_vary_headers(response, ('Cookie',))
+            return response
+        return wrapped_view
+    return decorator
+
+
+def read_from_replica(view_func):
+    """Run the reads of a safe request on the database replicas.
+
+    Visitors who have just written something stay on the primary, see
+    core.middleware.StickyPrimaryMiddleware.
+    """
+    @wraps(view_func)
+    def wrapped_view(request, *args, **kwargs):
+        if (not settings.DATABASE_REPLICAS
+                or request.method not in ('GET', 'HEAD')
+                or settings.REPLICA_STICKY_COOKIE in request.COOKIES):
+            return view_func(request, *args, **kwargs)
+        with replica_reads():
+            return view_func(request, *args, **kwargs)
+    return wrapped_view
@@ -0,0 +1,23 @@
+from django.conf import settings
+from django.contrib.auth import hashers
+
+
+class PBKDF2PasswordHasher(hashers.PBKDF2PasswordHasher):
+    iterations = getattr(
+        settings, 'PBKDF2_ITERATIONS', hashers.PBKDF2PasswordHasher.iterations)
+
+
+class Argon2PasswordHasher(hashers.Argon2PasswordHasher):
+    time_cost = getattr(
+        settings, 'ARGON2_TIME_COST', hashers.Argon2PasswordHasher.time_cost)
+    memory_cost = getattr(
+        settings, 'ARGON2_MEMORY_COST',
+        hashers.Argon2PasswordHasher.memory_cost)
+    parallelism = getattr(
+        settings, 'ARGON2_PARALLELISM',
+        hashers.Argon2PasswordHasher.parallelism)
+
+
+class BCryptSHA256PasswordHasher(hashers.BCryptSHA256PasswordHasher):
+    rounds = getattr(
+        settings, 'BCRYPT_ROUNDS', hashers.BCryptSHA256PasswordHasher.rounds)
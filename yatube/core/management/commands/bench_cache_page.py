@@ -0,0 +1,82 @@
+import threading
+import time
+
+from django.contrib.auth.models import AnonymousUser
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.test import RequestFactory
+from django.urls import reverse
+from django.views.decorators.cache import cache_page as django_cache_page
+
+from core.benchmark import BenchmarkCommand
+from core.cache import cache_page
+from posts.views import index
+
+
+class Command(BenchmarkCommand):
+    help = ('Count index renders when its cached page expires under '
+            'concurrent requests, Django cache_page vs core.cache.')
+    repeat = 20
+
+    def add_arguments(self, parser):
+        super().add_arguments(parser)
+        parser.add_argument(
+            '--threads', type=int, default=50,
+            help='Concurrent requests arriving at expiry.'
+        )
+        parser.add_argument(
+            '--render-ms', type=int, default=50,
+            help='Simulated render time of the page.'
+        )
+
+    def run(self, threads, render_ms, **options):
+        request = RequestFactory().get(reverse('posts:index'))
+        request.user = AnonymousUser()
+
+        def render_index():
+            cache.clear()
+            index(request)
+        queries = self.measure('index render (cache miss)', render_index)
+        self.stdout.write(
+            f'{threads} requests at expiry, {render_ms} ms render:')
+        for label, decorator in (
+            ('django cache_page', django_cache_page(1, key_prefix='herd')),
+            ('core cache_page', cache_page(1, stale=60, key_prefix='herd')),
+        ):
+            renders, slowest = self.herd(
+                decorator, request, threads, render_ms / 1000)
+            self.stdout.write(
+                f'{label:<30} {renders:4d} renders '
+                f'{renders * queries["queries"]:8.1f} queries '
+                f'slowest {slowest * 1000:8.1f} ms'
+            )
+
+    def herd(self, decorator, request, threads, render_time):
+        """Let `threads` requests hit the page right after it expired."""
+        cache.clear()
+        renders = []
+
+        @decorator
+        def view(request):
+            renders.append(1)
+            time.sleep(render_time)
+            return HttpResponse('page')
+
+        view(request)
+        time.sleep(1.05)
+        renders.clear()
+        barrier = threading.Barrier(threads)
+        latencies = []
+
+        def worker():
+            barrier.wait()
+            start = time.perf_counter()
+            view(request)
+            latencies.append(time.perf_counter() - start)
+
+        workers = [threading.Thread(target=worker) for _ in range(threads)]
+        for thread in workers:
+            thread.start()
+        for thread in workers:
+            thread.join()
+        return len(renders), max(latencies)
@@ -0,0 +1,37 @@
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import get_hasher
+from django.test import Client, override_settings
+
+from core.benchmark import BenchmarkCommand
+
+
+User = get_user_model()
+PASSWORD = 'bench-hashers-password'
+
+
+class Command(BenchmarkCommand):
+    help = 'Measure password hashing and login cost of every profile.'
+    repeat = 20
+
+    def run(self, **options):
+        for name, hashers in settings.PASSWORD_HASHING_PROFILES.items():
+            with override_settings(PASSWORD_HASHERS=hashers):
+                hasher = get_hasher()
+                try:
+                    if hasher.library:
+                        hasher._load_library()
+                except ValueError as error:
+                    self.stdout.write(f'{name:<50} skipped: {error}')
+                    continue
+                user = User.objects.create_user(
+                    username=f'bench_hashers_{name}', password=PASSWORD)
+                data = {'username': user.username, 'password': PASSWORD}
+                self.measure(
+                    f'{name}: make_password',
+                    lambda: hasher.encode(PASSWORD, hasher.salt()),
+                )
+                self.measure(
+                    f'{name}: POST /auth/login/',
+                    lambda: Client().post('/auth/login/', data),
+                )
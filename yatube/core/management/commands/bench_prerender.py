@@ -0,0 +1,23 @@
+from django.contrib.auth.models import AnonymousUser
+from django.test import RequestFactory, override_settings
+
+from core.benchmark import BenchmarkCommand
+from core.prerender import clear_prerendered
+from core.views import page_not_found
+
+
+class Command(BenchmarkCommand):
+    help = 'Measure the 404 handler with and without pre-rendering.'
+
+    def run(self, **options):
+        request = RequestFactory().get('/wp-login.php')
+        request.user = AnonymousUser()
+        results = {}
+        for prerender in (False, True):
+            clear_prerendered()
+            with override_settings(PRERENDER_PAGES=prerender):
+                results[prerender] = self.measure(
+                    f'404 page (prerender={prerender})',
+                    lambda: page_not_found(request, None),
+                )
+        self.compare(results[False], results[True])
@@ -0,0 +1,91 @@
+import os
+import tempfile
+import threading
+import time
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.core.management.base import BaseCommand
+from django.db import OperationalError, connection, connections
+from django.test.utils import override_settings
+
+from core.db import is_locked_error, retry_on_locked
+from posts.models import Post, Reaction
+from posts.reactions import add_reaction, get_counts
+
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = ('Let many users react to one post at once on a temporary copy '
+            'of the schema, with one counter row vs the sharded counters.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=400)
+        parser.add_argument('--threads', type=int, default=8)
+
+    def handle(self, *args, **options):
+        database = connections.databases['default']
+        name = database['NAME']
+        with tempfile.TemporaryDirectory() as directory:
+            connection.close()
+            database['NAME'] = os.path.join(directory, 'bench.sqlite3')
+            try:
+                call_command('migrate', verbosity=0)
+                users = self.create_users(options['users'])
+                for shards in sorted({1, settings.REACTION_COUNTER_SHARDS}):
+                    with override_settings(REACTION_COUNTER_SHARDS=shards):
+                        result = self.run(users, options['threads'])
+                    self.stdout.write(
+                        f'{shards:3d} shards {result["rate"]:10.0f} '
+                        f'reactions/s {result["errors"]:6d} locked errors '
+                        f'count {result["count"]}/{result["reactions"]}'
+                    )
+            finally:
+                connection.close()
+                database['NAME'] = name
+
+    def create_users(self, count):
+        User.objects.bulk_create(
+            User(username=f'bench_reactions_{number}')
+            for number in range(count)
+        )
+        return list(User.objects.filter(username__startswith='bench_'))
+
+    def run(self, users, threads):
+        post = Post.objects.create(text='hot post', author=users[0])
+        barrier = threading.Barrier(threads)
+        self.errors = 0
+        self.lock = threading.Lock()
+
+        def worker(chunk):
+            barrier.wait()
+            for user in chunk:
+                try:
+                    retry_on_locked(add_reaction)(user, post.id, Reaction.LIKE)
+                except OperationalError as error:
+                    if not is_locked_error(error):
+                        raise
+                    with self.lock:
+                        self.errors += 1
+            connection.close()
+
+        workers = [
+            threading.Thread(target=worker, args=(users[start::threads],))
+            for start in range(threads)
+        ]
+        started = time.perf_counter()
+        for thread in workers:
+            thread.start()
+        for thread in workers:
+            thread.join()
+        elapsed = time.perf_counter() - started
+        reactions = Reaction.objects.filter(post=post).count()
+        return {
+            'rate': reactions / elapsed,
+            'errors': self.errors,
+            'reactions': reactions,
+            'count': get_counts([post.id])[post.id].get(Reaction.LIKE, 0),
+        }
@@ -0,0 +1,52 @@
+from django.template import Context, Template
+from django.urls import reverse
+
+from core.benchmark import BenchmarkCommand
+from core.reverse import build_url_templates, fast_reverse
+
+
+URLS = (
+    ('posts:profile', ('bench_user',)),
+    ('posts:post_detail', (42,)),
+    ('posts:group_posts', ('bench-group',)),
+)
+CARD = (
+    "{% url 'posts:profile' username %}"
+    "{% url 'posts:post_detail' post_id %}"
+    "{% url 'posts:group_posts' slug %}"
+)
+
+
+class Command(BenchmarkCommand):
+    help = 'Compare reverse() with fast_reverse() for a 10-post page.'
+    repeat = 2000
+
+    def run(self, **options):
+        build_url_templates()
+        results = {
+            'reverse': self.measure(
+                '30 x reverse()', lambda: self.reverse_page(reverse)),
+            'fast': self.measure(
+                '30 x fast_reverse()',
+                lambda: self.reverse_page(fast_reverse)
+            ),
+        }
+        self.compare(results['reverse'], results['fast'])
+
+        context = Context({
+            'username': 'bench_user', 'post_id': 42, 'slug': 'bench-group'})
+        url_page = Template(CARD * 10)
+        fast_card = CARD.replace('{% url', '{% fast_url')
+        fast_page = Template('{% load fast_urls %}' + fast_card * 10)
+        results = {
+            'url': self.measure(
+                '30 x {% url %}', lambda: url_page.render(context)),
+            'fast_url': self.measure(
+                '30 x {% fast_url %}', lambda: fast_page.render(context)),
+        }
+        self.compare(results['url'], results['fast_url'])
+
+    def reverse_page(self, reverse_func):
+        for _ in range(10):
+            for viewname, args in URLS:
+                reverse_func(viewname, args=args)
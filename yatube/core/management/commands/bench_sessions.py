@@ -0,0 +1,38 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import Client, override_settings
+
+from core.benchmark import BenchmarkCommand
+
+
+User = get_user_model()
+
+DEFAULT_MODE = {
+    'SESSION_ENGINE': 'django.contrib.sessions.backends.db',
+    'AUTHENTICATION_BACKENDS': [
+        'django.contrib.auth.backends.ModelBackend'],
+}
+CACHED_MODE = {
+    'SESSION_ENGINE': 'django.contrib.sessions.backends.cached_db',
+    'AUTHENTICATION_BACKENDS': ['core.backends.CachedModelBackend'],
+}
+
+
+class Command(BenchmarkCommand):
+    help = 'Measure per-request cost of session and user lookups.'
+
+    def run(self, **options):
+        user = User.objects.create_user(username='bench_sessions')
+        url = f'/profile/{user.username}/'
+        results = {}
+        for name, mode in (('db', DEFAULT_MODE), ('cached', CACHED_MODE)):
+            with override_settings(**mode):
+                cache.clear()
+                client = Client()
+                client.force_login(user, mode['AUTHENTICATION_BACKENDS'][0])
+                results[name] = self.measure(
+                    f'authenticated {url} ({name})',
+                    lambda: client.get(url),
+                )
+        self.compare(results['db'], results['cached'])
+        self.measure('anonymous, session skipped', lambda: Client().get(url))
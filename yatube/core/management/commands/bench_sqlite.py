@@ -0,0 +1,101 @@
+import os
+import tempfile
+import threading
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import OperationalError, connections, transaction
+from django.test.utils import override_settings
+
+from core.db import is_locked_error, retry_on_locked
+
+
+class Command(BaseCommand):
+    help = ('Measure concurrent reads and writes on a temporary SQLite file '
+            'with the default and the production SQLite profile.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--seconds', type=float, default=3)
+        parser.add_argument('--readers', type=int, default=4)
+        parser.add_argument('--writers', type=int, default=2)
+
+    def handle(self, *args, **options):
+        seconds = options['seconds']
+        for profile in ('default', 'production'):
+            alias = f'bench_sqlite_{profile}'
+            with tempfile.TemporaryDirectory() as directory:
+                connections.databases[alias] = {
+                    'ENGINE': 'django.db.backends.sqlite3',
+                    'NAME': os.path.join(directory, 'bench.sqlite3'),
+                }
+                connections.ensure_defaults(alias)
+                try:
+                    with override_settings(
+                            SQLITE_PRAGMAS=settings.SQLITE_PROFILES[profile]):
+                        result = self.run(
+                            alias, profile == 'production', **options)
+                finally:
+                    connections[alias].close()
+                    del connections.databases[alias]
+            self.stdout.write(
+                f'{profile:<12} {result["reads"] / seconds:10.0f} reads/s '
+                f'{result["writes"] / seconds:8.0f} writes/s '
+                f'{result["errors"]:6d} locked errors'
+            )
+
+    def run(self, alias, retry, seconds, readers, writers, **options):
+        with connections[alias].cursor() as cursor:
+            cursor.execute(
+                'CREATE TABLE bench_post (id INTEGER PRIMARY KEY, '
+                'text TEXT NOT NULL, created TEXT NOT NULL)')
+        self.result = {'reads': 0, 'writes': 0, 'errors': 0}
+        self.lock = threading.Lock()
+        deadline = time.perf_counter() + seconds
+
+        def read():
+            with connections[alias].cursor() as cursor:
+                cursor.execute(
+                    'SELECT id, text FROM bench_post '
+                    'ORDER BY id DESC LIMIT 10')
+                cursor.fetchall()
+
+        def write():
+            with transaction.atomic(using=alias):
+                with connections[alias].cursor() as cursor:
+                    cursor.execute('SELECT count(*) FROM bench_post')
+                    cursor.execute(
+                        "INSERT INTO bench_post (text, created) "
+                        "VALUES ('bench', datetime('now'))")
+
+        if retry:
+            write = retry_on_locked(write, using=alias)
+        threads = [
+            threading.Thread(
+                target=self.work, args=(alias, read, 'reads', deadline))
+            for _ in range(readers)
+        ] + [
+            threading.Thread(
+                target=self.work, args=(alias, write, 'writes', deadline))
+            for _ in range(writers)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return self.result
+
+    def work(self, alias, action, key, deadline):
+        """Call action until the deadline, count successes and lock errors."""
+        while time.perf_counter() < deadline:
+            try:
+                action()
+            except OperationalError as error:
+                if not is_locked_error(error):
+                    raise
+                counter = 'errors'
+            else:
+                counter = key
+            with self.lock:
+                self.result[counter] += 1
+        connections[alias].close()
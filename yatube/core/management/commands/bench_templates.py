@@ -0,0 +1,57 @@
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import AnonymousUser
+from django.core.paginator import Paginator
+from django.template.loader import render_to_string
+from django.test import RequestFactory, override_settings
+
+from core.benchmark import BenchmarkCommand
+from core.templates import warm_up_templates
+from posts.models import Group, Post
+
+
+User = get_user_model()
+
+LOADERS = [
+    'django.template.loaders.filesystem.Loader',
+    'django.template.loaders.app_directories.Loader',
+]
+TEMPLATE_MODES = {
+    'debug': LOADERS,
+    'production': [('django.template.loaders.cached.Loader', LOADERS)],
+}
+
+
+class Command(BenchmarkCommand):
+    help = 'Measure render time of posts/index.html with 10 posts.'
+
+    def run(self, **options):
+        user = User.objects.create_user(
+            username='bench_templates', first_name='Bench', last_name='User')
+        group = Group.objects.create(
+            title='bench', slug='bench-templates', description='bench')
+        Post.objects.bulk_create(
+            Post(text=f'bench post {i}', author=user, group=group)
+            for i in range(10)
+        )
+        posts = Post.objects.select_related('author', 'group')
+        page_obj = Paginator(posts, 10).get_page(1)
+        list(page_obj)
+        request = RequestFactory().get('/')
+        request.user = AnonymousUser()
+        context = {'page_obj': page_obj, 'index': True}
+        results = {}
+        for mode, loaders in TEMPLATE_MODES.items():
+            templates = [{
+                **settings.TEMPLATES[0],
+                'OPTIONS': {**settings.TEMPLATES[0]['OPTIONS'],
+                            'loaders': loaders},
+            }]
+            with override_settings(TEMPLATES=templates):
+                warm_up_templates()
+                results[mode] = self.measure(
+                    f'render posts/index.html ({mode})',
+                    lambda: render_to_string(
+                        'posts/index.html', context, request),
+                )
+        self.compare(results['debug'], results['production'])
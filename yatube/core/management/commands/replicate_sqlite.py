@@ -0,0 +1,43 @@
+import sqlite3
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+
+
+class Command(BaseCommand):
+    help = ('Copy the primary SQLite database into the DATABASE_REPLICAS '
+            'files. Stands in for real replication in local setups.')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--loop', action='store_true',
+            help='Keep copying instead of exiting after the first copy.'
+        )
+        parser.add_argument(
+            '--interval', type=float, default=1,
+            help='Seconds to sleep between copies in --loop mode, '
+                 'i.e. the replication lag.'
+        )
+
+    def handle(self, *args, **options):
+        if not settings.DATABASE_REPLICAS:
+            raise CommandError('DATABASE_REPLICAS is empty.')
+        primary = connections['default'].settings_dict['NAME']
+        while True:
+            for alias in settings.DATABASE_REPLICAS:
+                self.replicate(primary, connections[alias].settings_dict)
+            if not options['loop']:
+                break
+            time.sleep(options['interval'])
+
+    def replicate(self, primary, replica):
+        """Copy a consistent snapshot with the SQLite online backup API."""
+        source = sqlite3.connect(primary)
+        target = sqlite3.connect(replica['NAME'])
+        try:
+            source.backup(target)
+        finally:
+            target.close()
+            source.close()
@@ -0,0 +1,66 @@
+from django.conf import settings
+from django.utils.cache import patch_vary_headers
+from django.utils.deprecation import MiddlewareMixin
+
+from .compression import compress, compress_sequence, get_encoding
+from .routers import has_written, reset_writes
+
+
+class CompressionMiddleware(MiddlewareMixin):
+    """Compress responses with brotli or gzip.
+
+    Same as django.middleware.gzip.GZipMiddleware, but brotli is preferred
+    when the package is installed and the client accepts it, bodies below
+    COMPRESSION_MIN_SIZE and already compressed media are sent as is.
+    """
+    def process_response(self, request, response):
+        if (not response.streaming
+                and len(response.content) < settings.COMPRESSION_MIN_SIZE):
+            return response
+        if response.has_header('Content-Encoding'):
+            return response
+        content_type = response.get('Content-Type', '')
+        if content_type.startswith(settings.COMPRESSION_SKIP_CONTENT_TYPES):
+            return response
+
+        patch_vary_headers(response, ('Accept-Encoding',))
+
+        encoding = get_encoding(request.META.get('HTTP_ACCEPT_ENCODING', ''))
+        if encoding is None:
+            return response
+
+        if response.streaming:
+            response.streaming_content = compress_sequence(
+                response.streaming_content, encoding)
+            del response['Content-Length']
+        else:
+            compressed_content = compress(response.content, encoding)
+            if len(compressed_content) >= len(response.content):
+                return response
+            response.content = compressed_content
+            response['Content-Length'] = str(len(response.content))
+
+        etag = response.get('ETag')
+        if etag and etag.startswith('"'):
+            response['ETag'] = 'W/' + etag
+        response['Content-Encoding'] = encoding
+        return response
+
+
+class StickyPrimaryMiddleware(MiddlewareMixin):
+    """Keep the reads of a visitor on the primary right after a write.
+
+    A request that wrote to the database sets the REPLICA_STICKY_COOKIE
+    for REPLICA_STICKY_SECONDS, read_from_replica() skips replicas while
+    the cookie is present, so the visitor sees their own changes before
+    they are replicated.
+    """
+    def process_request(self, request):
+        reset_writes()
+
+    def process_response(self, request, response):
+        if settings.DATABASE_REPLICAS and has_written():
+            response.set_cookie(
+                settings.REPLICA_STICKY_COOKIE, '1',
+                max_age=settings.REPLICA_STICKY_SECONDS, httponly=True)
+        return response
@@ -0,0 +1,70 @@
+from typing import Optional
+
+from django.core.paginator import Paginator
+from django.db import DatabaseError, connections
+from django.db.models.query import QuerySet
+from django.utils.functional import cached_property
+
+
+def estimate_count(queryset: QuerySet) -> Optional[int]:
+    """Return the planner estimate of the table size, None if unknown.
+
+    PostgreSQL keeps it in pg_class, SQLite in sqlite_stat1 after ANALYZE:
+    every row of the table starts with its row count, the index rows too.
+    Without statistics SQLite falls back to the largest primary key.
+    """
+    connection = connections[queryset.db]
+    opts = queryset.model._meta
+    if connection.vendor == 'postgresql':
+        sql = 'SELECT reltuples::bigint FROM pg_class WHERE relname = %s'
+    elif connection.vendor == 'sqlite':
+        sql = 'SELECT stat FROM sqlite_stat1 WHERE tbl = %s LIMIT 1'
+    else:
+        return None
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute(sql, [opts.db_table])
+            row = cursor.fetchone()
+    except DatabaseError:
+        row = None
+    if row is not None:
+        return int(str(row[0]).split()[0])
+    if connection.vendor == 'sqlite' and opts.pk.get_internal_type() in (
+            'AutoField', 'BigAutoField'):
+        return queryset.model._default_manager.using(queryset.db).order_by(
+            '-pk').values_list('pk', flat=True).first() or 0
+    return None
+
+
+class EstimatedCountPaginator(Paginator):
+    """Paginator that skips the exact COUNT(*) on large unfiltered tables.
+
+    Filtered querysets and tables estimated below `threshold` rows are
+    counted exactly. An estimate above the real count is clamped by the
+    first short page, which is the real last one: it has no next page and
+    the page numbers end there.
+    """
+
+    def __init__(self, *args, threshold: int = 10000, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.threshold = threshold
+        self.estimated = False
+
+    @cached_property
+    def count(self):
+        object_list = self.object_list
+        if isinstance(object_list, QuerySet) and not object_list.query.where:
+            estimate = estimate_count(object_list)
+            if estimate is not None and estimate >= self.threshold:
+                self.estimated = True
+                return estimate
+        return super().count
+
+    def _get_page(self, object_list, number, paginator):
+        page = super()._get_page(object_list, number, paginator)
+        if self.estimated and len(page) < self.per_page:
+            count = (number - 1) * self.per_page + len(page)
+            if count < self.count:
+                self.__dict__['count'] = count
+                self.__dict__.pop('num_pages', None)
+        return page
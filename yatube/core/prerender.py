@@ -0,0 +1,109 @@
+from typing import Dict, Optional, Tuple
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import AnonymousUser
+from django.http import HttpRequest, HttpResponse
+from django.template.loader import render_to_string
+from django.urls import Resolver404, resolve, reverse
+from django.utils import timezone
+from django.utils.html import escape
+
+
+# Values unknown at pre-render time are replaced in the rendered bytes.
+USERNAME_PLACEHOLDER = '__prerender_username__'
+PATH_PLACEHOLDER = '__prerender_path__'
+
+# Template names with the view name of the page, None for error pages.
+PRERENDERED_PAGES = (
+    ('about/author.html', 'about:author'),
+    ('about/tech.html', 'about:tech'),
+    ('core/400.html', None),
+    ('core/403.html', None),
+    ('core/403csrf.html', None),
+    ('core/404.html', None),
+    ('core/500.html', None),
+)
+
+PageKey = Tuple[str, Optional[str], bool, int]
+
+_pages: Dict[PageKey, bytes] = {}
+
+
+def get_variant_request(path: Optional[str], authenticated: bool,
+                        username: str = USERNAME_PLACEHOLDER) -> HttpRequest:
+    """Build the request the page variant is rendered with.
+
+    The logged in variant has a placeholder user, its name is filled in
+    on every response. Pages with user-written text pass a `username` the
+    text can't contain.
+    """
+    request = HttpRequest()
+    request.method = 'GET'
+    if authenticated:
+        request.user = get_user_model()(username=username)
+    else:
+        request.user = AnonymousUser()
+    request.resolver_match = None
+    if path is not None:
+        request.path_info = path
+        try:
+            request.resolver_match = resolve(path)
+        except Resolver404:
+            pass
+    return request
+
+
+def get_page(template_name: str, path: Optional[str],
+             authenticated: bool) -> bytes:
+    """Return rendered page variant, render it on the first use.
+
+    Variants are kept until the process restarts or the year in the footer
+    changes.
+    """
+    key = (template_name, path, authenticated, timezone.now().year)
+    page = _pages.get(key)
+    if page is None:
+        request = get_variant_request(path, authenticated)
+        page = render_to_string(
+            template_name, {'path': PATH_PLACEHOLDER}, request).encode()
+        _pages[key] = page
+    return page
+
+
+def render_prerendered(request: HttpRequest, template_name: str,
+                       status: int = 200,
+                       path: Optional[str] = None) -> HttpResponse:
+    """Serve a page that depends only on the visitor being logged in.
+
+    `path` is the path_info the page is rendered for, it sets the active
+    navigation link. Without PRERENDER_PAGES the page is rendered as usual.
+    """
+    user = getattr(request, 'user', None)
+    authenticated = user is not None and user.is_authenticated
+    if not settings.PRERENDER_PAGES:
+        page = render_to_string(
+            template_name, {'path': request.path}, request).encode()
+        return HttpResponse(page, status=status)
+    page = get_page(template_name, path, authenticated)
+    page = page.replace(
+        PATH_PLACEHOLDER.encode(), escape(request.path).encode())
+    if authenticated:
+        page = page.replace(
+            USERNAME_PLACEHOLDER.encode(), escape(user.username).encode())
+    return HttpResponse(page, status=status)
+
+
+def prerender_pages() -> int:
+    """Render every variant of the static pages, return their number."""
+    for template_name, view_name in PRERENDERED_PAGES:
+        path = None
+        if view_name is not None:
+            path = reverse(view_name)
+        for authenticated in (False, True):
+            get_page(template_name, path, authenticated)
+    return len(_pages)
+
+
+def clear_prerendered() -> None:
+    _pages.clear()
@@ -0,0 +1,80 @@
+from importlib import import_module
+from typing import Dict, Optional, Tuple
+from urllib.parse import quote
+
+from django.urls import (
+    NoReverseMatch, URLPattern, get_script_prefix, get_urlconf, reverse)
+from django.utils.http import RFC3986_SUBDELIMS
+
+
+FAST_REVERSE_URLCONFS = {
+    'posts': 'posts.urls',
+}
+SENTINEL = '98765432{}'
+SAFE_CHARS = RFC3986_SUBDELIMS + '/~:@'
+
+# 'posts:profile' -> ('profile/{username}/', ('username',), converters)
+_templates: Optional[Dict[str, Tuple[str, tuple, dict]]] = None
+
+
+def build_url_templates() -> Dict[str, Tuple[str, tuple, dict]]:
+    """Precompute format templates of the named URLs of FAST_REVERSE_URLCONFS.
+
+    Every pattern is reversed once with sentinel arguments, the sentinels
+    are then replaced with format fields. Templates are stored without
+    the script prefix, it is added on every call.
+    """
+    global _templates
+    templates = {}
+    script_prefix = get_script_prefix()
+    for namespace, urlconf in FAST_REVERSE_URLCONFS.items():
+        for pattern in import_module(urlconf).urlpatterns:
+            if not isinstance(pattern, URLPattern) or not pattern.name:
+                continue
+            viewname = f'{namespace}:{pattern.name}'
+            converters = pattern.pattern.converters
+            sentinels = {
+                param: SENTINEL.format(index)
+                for index, param in enumerate(converters)
+            }
+            try:
+                url = reverse(viewname, kwargs=sentinels)
+            except NoReverseMatch:
+                continue
+            template = url[len(script_prefix):]
+            template = template.replace('{', '{{').replace('}', '}}')
+            for param, sentinel in sentinels.items():
+                template = template.replace(sentinel, f'{{{param}}}')
+            templates[viewname] = (template, tuple(converters), converters)
+    _templates = templates
+    return templates
+
+
+def clear_url_templates() -> None:
+    global _templates
+    _templates = None
+
+
+def fast_reverse(viewname: str, args=None, kwargs=None) -> str:
+    """reverse() for the URLs of FAST_REVERSE_URLCONFS.
+
+    Arguments are converted and quoted like reverse() does, but they
+    are not validated against the converter regexps. Unknown names,
+    mismatching arguments and per-request urlconfs fall back to reverse().
+    """
+    templates = _templates if _templates is not None else (
+        build_url_templates())
+    entry = templates.get(viewname) if get_urlconf() is None else None
+    if entry is not None:
+        template, params, converters = entry
+        values = kwargs or {}
+        if args and not kwargs:
+            values = dict(zip(params, args)) if len(args) == len(
+                params) else None
+        if values is not None and set(values) == set(params):
+            return get_script_prefix() + template.format(**{
+                param: quote(
+                    str(converters[param].to_url(value)), safe=SAFE_CHARS)
+                for param, value in values.items()
+            })
+    return reverse(viewname, args=args, kwargs=kwargs)
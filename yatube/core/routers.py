@@ -0,0 +1,67 @@
+import random
+import threading
+from contextlib import contextmanager
+
+from django.conf import settings
+
+
+DEFAULT_DB_ALIAS = 'default'
+
+# Apps whose reads always go to the primary: a session or a user must be
+# visible right after it is written.
+PRIMARY_ONLY_APPS = ('sessions', 'auth')
+
+_state = threading.local()
+
+
+@contextmanager
+def replica_reads():
+    """Send the reads inside the block to DATABASE_REPLICAS."""
+    previous = getattr(_state, 'replica', False)
+    _state.replica = True
+    try:
+        yield
+    finally:
+        _state.replica = previous
+
+
+def reading_from_replica() -> bool:
+    return bool(settings.DATABASE_REPLICAS) and getattr(
+        _state, 'replica', False)
+
+
+def reset_writes() -> None:
+    _state.wrote = False
+
+
+def has_written() -> bool:
+    """Whether the primary was written to since reset_writes()."""
+    return getattr(_state, 'wrote', False)
+
+
+class PrimaryReplicaRouter:
+    """Route writes to the primary and the reads of the feeds to replicas.
+
+    Replicas are read only copies of the primary, they get their data from
+    replication and never run migrations.
+    """
+    def db_for_read(self, model, **hints):
+        if (reading_from_replica()
+                and model._meta.app_label not in PRIMARY_ONLY_APPS):
+            return random.choice(settings.DATABASE_REPLICAS)
+        return None
+
+    def db_for_write(self, model, **hints):
+        _state.wrote = True
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        pool = (DEFAULT_DB_ALIAS, *settings.DATABASE_REPLICAS)
+        if obj1._state.db in pool and obj2._state.db in pool:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        if db in settings.DATABASE_REPLICAS:
+            return False
+        return None
@@ -0,0 +1,89 @@
+from django.db import connections
+from django.db.models.expressions import RawSQL
+from django.db.models.query import QuerySet
+
+
+def fts_table(model) -> str:
+    return f'{model._meta.db_table}_fts'
+
+
+def fts_supported(connection) -> bool:
+    return connection.vendor == 'sqlite'
+
+
+def ensure_fts_index(connection, model, field_name: str) -> None:
+    """Create the FTS5 index of model.field_name and its sync triggers.
+
+    SQLite drops triggers when a migration rebuilds the table, so this runs
+    after every migrate and rebuilds the index if anything was missing.
+    """
+    if not fts_supported(connection):
+        return
+    table = model._meta.db_table
+    column = model._meta.get_field(field_name).column
+    pk = model._meta.pk.column
+    index = fts_table(model)
+    statements = {
+        index: (
+            f'CREATE VIRTUAL TABLE "{index}" USING fts5('
+            f'"{column}", content="{table}", content_rowid="{pk}")'
+        ),
+        f'{index}_ai': (
+            f'CREATE TRIGGER "{index}_ai" AFTER INSERT ON "{table}" BEGIN '
+            f'INSERT INTO "{index}"(rowid, "{column}") '
+            f'VALUES (new."{pk}", new."{column}"); END'
+        ),
+        f'{index}_ad': (
+            f'CREATE TRIGGER "{index}_ad" AFTER DELETE ON "{table}" BEGIN '
+            f'INSERT INTO "{index}"("{index}", rowid, "{column}") '
+            f'VALUES (\'delete\', old."{pk}", old."{column}"); END'
+        ),
+        f'{index}_au': (
+            f'CREATE TRIGGER "{index}_au" AFTER UPDATE OF "{column}" '
+            f'ON "{table}" BEGIN '
+            f'INSERT INTO "{index}"("{index}", rowid, "{column}") '
+            f'VALUES (\'delete\', old."{pk}", old."{column}"); '
+            f'INSERT INTO "{index}"(rowid, "{column}") '
+            f'VALUES (new."{pk}", new."{column}"); END'
+        ),
+    }
+    with connection.cursor() as cursor:
+        cursor.execute(
+            'SELECT name FROM sqlite_master WHERE name IN (%s, %s, %s, %s)',
+            list(statements)
+        )
+        existing = {row[0] for row in cursor.fetchall()}
+        missing = [name for name in statements if name not in existing]
+        for name in missing:
+            cursor.execute(statements[name])
+        if missing:
+            cursor.execute(
+                f'INSERT INTO "{index}"("{index}") VALUES (\'rebuild\')')
+
+
+def fts_query(search_term: str) -> str:
+    """Turn user input into an FTS5 query of quoted prefix terms."""
+    return ' '.join(
+        '"{}"*'.format(bit.replace('"', '""')) for bit in search_term.split()
+    )
+
+
+def filter_fts(queryset: QuerySet, search_term: str) -> QuerySet:
+    index = fts_table(queryset.model)
+    return queryset.filter(pk__in=RawSQL(
+        f'SELECT rowid FROM "{index}" WHERE "{index}" MATCH %s',
+        [fts_query(search_term)]
+    ))
+
+
+class FullTextSearchMixin:
+    """ModelAdmin mixin that searches through the FTS5 index.
+
+    The model must have its index created with ensure_fts_index(),
+    other databases fall back to the default LIKE search.
+    """
+
+    def get_search_results(self, request, queryset, search_term):
+        if search_term.strip() and fts_supported(connections[queryset.db]):
+            return filter_fts(queryset, search_term), False
+        return super().get_search_results(request, queryset, search_term)
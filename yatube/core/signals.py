@@ -0,0 +1,45 @@
+from django.contrib.auth import get_user_model
+from django.contrib.auth.signals import user_logged_in, user_logged_out
+from django.core.signals import setting_changed
+from django.db.backends.signals import connection_created
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .backends import invalidate_user
+from .db import apply_sqlite_pragmas
+from .decorators import touch_user_pages
+from .prerender import clear_prerendered
+from .reverse import clear_url_templates
+
+
+User = get_user_model()
+
+
+@receiver((post_save, post_delete), sender=User)
+def user_changed(sender, instance, **kwargs):
+    invalidate_user(instance.id)
+
+
+@receiver((user_logged_in, user_logged_out))
+def user_session_changed(sender, request, user, **kwargs):
+    # Logging in rotates the CSRF token of the cached pages' forms.
+    if user is not None:
+        touch_user_pages(user.pk)
+
+
+@receiver(setting_changed)
+def urlconf_changed(sender, setting, **kwargs):
+    if setting == 'ROOT_URLCONF':
+        clear_url_templates()
+
+
+@receiver(setting_changed)
+def templates_changed(sender, setting, **kwargs):
+    if setting in ('TEMPLATES', 'PRERENDER_PAGES'):
+        clear_prerendered()
+
+
+@receiver(connection_created)
+def configure_connection(sender, connection, **kwargs):
+    if connection.vendor == 'sqlite':
+        apply_sqlite_pragmas(connection)
@@ -0,0 +1,57 @@
+import os
+
+from django.conf import settings
+from django.contrib.staticfiles.storage import ManifestStaticFilesStorage
+from django.core.files.base import ContentFile
+
+from .compression import brotli_enabled, compress
+
+
+class CompressedManifestStaticFilesStorage(ManifestStaticFilesStorage):
+    """Manifest storage that also writes .gz and .br copies of the files.
+
+    Hashed names never change their content, so the web server may send
+    the precompressed copies with far-future cache headers.
+    """
+    gzip_level = 9
+    brotli_quality = 11
+
+    def get_encodings(self):
+        encodings = {'gzip': '.gz'}
+        if brotli_enabled():
+            encodings['br'] = '.br'
+        return encodings
+
+    def is_compressible(self, name: str) -> bool:
+        extension = os.path.splitext(name)[1].lower()
+        return extension in settings.STATIC_COMPRESS_EXTENSIONS
+
+    def compress_file(self, name: str):
+        """Write compressed copies that are smaller than the original."""
+        with self.open(name) as file:
+            content = file.read()
+        if len(content) < settings.COMPRESSION_MIN_SIZE:
+            return
+        for encoding, suffix in self.get_encodings().items():
+            level = self.brotli_quality if encoding == 'br' else (
+                self.gzip_level)
+            compressed = compress(content, encoding, level)
+            if len(compressed) >= len(content):
+                continue
+            compressed_name = name + suffix
+            if self.exists(compressed_name):
+                self.delete(compressed_name)
+            self._save(compressed_name, ContentFile(compressed))
+
+    def post_process(self, paths, dry_run=False, **options):
+        hashed_names = {}
+        for name, hashed_name, processed in super().post_process(
+                paths, dry_run, **options):
+            if hashed_name and not isinstance(processed, Exception):
+                hashed_names[name] = hashed_name
+            yield name, hashed_name, processed
+        if dry_run:
+            return
+        for name, hashed_name in hashed_names.items():
+            if self.is_compressible(name):
+                self.compress_file(hashed_name)
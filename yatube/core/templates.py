@@ -0,0 +1,39 @@
+import logging
+import os
+from typing import Iterator
+
+from django.conf import settings
+from django.template import TemplateSyntaxError, engines
+
+
+logger = logging.getLogger(__name__)
+
+TEMPLATE_EXTENSIONS = ('.html', '.txt')
+
+
+def iter_template_names() -> Iterator[str]:
+    """Yield names of all templates under TEMPLATES_DIR."""
+    for root, _, files in os.walk(settings.TEMPLATES_DIR):
+        for filename in sorted(files):
+            if filename.endswith(TEMPLATE_EXTENSIONS):
+                path = os.path.join(root, filename)
+                yield os.path.relpath(
+                    path, settings.TEMPLATES_DIR).replace(os.sep, '/')
+
+
+def warm_up_templates() -> int:
+    """Compile every project template into the cached loader.
+
+    Does nothing useful unless TEMPLATE_MODE is 'production'.
+    Returns the number of compiled templates.
+    """
+    engine = engines['django']
+    count = 0
+    for name in iter_template_names():
+        try:
+            engine.get_template(name)
+        except TemplateSyntaxError:
+            logger.exception('Template %s failed to compile', name)
+        else:
+            count += 1
+    return count
@@ -0,0 +1,54 @@
+from django import template
+from django.template import Context, engines
+from django.utils.safestring import mark_safe
+
+from core.reverse import fast_reverse
+from posts.stats import attach_views
+from posts.thumbnails import attach_thumbnails
+
+
+register = template.Library()
+
+CARD_TEMPLATE = 'includes/posts/post.html'
+
+
+def get_card_context(post, hide_author, hide_group_link) -> dict:
+    context = {
+        'detail_url': post.get_absolute_url(),
+        'thumbnail': post.thumbnail,
+    }
+    if not hide_author:
+        context['profile_url'] = fast_reverse(
+            'posts:profile', args=(post.author.username,))
+    if not hide_group_link and post.group_id:
+        context['group_url'] = post.group.get_absolute_url()
+    return context
+
+
+@register.filter
+def post_cards(posts, flags=''):
+    """Render the cards of a whole page of posts in one pass.
+
+    Unlike {% include %} in a loop, the card template is looked up once
+    and the URLs come from core.reverse.fast_reverse(). Posts read from the
+    feed table bring their thumbnail along, the others are resolved for
+    the whole page at once by posts.thumbnails, as are the views counts.
+    `flags` is a comma separated list of the card options: hide_author,
+    hide_all_group_posts_link.
+
+    {% for card in page_obj|post_cards:'hide_author' %}{{ card }}{% endfor %}
+    """
+    card = engines['django'].get_template(CARD_TEMPLATE).template
+    options = dict.fromkeys(filter(None, flags.split(',')), True)
+    hide_author = options.get('hide_author', False)
+    hide_group_link = options.get('hide_all_group_posts_link', False)
+    context = Context(options, autoescape=card.engine.autoescape)
+    posts = list(posts)
+    attach_thumbnails(posts)
+    attach_views(posts)
+    cards = []
+    for post in posts:
+        card_context = get_card_context(post, hide_author, hide_group_link)
+        with context.push(post=post, **card_context):
+            cards.append(mark_safe(card.render(context)))
+    return cards
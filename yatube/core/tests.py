@@ -1,6 +1,45 @@
+import gzip
+import os
+import shutil
+import tempfile
+import threading
+import time
 from http import HTTPStatus
+from unittest import skipUnless
 
-from django.test import TestCase, Client
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.conf import settings
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import OperationalError, connection
+from django.http import HttpResponse, StreamingHttpResponse
+from django.urls import reverse
+from django.template import Context, Template
+from django.test import (
+    TestCase, TransactionTestCase, Client, RequestFactory, SimpleTestCase,
+    override_settings
+)
+from django.test.utils import CaptureQueriesContext
+from django.utils.cache import get_cache_key
+
+from core.backends import CachedModelBackend
+from core.cache import cache_page, get_lock_key
+from core.compression import brotli
+from core.db import apply_sqlite_pragmas, retry_on_locked
+from core.decorators import read_from_replica
+from core.middleware import CompressionMiddleware
+from core.paginator import estimate_count
+from core.prerender import prerender_pages
+from core.reverse import fast_reverse
+from core.routers import (
+    PrimaryReplicaRouter, reading_from_replica, replica_reads
+)
+from core.templates import iter_template_names, warm_up_templates
+from posts.models import Post
+
+
+User = get_user_model()
 
 
 class ViewTests(TestCase):
@@ -13,3 +52,418 @@ class ViewTests(TestCase):
 
         self.assertEqual(response.status_code, HTTPStatus.NOT_FOUND)
         self.assertTemplateUsed(response, 'core/404.html')
+
+
+@override_settings(PRERENDER_PAGES=True)
+class PrerenderedPagesTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='prerender<user>')
+        self.authorized_client = Client()
+        self.authorized_client.force_login(self.user)
+
+    def test_pages_rendered_once(self):
+        """Страницы about и ошибок отдаются без повторного рендеринга."""
+        prerender_pages()
+        cases = (
+            (reverse('about:author'), HTTPStatus.OK),
+            (reverse('about:tech'), HTTPStatus.OK),
+            ('/nonexists-page/', HTTPStatus.NOT_FOUND),
+        )
+        for url, status in cases:
+            with self.subTest(url=url):
+                response = self.client.get(url)
+                self.assertEqual(response.status_code, status)
+                self.assertEqual(response.templates, [])
+
+    def test_page_matches_rendered_page(self):
+        """Готовая страница совпадает с обычным рендерингом."""
+        for client in (self.client, self.authorized_client):
+            for url in (reverse('about:author'), '/nonexists-<page>/'):
+                with self.subTest(url=url):
+                    prerendered = client.get(url).content
+                    with self.settings(PRERENDER_PAGES=False):
+                        rendered = client.get(url).content
+                    self.assertEqual(prerendered, rendered)
+
+    def test_user_parts_filled_in(self):
+        response = self.authorized_client.get(reverse('about:tech'))
+        self.assertContains(response, 'prerender&lt;user&gt;')
+        self.assertNotContains(response, 'Войти')
+        response = self.client.get(reverse('about:tech'))
+        self.assertContains(response, 'Войти')
+
+
+class CachedModelBackendTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(
+            username='CachedModelBackendTests', password='old-password')
+        self.backend = CachedModelBackend()
+
+    def test_get_user_uses_cache(self):
+        """Повторный get_user не обращается к базе."""
+        self.backend.get_user(self.user.id)
+        with self.assertNumQueries(0):
+            user = self.backend.get_user(self.user.id)
+        self.assertEqual(user, self.user)
+
+    def test_password_change_invalidates_cached_user(self):
+        """Смена пароля сбрасывает закэшированного пользователя."""
+        self.backend.get_user(self.user.id)
+        self.user.set_password('new-password')
+        self.user.save()
+
+        user = self.backend.get_user(self.user.id)
+
+        self.assertTrue(user.check_password('new-password'))
+
+    def test_authenticated_request_without_user_query(self):
+        """Запрос авторизованного пользователя не читает auth_user."""
+        client = Client()
+        client.force_login(self.user)
+        client.get('/about/author/')
+        with CaptureQueriesContext(connection) as queries:
+            response = client.get('/about/author/')
+        self.assertEqual(response.context['user'], self.user)
+        self.assertFalse(
+            any('auth_user' in query['sql'] for query in queries))
+
+
+class SkipAnonymousSessionTests(TestCase):
+    def test_anonymous_request_skips_session(self):
+        """Анонимный запрос без cookie сессии не загружает сессию."""
+        response = self.client.get('/group/')
+
+        self.assertFalse(response.wsgi_request.session.accessed)
+        self.assertIn('Cookie', response['Vary'])
+
+
+class PasswordHashingTests(TestCase):
+    @override_settings(PASSWORD_HASHERS=[
+        'django.contrib.auth.hashers.MD5PasswordHasher',
+        'core.hashers.PBKDF2PasswordHasher',
+    ])
+    def test_password_rehashed_on_login(self):
+        """Пароль со старым алгоритмом перехэшируется при входе."""
+        user = User.objects.create_user(username='PasswordHashingTests')
+        user.password = make_password(
+            'rehash-password', hasher='pbkdf2_sha256')
+        user.save()
+
+        logged_in = self.client.login(
+            username=user.username, password='rehash-password')
+
+        user.refresh_from_db()
+        self.assertTrue(logged_in)
+        self.assertTrue(user.password.startswith('md5$'))
+
+
+class TemplateWarmUpTests(TestCase):
+    def test_all_templates_compile(self):
+        """Прогрев компилирует все шаблоны проекта."""
+        names = list(iter_template_names())
+
+        self.assertIn('posts/index.html', names)
+        self.assertEqual(warm_up_templates(), len(names))
+
+
+class FastReverseTests(TestCase):
+    def test_fast_reverse_matches_reverse(self):
+        """fast_reverse возвращает те же адреса, что и reverse."""
+        cases = (
+            ('posts:index', None, None),
+            ('posts:profile', ('user.name+1@',), None),
+            ('posts:profile', ('пользователь',), None),
+            ('posts:profile_follow', None, {'username': 'author'}),
+            ('posts:post_detail', (42,), None),
+            ('posts:post_edit', None, {'post_id': 7}),
+            ('posts:group_posts', ('group-slug',), None),
+            ('about:author', None, None),
+        )
+        for viewname, args, kwargs in cases:
+            with self.subTest(viewname=viewname, args=args):
+                self.assertEqual(
+                    fast_reverse(viewname, args=args, kwargs=kwargs),
+                    reverse(viewname, args=args, kwargs=kwargs)
+                )
+
+    def test_fast_url_tag(self):
+        """Тег fast_url выводит экранированный адрес."""
+        template = Template(
+            "{% load fast_urls %}{% fast_url 'posts:profile' name %}")
+        html = template.render(Context({'name': 'a&b'}))
+        self.assertEqual(html, '/profile/a&amp;b/')
+
+
+@override_settings(COMPRESSION_BROTLI=False, COMPRESSION_MIN_SIZE=100)
+class CompressionMiddlewareTests(SimpleTestCase):
+    def get_response(self, response, accept_encoding='gzip, deflate'):
+        request = RequestFactory().get(
+            '/', HTTP_ACCEPT_ENCODING=accept_encoding)
+        middleware = CompressionMiddleware(lambda request: response)
+        return middleware(request)
+
+    def test_response_is_gzipped(self):
+        """Ответ сжимается gzip, если клиент его поддерживает."""
+        content = b'<p>post card</p>' * 100
+        response = self.get_response(HttpResponse(content))
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertEqual(gzip.decompress(response.content), content)
+        self.assertIn('Accept-Encoding', response['Vary'])
+
+    @skipUnless(brotli, 'brotli is not installed')
+    @override_settings(COMPRESSION_BROTLI=True)
+    def test_brotli_preferred(self):
+        content = b'<p>post card</p>' * 100
+        response = self.get_response(HttpResponse(content), 'gzip, br')
+        self.assertEqual(response['Content-Encoding'], 'br')
+        self.assertEqual(brotli.decompress(response.content), content)
+
+    def test_small_and_unaccepted_responses_are_not_compressed(self):
+        cases = (
+            (HttpResponse(b'short'), 'gzip'),
+            (HttpResponse(b'x' * 1000), 'identity'),
+            (HttpResponse(b'x' * 1000, content_type='image/png'), 'gzip'),
+        )
+        for response, accept_encoding in cases:
+            with self.subTest(accept_encoding=accept_encoding):
+                response = self.get_response(response, accept_encoding)
+                self.assertFalse(response.has_header('Content-Encoding'))
+
+    def test_streaming_response_is_gzipped(self):
+        """Потоковый ответ сжимается по частям."""
+        chunks = [b'<p>chunk %d</p>' % number for number in range(100)]
+        response = self.get_response(StreamingHttpResponse(iter(chunks)))
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertEqual(
+            gzip.decompress(b''.join(response.streaming_content)),
+            b''.join(chunks)
+        )
+
+
+class CompressedStaticFilesTests(SimpleTestCase):
+    def setUp(self):
+        self.source = tempfile.mkdtemp()
+        self.root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.source)
+        self.addCleanup(shutil.rmtree, self.root)
+        with open(os.path.join(self.source, 'site.css'), 'w') as file:
+            file.write('body { margin: 0; }\n' * 100)
+
+    def test_collectstatic_writes_compressed_copies(self):
+        """collectstatic сохраняет .gz копии файлов с хэшем в имени."""
+        with override_settings(
+            STATICFILES_DIRS=[self.source],
+            STATIC_ROOT=self.root,
+            STATICFILES_STORAGE=(
+                'core.storage.CompressedManifestStaticFilesStorage'),
+            INSTALLED_APPS=['django.contrib.staticfiles'],
+        ):
+            call_command('collectstatic', interactive=False, verbosity=0)
+        names = os.listdir(self.root)
+        hashed = [name for name in names
+                  if name.startswith('site.') and name.endswith('.css')
+                  and name != 'site.css']
+        self.assertEqual(len(hashed), 1)
+        self.assertIn(hashed[0] + '.gz', names)
+        self.assertNotIn('site.css.gz', names)
+        with open(os.path.join(self.root, hashed[0] + '.gz'), 'rb') as file:
+            content = gzip.decompress(file.read())
+        with open(os.path.join(self.source, 'site.css'), 'rb') as file:
+            self.assertEqual(content, file.read())
+
+
+class SQLiteTuningTests(TransactionTestCase):
+    @override_settings(SQLITE_PRAGMAS={'cache_size': -1234})
+    def test_pragmas_applied(self):
+        apply_sqlite_pragmas(connection)
+        with connection.cursor() as cursor:
+            cursor.execute('PRAGMA cache_size')
+            self.assertEqual(cursor.fetchone()[0], -1234)
+
+    @override_settings(DB_WRITE_RETRIES=2, DB_WRITE_RETRY_DELAY=0)
+    def test_locked_write_retried(self):
+        """Запись повторяется, пока база заблокирована."""
+        calls = []
+
+        def write():
+            calls.append(connection.in_atomic_block)
+            if len(calls) < 3:
+                raise OperationalError('database is locked')
+            return 'saved'
+
+        self.assertEqual(retry_on_locked(write)(), 'saved')
+        self.assertEqual(calls, [True, True, True])
+
+    @override_settings(DB_WRITE_RETRIES=2, DB_WRITE_RETRY_DELAY=0)
+    def test_retries_exhausted(self):
+        calls = []
+
+        def write():
+            calls.append(1)
+            raise OperationalError('database is locked')
+
+        with self.assertRaises(OperationalError):
+            retry_on_locked(write)()
+        self.assertEqual(len(calls), 3)
+
+    @override_settings(DB_WRITE_RETRIES=2, DB_WRITE_RETRY_DELAY=0)
+    def test_other_errors_not_retried(self):
+        calls = []
+
+        def write():
+            calls.append(1)
+            raise OperationalError('no such table: posts_post')
+
+        with self.assertRaises(OperationalError):
+            retry_on_locked(write)()
+        self.assertEqual(len(calls), 1)
+
+
+@override_settings(DATABASE_REPLICAS=['replica1', 'replica2'])
+class PrimaryReplicaRouterTests(TestCase):
+    def setUp(self):
+        self.router = PrimaryReplicaRouter()
+        self.user = User.objects.create_user(username='router')
+
+    def test_reads_routed_inside_replica_block(self):
+        """Чтение внутри replica_reads идёт в реплики, запись - в primary."""
+        self.assertIsNone(self.router.db_for_read(Post))
+        with replica_reads():
+            self.assertIn(
+                self.router.db_for_read(Post), ('replica1', 'replica2'))
+            self.assertIsNone(self.router.db_for_read(User))
+            self.assertEqual(self.router.db_for_write(Post), 'default')
+
+    def test_replicas_are_not_migrated(self):
+        self.assertFalse(self.router.allow_migrate('replica1', 'posts'))
+        self.assertIsNone(self.router.allow_migrate('default', 'posts'))
+
+    def get_replica_flag(self, request):
+        def view(request):
+            return HttpResponse(str(reading_from_replica()))
+        return read_from_replica(view)(request).content
+
+    def test_read_from_replica_decorator(self):
+        factory = RequestFactory()
+        sticky = factory.get('/')
+        sticky.COOKIES[settings.REPLICA_STICKY_COOKIE] = '1'
+        cases = (
+            (factory.get('/'), b'True'),
+            (factory.post('/'), b'False'),
+            (sticky, b'False'),
+        )
+        for request, expected in cases:
+            with self.subTest(method=request.method, cookies=request.COOKIES):
+                self.assertEqual(self.get_replica_flag(request), expected)
+
+    def test_write_makes_reads_sticky(self):
+        """После записи пользователь читает из primary."""
+        post = Post.objects.create(text='router post', author=self.user)
+        client = Client()
+        client.force_login(self.user)
+        response = client.get(reverse('about:tech'))
+        self.assertNotIn(settings.REPLICA_STICKY_COOKIE, response.cookies)
+        response = client.post(
+            reverse('posts:add_comment', kwargs={'post_id': post.id}),
+            {'text': 'router comment'}
+        )
+        self.assertIn(settings.REPLICA_STICKY_COOKIE, response.cookies)
+
+
+class EstimateCountTests(TestCase):
+    def test_sqlite_stat_of_indexed_table(self):
+        """Оценка берётся из статистики индексов, а не из максимального id."""
+        user = get_user_model().objects.create_user(username='estimate')
+        Post.objects.bulk_create(
+            Post(text='estimate', author=user) for _ in range(10))
+        Post.objects.filter(
+            id__in=Post.objects.order_by('-id').values('id')[:4]).delete()
+        Post.objects.create(text='estimate', author=user)
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE posts_post')
+        self.assertEqual(estimate_count(Post.objects.all()), 7)
+
+
+@override_settings(CACHE_LOCK_WAIT=0.1, CACHE_LOCK_POLL=0.01)
+class SingleFlightCachePageTests(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+        self.calls = 0
+
+        @cache_page(20, stale=60, key_prefix='single_flight_test')
+        def view(request):
+            self.calls += 1
+            return HttpResponse(f'render {self.calls}')
+        self.view = view
+        self.request = RequestFactory().get('/cached/')
+
+    def get(self):
+        return self.view(self.request).content
+
+    def expire(self):
+        key = get_cache_key(self.request, 'single_flight_test', cache=cache)
+        entry = cache.get(key)
+        entry['fresh_until'] = 0
+        cache.set(key, entry)
+        return key
+
+    def lock(self, key=None):
+        cache.add(
+            get_lock_key(self.request, 'single_flight_test', key), True)
+
+    def test_fresh_page_is_served_from_cache(self):
+        self.assertEqual(self.get(), b'render 1')
+        self.assertEqual(self.get(), b'render 1')
+        self.assertEqual(self.calls, 1)
+
+    def test_stale_page_served_while_refreshing(self):
+        """Пока страницу обновляет другой запрос, отдаётся устаревшая."""
+        self.get()
+        self.lock(self.expire())
+        self.assertEqual(self.get(), b'render 1')
+        self.assertEqual(self.calls, 1)
+
+    def test_stale_page_refreshed_once(self):
+        self.get()
+        self.expire()
+        self.assertEqual(self.get(), b'render 2')
+        self.assertEqual(self.get(), b'render 2')
+        self.assertEqual(self.calls, 2)
+
+    def test_missing_page_waits_for_lock(self):
+        """Без копии в кэше запрос ждёт блокировку и рендерит сам."""
+        self.lock()
+        self.assertEqual(self.get(), b'render 1')
+
+    @override_settings(CACHE_LOCK_WAIT=5, CACHE_LOCK_POLL=0.01)
+    def test_released_lock_is_taken_over(self):
+        """Снятая без кэширования блокировка не заставляет ждать до конца."""
+        self.lock()
+        lock_key = get_lock_key(self.request, 'single_flight_test', None)
+        timer = threading.Timer(0.05, cache.delete, (lock_key,))
+        timer.start()
+        started = time.monotonic()
+        self.assertEqual(self.get(), b'render 1')
+        timer.join()
+        self.assertLess(time.monotonic() - started, 1)
+        self.assertIsNone(cache.get(lock_key))
+
+    @override_settings(CACHE_LOCK_WAIT=5)
+    def test_session_requests_skip_the_lock(self):
+        self.lock()
+        self.request.COOKIES[settings.SESSION_COOKIE_NAME] = 'session'
+        started = time.monotonic()
+        self.assertEqual(self.get(), b'render 1')
+        self.assertLess(time.monotonic() - started, 1)
+
+    def test_private_responses_are_not_cached(self):
+        @cache_page(20, key_prefix='single_flight_private')
+        def view(request):
+            self.calls += 1
+            response = HttpResponse('private')
+            response['Cache-Control'] = 'private'
+            return response
+        view(self.request)
+        view(self.request)
+        self.assertEqual(self.calls, 2)
@@ -1,21 +1,30 @@
-from django.shortcuts import render
+from django.views.generic.base import TemplateView
+
+from .prerender import render_prerendered
 
 
 def page_not_found(request, exception):
-    return render(request, 'core/404.html', {'path': request.path}, status=404)
+    return render_prerendered(request, 'core/404.html', status=404)
 
 
 def bad_request(request, exception):
-    return render(request, 'core/400.html', status=400)
+    return render_prerendered(request, 'core/400.html', status=400)
 
 
 def permission_denied(request, exception):
-    return render(request, 'core/403.html', status=403)
+    return render_prerendered(request, 'core/403.html', status=403)
 
 
 def server_error(request):
-    return render(request, 'core/500.html', status=500)
+    return render_prerendered(request, 'core/500.html', status=500)
 
 
 def csrf_failure(request, reason=''):
-    return render(request, 'core/403csrf.html')
+    return render_prerendered(request, 'core/403csrf.html')
+
+
+class PrerenderedTemplateView(TemplateView):
+    """TemplateView for pages without context, served pre-rendered."""
+    def get(self, request, *args, **kwargs):
+        return render_prerendered(
+            request, self.template_name, path=request.path_info)
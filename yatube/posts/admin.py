@@ -1,28 +1,171 @@
-from django.contrib import admin
+from django.contrib import admin, messages
 from django.conf import settings
+from django.core.exceptions import PermissionDenied
+from django.shortcuts import get_object_or_404, redirect
+from django.template.response import TemplateResponse
+from django.urls import path, reverse
 
-from .models import Group, Post, Comment, Follow
+from core.paginator import EstimatedCountPaginator
+from core.search import FullTextSearchMixin
+from .cache import get_group_choices
+from .forms import PostActionForm
+from .models import Group, Post, Comment, Follow, ModerationJob
+from .moderation import enqueue_job
+
+
+class BackgroundActionsMixin:
+    """Moderation actions which run as chunked ModerationJob's.
+
+    The stock delete_selected action loads every object in the request,
+    so it is replaced with its background version.
+    """
+
+    def get_actions(self, request):
+        actions = super().get_actions(request)
+        actions.pop('delete_selected', None)
+        return actions
+
+    def enqueue(self, request, action, object_ids, group=None):
+        job = enqueue_job(action, object_ids, request.user, group)
+        self.message_user(
+            request, f'Задача «{job}» поставлена в очередь.', messages.INFO)
+        return redirect('admin:posts_moderationjob_progress', job.id)
+
+    def delete_in_background(self, request, queryset):
+        action = {
+            Post: ModerationJob.DELETE_POSTS,
+            Comment: ModerationJob.DELETE_COMMENTS,
+            Follow: ModerationJob.DELETE_FOLLOWS,
+        }[self.model]
+        return self.enqueue(
+            request, action, queryset.values_list('id', flat=True))
+    delete_in_background.short_description = 'Удалить выбранные (в фоне)'
+    delete_in_background.allowed_permissions = ('delete',)
+
+    def purge_authors(self, request, queryset):
+        return self.enqueue(
+            request,
+            ModerationJob.PURGE_USERS,
+            queryset.values_list('author_id', flat=True)
+        )
+    purge_authors.short_description = 'Удалить весь контент авторов'
+    purge_authors.allowed_permissions = ('delete',)
 
 
 @admin.register(Post)
-class PostAdmin(admin.ModelAdmin):
+class PostAdmin(BackgroundActionsMixin, FullTextSearchMixin,
+                admin.ModelAdmin):
     list_display = ('pk', 'text', 'created', 'author', 'group')
     list_editable = ('group',)
+    list_select_related = ('author', 'group')
+    raw_id_fields = ('author',)
     search_fields = ('text',)
     list_filter = ('created',)
+    date_hierarchy = 'created'
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+    action_form = PostActionForm
+    actions = ('delete_in_background', 'move_to_group', 'purge_authors')
     empty_value_display = settings.ADMIN_EMPTY_VALUE_DISPLAY
 
+    def formfield_for_foreignkey(self, db_field, request, **kwargs):
+        field = super().formfield_for_foreignkey(db_field, request, **kwargs)
+        if db_field.name == 'group':
+            field.choices = [('', field.empty_label)] + get_group_choices()
+        return field
+
+    def move_to_group(self, request, queryset):
+        form = self.action_form(request.POST)
+        form.fields['action'].choices = self.get_action_choices(request)
+        if not form.is_valid():
+            self.message_user(
+                request, 'Выберите существующую группу.', messages.ERROR)
+            return None
+        return self.enqueue(
+            request,
+            ModerationJob.MOVE_POSTS,
+            queryset.values_list('id', flat=True),
+            form.cleaned_data['group']
+        )
+    move_to_group.short_description = 'Перенести в выбранную группу'
+    move_to_group.allowed_permissions = ('change',)
+
 
 @admin.register(Comment)
-class CommentAdmin(admin.ModelAdmin):
+class CommentAdmin(BackgroundActionsMixin, FullTextSearchMixin,
+                   admin.ModelAdmin):
     list_display = ('pk', 'text', 'author', 'post')
+    list_select_related = ('author', 'post')
+    raw_id_fields = ('author', 'post')
     search_fields = ('text',)
+    date_hierarchy = 'created'
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+    actions = ('delete_in_background', 'purge_authors')
     empty_value_display = settings.ADMIN_EMPTY_VALUE_DISPLAY
 
 
 @admin.register(Follow)
-class FollowAdmin(admin.ModelAdmin):
+class FollowAdmin(BackgroundActionsMixin, admin.ModelAdmin):
     list_display = ('pk', 'user', 'author')
+    list_select_related = ('user', 'author')
+    raw_id_fields = ('user', 'author')
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+    actions = ('delete_in_background', 'purge_followers')
+
+    def purge_followers(self, request, queryset):
+        return self.enqueue(
+            request,
+            ModerationJob.PURGE_USERS,
+            queryset.values_list('user_id', flat=True)
+        )
+    purge_followers.short_description = 'Удалить весь контент подписчиков'
+    purge_followers.allowed_permissions = ('delete',)
+
+
+@admin.register(ModerationJob)
+class ModerationJobAdmin(admin.ModelAdmin):
+    list_display = ('pk', 'action', 'status', 'progress_display',
+                    'created_by', 'created', 'finished')
+    list_filter = ('status', 'action')
+    list_select_related = ('created_by',)
+    readonly_fields = ('action', 'object_ids', 'group', 'created_by',
+                       'status', 'total', 'processed', 'finished', 'error')
+    empty_value_display = settings.ADMIN_EMPTY_VALUE_DISPLAY
+
+    def has_add_permission(self, request):
+        return False
+
+    def progress_display(self, job):
+        return f'{job.processed}/{job.total} ({job.progress}%)'
+    progress_display.short_description = 'Прогресс'
+
+    def get_urls(self):
+        return [
+            path(
+                '<int:job_id>/progress/',
+                self.admin_site.admin_view(self.progress_view),
+                name='posts_moderationjob_progress'
+            ),
+        ] + super().get_urls()
+
+    def progress_view(self, request, job_id):
+        if not self.has_view_permission(request):
+            raise PermissionDenied()
+        job = get_object_or_404(ModerationJob, id=job_id)
+        context = {
+            **self.admin_site.each_context(request),
+            'opts': self.model._meta,
+            'title': str(job),
+            'job': job,
+            'in_progress': job.status in (
+                ModerationJob.PENDING, ModerationJob.RUNNING),
+            'changelist_url': reverse(
+                'admin:posts_moderationjob_changelist'),
+        }
+        return TemplateResponse(
+            request, 'admin/posts/moderationjob/progress.html', context)
 
 
 admin.site.register(Group)
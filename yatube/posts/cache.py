@@ -0,0 +1,142 @@
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS
+from django.db.models import Count
+from django.http import Http404
+from django.utils import timezone
+
+from .models import Group, Post
+
+
+# Long lived entries are filled from the primary, a lagging replica would
+# put stale data back into the cache right after the invalidation.
+GROUP_SLUG_KEY = 'group:slug:{}'
+GROUP_ID_KEY = 'group:id:{}'
+GROUPS_KEY = 'groups:all'
+GROUPS_POSTS_COUNT_KEY = 'groups:posts_count'
+POSTS_VERSION_KEY = 'posts:version'
+POSTS_CHANGED_AT_KEY = 'posts:changed_at'
+
+
+def get_group(slug: str) -> Optional[Group]:
+    """Return group by slug from cache, fill the cache on miss."""
+    key = GROUP_SLUG_KEY.format(slug)
+    group = cache.get(key)
+    if group is None:
+        group = Group.objects.using(DEFAULT_DB_ALIAS).filter(slug=slug).first()
+        if group is None:
+            return None
+        cache.set_many({
+            key: group,
+            GROUP_ID_KEY.format(group.id): group,
+        }, settings.GROUP_CACHE_TIMEOUT)
+    return group
+
+
+def get_group_by_id(group_id: int) -> Optional[Group]:
+    """Return group by id from cache, fill the cache on miss."""
+    key = GROUP_ID_KEY.format(group_id)
+    group = cache.get(key)
+    if group is None:
+        group = Group.objects.using(DEFAULT_DB_ALIAS).filter(
+            id=group_id).first()
+        if group is None:
+            return None
+        cache.set_many({
+            key: group,
+            GROUP_SLUG_KEY.format(group.slug): group,
+        }, settings.GROUP_CACHE_TIMEOUT)
+    return group
+
+
+def get_group_or_404(slug: str) -> Group:
+    """Cached analogue of get_object_or_404(Group, slug=slug)."""
+    group = get_group(slug)
+    if group is None:
+        raise Http404('No Group matches the given query.')
+    return group
+
+
+def get_groups() -> List[Group]:
+    """Return all groups ordered by title."""
+    groups = cache.get(GROUPS_KEY)
+    if groups is None:
+        groups = list(
+            Group.objects.using(DEFAULT_DB_ALIAS).order_by('title'))
+        cache.set(GROUPS_KEY, groups, settings.GROUP_CACHE_TIMEOUT)
+    return groups
+
+
+def get_group_choices() -> List[Tuple[int, str]]:
+    """Return (id, title) pairs for the group select widget."""
+    return [(group.id, str(group)) for group in get_groups()]
+
+
+def get_groups_posts_count() -> Dict[int, int]:
+    """Return posts count of every group keyed by group id."""
+    counts = cache.get(GROUPS_POSTS_COUNT_KEY)
+    if counts is None:
+        counts = dict(
+            Post.objects.using(DEFAULT_DB_ALIAS).filter(group__isnull=False)
+            .values_list('group')
+            .annotate(posts_count=Count('id'))
+            .order_by()
+        )
+        cache.set(
+            GROUPS_POSTS_COUNT_KEY, counts, settings.GROUP_CACHE_TIMEOUT)
+    return counts
+
+
+def invalidate_group(group: Group) -> None:
+    """Drop cached metadata of the group and the group listing."""
+    keys = [
+        GROUP_SLUG_KEY.format(group.slug),
+        GROUP_ID_KEY.format(group.id),
+        GROUPS_KEY,
+    ]
+    cached = cache.get(GROUP_ID_KEY.format(group.id))
+    if cached is not None and cached.slug != group.slug:
+        keys.append(GROUP_SLUG_KEY.format(cached.slug))
+    cache.delete_many(keys)
+
+
+def invalidate_groups_posts_count() -> None:
+    cache.delete(GROUPS_POSTS_COUNT_KEY)
+
+
+def get_posts_version() -> int:
+    """Return version of the posts table used in derived cache keys."""
+    version = cache.get(POSTS_VERSION_KEY)
+    if version is None:
+        version = 1
+        cache.add(POSTS_VERSION_KEY, version, None)
+    return version
+
+
+def bump_posts_version() -> None:
+    """Make every key built from the posts version stale."""
+    try:
+        cache.incr(POSTS_VERSION_KEY)
+    except ValueError:
+        cache.add(POSTS_VERSION_KEY, 2, None)
+
+
+def get_posts_changed_at() -> datetime:
+    """Return time of the last edit or deletion shown on the post pages.
+
+    New posts and comments are found by their `created`, this timestamp
+    covers the changes that leave no trace in the tables. Without a cached
+    value the current time is used, which only costs a full response.
+    """
+    changed_at = cache.get(POSTS_CHANGED_AT_KEY)
+    if changed_at is None:
+        cache.add(POSTS_CHANGED_AT_KEY, timezone.now(), None)
+        changed_at = cache.get(POSTS_CHANGED_AT_KEY)
+    return changed_at
+
+
+def touch_posts() -> None:
+    cache.set(POSTS_CHANGED_AT_KEY, timezone.now(), None)
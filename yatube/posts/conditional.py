@@ -0,0 +1,67 @@
+"""Last-Modified functions of the public post pages.
+
+Each one costs a single query ordered by an indexed `created` column,
+edits and deletions are covered by cache.get_posts_changed_at().
+"""
+from datetime import datetime
+from typing import Optional
+
+from django.db.models import Max, OuterRef, Subquery
+
+from .cache import get_group, get_posts_changed_at
+from .models import Post
+from .reactions import get_counts
+from .stats import get_views
+
+
+def latest(*timestamps: Optional[datetime]) -> datetime:
+    return max(filter(None, timestamps + (get_posts_changed_at(),)))
+
+
+def latest_created(posts) -> Optional[datetime]:
+    return posts.order_by('-created').values_list(
+        'created', flat=True).first()
+
+
+def index_last_modified(request) -> datetime:
+    return latest(latest_created(Post.objects.all()))
+
+
+def group_last_modified(request, slug) -> Optional[datetime]:
+    group = get_group(slug)
+    if group is None:
+        return None
+    return latest(latest_created(Post.objects.filter(group=group)))
+
+
+def profile_last_modified(request, username) -> datetime:
+    return latest(latest_created(
+        Post.objects.filter(author__username=username)))
+
+
+def post_detail_last_modified(request, post_id) -> Optional[datetime]:
+    """Post, its latest comment and the author's latest post.
+
+    The page shows the comments and the author's posts count.
+    """
+    author_posts = Post.objects.filter(
+        author=OuterRef('author')).order_by('-created')
+    timestamps = Post.objects.filter(id=post_id).order_by().annotate(
+        latest_comment=Max('comments__created'),
+        latest_author_post=Subquery(author_posts.values('created')[:1]),
+    ).values_list('created', 'latest_comment', 'latest_author_post').first()
+    if timestamps is None:
+        return None
+    return latest(*timestamps)
+
+
+def post_detail_counters(request, post_id) -> str:
+    """ETag part of the views and reactions counts of the post page.
+
+    The views still pending in the process are left out, otherwise every
+    view would change the ETag, so a revalidated page may show a count
+    up to POST_VIEWS_FLUSH_INTERVAL old. Both counts are cached.
+    """
+    views = get_views([post_id], pending=False)[post_id]
+    reactions = sorted(get_counts([post_id])[post_id].items())
+    return f'{views}:{reactions}'
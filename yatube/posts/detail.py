@@ -0,0 +1,143 @@
+"""Cached rendering of the post page.
+
+Two variants of every post page are kept in the cache: the anonymous one
+and the logged-in one, rendered for a placeholder user like the
+pre-rendered pages of core.prerender. The parts that differ between
+logged-in visitors, the user name, the comment form, which users blocked
+by the author don't get, its CSRF token and the edit link of the author,
+are substituted in the cached bytes, as are the views count and the
+reactions which change on every view or click.
+
+The placeholders carry a random nonce of the render, kept with the cached
+variant, so post and comment text can't produce them.
+
+The cache key contains the Last-Modified of the page, so new or changed
+comments, edits of the post and new posts of the author render it anew.
+"""
+import secrets
+
+from django.conf import settings
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.middleware.csrf import get_token
+from django.shortcuts import get_object_or_404
+from django.template.loader import render_to_string
+from django.utils import timezone
+from django.utils.html import escape
+
+from core.prerender import get_variant_request
+from .blocks import is_blocked
+from .conditional import post_detail_last_modified
+from .forms import CommentForm
+from .models import Post
+from .reactions import get_reactions
+from .stats import get_views
+from .thumbnails import attach_thumbnails
+
+
+POST_DETAIL_KEY = 'post_detail:{}:{}:{}:{}'
+PLACEHOLDER = '__post_detail_{}_{}__'
+PLACEHOLDERS = (
+    'username', 'csrf', 'edit_link', 'comment_form', 'views', 'reactions')
+REACTIONS_TEMPLATE = 'includes/posts/reactions.html'
+EDIT_LINK_TEMPLATE = 'includes/posts/post_edit_link.html'
+COMMENT_FORM_TEMPLATE = 'includes/posts/comment_form.html'
+
+
+def get_post_detail_context(post_id: int) -> dict:
+    post = get_object_or_404(
+        Post.objects.select_related(
+            'author',
+            'group'
+        ).prefetch_related(
+            'comments'
+        ), id=post_id)
+    attach_thumbnails([post])
+    return {
+        'post': post,
+        'posts_count': post.author.posts.count(),
+        'comment_form': CommentForm(),
+        'comments': post.comments.all(),
+    }
+
+
+def get_placeholders() -> dict:
+    nonce = secrets.token_hex(16)
+    return {name: PLACEHOLDER.format(name, nonce) for name in PLACEHOLDERS}
+
+
+def render_variant(request, post_id: int, authenticated: bool) -> dict:
+    """Render the page variant with the user parts left as placeholders."""
+    placeholders = get_placeholders()
+    context = get_post_detail_context(post_id)
+    context.update(
+        csrf_token=placeholders['csrf'],
+        edit_link_placeholder=placeholders['edit_link'],
+        comment_form_placeholder=placeholders['comment_form'],
+        views=placeholders['views'],
+        reactions_placeholder=placeholders['reactions'],
+    )
+    variant_request = get_variant_request(
+        request.path_info, authenticated, placeholders['username'])
+    post = context['post']
+    return {
+        'page': render_to_string(
+            'posts/post_detail.html', context, variant_request).encode(),
+        'placeholders': {
+            name: placeholder.encode()
+            for name, placeholder in placeholders.items()
+        },
+        'author_id': post.author_id,
+        'edit_link': render_to_string(
+            EDIT_LINK_TEMPLATE, {'post': post}).encode(),
+        'comment_form': render_to_string(COMMENT_FORM_TEMPLATE, {
+            'post': post,
+            'comment_form': context['comment_form'],
+            'csrf_token': placeholders['csrf'],
+        }).encode(),
+    }
+
+
+def get_variant(request, post_id: int, authenticated: bool) -> dict:
+    last_modified = getattr(request, '_last_modified', None)
+    if last_modified is None:
+        last_modified = post_detail_last_modified(request, post_id)
+    if last_modified is None:
+        return render_variant(request, post_id, authenticated)
+    key = POST_DETAIL_KEY.format(
+        post_id, int(authenticated), last_modified.timestamp(),
+        timezone.now().year)
+    variant = cache.get(key)
+    if variant is None:
+        variant = render_variant(request, post_id, authenticated)
+        cache.set(key, variant, settings.POST_DETAIL_CACHE_TIMEOUT)
+    return variant
+
+
+def render_cached_post_detail(request, post_id: int) -> HttpResponse:
+    """Serve the post page from the cached variant of the visitor."""
+    user = request.user
+    variant = get_variant(request, post_id, user.is_authenticated)
+    placeholders = variant['placeholders']
+    page = variant['page']
+    edit_link = b''
+    if user.is_authenticated:
+        comment_form = b''
+        if not is_blocked(variant['author_id'], user):
+            comment_form = variant['comment_form']
+        page = page.replace(placeholders['comment_form'], comment_form)
+        page = page.replace(
+            placeholders['username'], escape(user.username).encode())
+        page = page.replace(
+            placeholders['csrf'], get_token(request).encode())
+        if user.id == variant['author_id']:
+            edit_link = variant['edit_link']
+    page = page.replace(placeholders['edit_link'], edit_link)
+    views = get_views([post_id])[post_id]
+    page = page.replace(placeholders['views'], str(views).encode())
+    reactions = render_to_string(REACTIONS_TEMPLATE, {
+        'post_id': post_id,
+        'reactions': get_reactions([post_id], user)[post_id],
+    }, request)
+    page = page.replace(placeholders['reactions'], reactions.encode())
+    return HttpResponse(page)
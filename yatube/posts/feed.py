@@ -0,0 +1,157 @@
+"""FeedItem read model: one indexed table behind the post feeds.
+
+Feed querysets yield ordinary (unsaved) Post instances built from the
+feed rows, with the author and the cached group attached, so templates
+and views keep working with posts.
+"""
+from typing import Iterable, Optional
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models.query import ModelIterable, QuerySet
+
+from .cache import get_groups
+from .models import FeedItem, Post
+from .thumbnails import get_stored_thumbnails
+
+
+User = get_user_model()
+
+AUTHOR_FIELDS = ('username', 'first_name', 'last_name')
+
+
+class FeedPostIterable(ModelIterable):
+    """Yield Post instances instead of the FeedItem rows."""
+    def __iter__(self):
+        groups = {group.id: group for group in get_groups()}
+        for item in super().__iter__():
+            yield to_post(item, groups)
+
+
+def to_post(item: FeedItem, groups: dict) -> Post:
+    post = Post(
+        id=item.post_id,
+        created=item.created,
+        text=item.text,
+        image=item.image,
+        image_color=item.image_color,
+        group_id=item.group_id,
+    )
+    post.author = User(
+        id=item.author_id,
+        username=item.author_username,
+        first_name=item.author_first_name,
+        last_name=item.author_last_name,
+    )
+    group = groups.get(item.group_id)
+    if group is not None:
+        post.group = group
+    post.thumbnail = None
+    if item.thumbnail_url:
+        post.thumbnail = {
+            'url': item.thumbnail_url,
+            'width': item.thumbnail_width,
+            'height': item.thumbnail_height,
+        }
+    return post
+
+
+def feed_posts(items: Optional[QuerySet] = None) -> QuerySet:
+    """Return FeedItem queryset that yields posts, e.g.
+
+    feed_posts().filter(group=group)
+    """
+    if items is None:
+        items = FeedItem.objects.all()
+    items = items.all()
+    items._iterable_class = FeedPostIterable
+    return items
+
+
+def get_thumbnail_fields(image, thumbnail: Optional[dict]) -> dict:
+    """Return the FeedItem fields of the card thumbnail.
+
+    A thumbnail that isn't rendered yet is queued for render_thumbnails.
+    """
+    fields = {
+        'thumbnail_url': '',
+        'thumbnail_width': None,
+        'thumbnail_height': None,
+        'thumbnail_status': '',
+    }
+    if not image:
+        return fields
+    if thumbnail is None:
+        fields['thumbnail_status'] = FeedItem.THUMBNAIL_PENDING
+    else:
+        fields.update(
+            thumbnail_url=thumbnail['url'],
+            thumbnail_width=thumbnail['width'],
+            thumbnail_height=thumbnail['height'],
+            thumbnail_status=FeedItem.THUMBNAIL_READY,
+        )
+    return fields
+
+
+def build_feed_item(post: Post, thumbnail: Optional[dict] = None) -> FeedItem:
+    return FeedItem(
+        post_id=post.id,
+        created=post.created,
+        text=post.text,
+        author_id=post.author_id,
+        author_username=post.author.username,
+        author_first_name=post.author.first_name,
+        author_last_name=post.author.last_name,
+        group_id=post.group_id,
+        image=post.image.name or '',
+        image_color=post.image_color,
+        **get_thumbnail_fields(post.image, thumbnail),
+    )
+
+
+def update_feed_item(post: Post) -> None:
+    thumbnails = get_stored_thumbnails([post.image])
+    build_feed_item(post, thumbnails.get(post.image.name)).save()
+
+
+def update_author(user, update_fields: Optional[Iterable[str]]) -> bool:
+    """Copy the author's name to their feed items if it may have changed.
+
+    Returns False when the saved fields do not include the name.
+    """
+    if update_fields is not None and not set(update_fields) & set(
+            AUTHOR_FIELDS):
+        return False
+    FeedItem.objects.filter(author_id=user.id).update(
+        author_username=user.username,
+        author_first_name=user.first_name,
+        author_last_name=user.last_name,
+    )
+    return True
+
+
+def rebuild_feed(chunk_size: Optional[int] = None) -> int:
+    """Recreate the feed items of all posts chunk by chunk.
+
+    The feeds stay readable meanwhile. Returns the number of feed items.
+    """
+    chunk_size = chunk_size or settings.FEED_REBUILD_CHUNK_SIZE
+    posts = Post.objects.select_related('author').order_by('id')
+    count = 0
+    last_id = 0
+    while True:
+        chunk = list(posts.filter(id__gt=last_id)[:chunk_size])
+        if not chunk:
+            return count
+        thumbnails = get_stored_thumbnails(post.image for post in chunk)
+        items = [
+            build_feed_item(post, thumbnails.get(post.image.name))
+            for post in chunk
+        ]
+        with transaction.atomic():
+            FeedItem.objects.filter(
+                post_id__in=[post.id for post in chunk]).delete()
+            FeedItem.objects.bulk_create(items)
+        count += len(chunk)
+        last_id = chunk[-1].id
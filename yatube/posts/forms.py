@@ -1,6 +1,8 @@
 from django import forms
+from django.contrib.admin.helpers import ActionForm
 
-from .models import Post, Comment
+from .models import Post, Comment, Group
+from .cache import get_group_choices
 
 
 class PostForm(forms.ModelForm):
@@ -8,8 +10,30 @@ class PostForm(forms.ModelForm):
         model = Post
         fields = ('text', 'group', 'image')
 
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        group_field = self.fields['group']
+        group_field.choices = (
+            [('', group_field.empty_label)] + get_group_choices()
+        )
+
 
 class CommentForm(forms.ModelForm):
     class Meta:
         model = Comment
         fields = ('text',)
+
+
+class PostActionForm(ActionForm):
+    group = forms.ModelChoiceField(
+        Group.objects.all(),
+        required=False,
+        label='Группа'
+    )
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        group_field = self.fields['group']
+        group_field.choices = (
+            [('', group_field.empty_label)] + get_group_choices()
+        )
@@ -0,0 +1,130 @@
+"""Image metadata stored on Post, so rendering never opens the file.
+
+The fields are filled from the upload before it is saved and backfilled
+for older posts by the 0016 migration. The backfill_image_meta command
+reads them again, e.g. for images assigned by name.
+"""
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
+
+from django.conf import settings
+from django.db import OperationalError
+from PIL import Image
+
+from core.db import retry_on_locked
+
+
+logger = logging.getLogger(__name__)
+
+IMAGE_META_FIELDS = (
+    'image_width', 'image_height', 'image_size', 'image_color')
+# The dominant color is picked from a downscaled, quantized copy.
+COLOR_SAMPLE_SIZE = (64, 64)
+COLOR_PALETTE_SIZE = 4
+
+
+def empty_meta() -> dict:
+    meta = dict.fromkeys(IMAGE_META_FIELDS)
+    meta['image_color'] = ''
+    return meta
+
+
+def get_dominant_color(image: Image.Image) -> str:
+    """Return the most frequent color of the image as #rrggbb."""
+    sample = image.convert('RGB')
+    sample.thumbnail(COLOR_SAMPLE_SIZE)
+    sample = sample.quantize(colors=COLOR_PALETTE_SIZE)
+    _, index = max(sample.getcolors())
+    red, green, blue = sample.getpalette()[index * 3:index * 3 + 3]
+    return f'#{red:02x}{green:02x}{blue:02x}'
+
+
+def read_image_meta(file) -> dict:
+    """Return the image fields of Post for an open image file.
+
+    Unreadable files give empty fields, the file is rewound afterwards.
+    """
+    meta = empty_meta()
+    try:
+        meta['image_size'] = file.size
+        file.seek(0)
+        with Image.open(file) as image:
+            meta['image_width'], meta['image_height'] = image.size
+            meta['image_color'] = get_dominant_color(image)
+    except Exception:
+        logger.exception('Reading image %s failed', file)
+    finally:
+        file.seek(0)
+    return meta
+
+
+def read_stored_image_meta(field_file) -> dict:
+    try:
+        file = field_file.storage.open(field_file.name, 'rb')
+    except OSError:
+        logger.warning('Image %s is missing', field_file.name)
+        return empty_meta()
+    with file:
+        return read_image_meta(file)
+
+
+def fill_image_meta(post) -> None:
+    """Set the image fields of a post whose image is about to be saved.
+
+    Only new uploads are read, images assigned by name keep their fields
+    until the backfill_image_meta command is run.
+    """
+    if not post.image:
+        meta = empty_meta()
+    elif not post.image._committed:
+        meta = read_image_meta(post.image.file)
+    else:
+        return
+    for field, value in meta.items():
+        setattr(post, field, value)
+
+
+def save_with_image(post) -> None:
+    """Save the post with retry_on_locked, storing a new upload once.
+
+    The image fields are filled and the upload is stored before the row
+    is written, so a retried write doesn't store it again under another
+    name. If every attempt fails, the stored file is removed.
+    """
+    stored = bool(post.image) and not post.image._committed
+    if stored:
+        fill_image_meta(post)
+        post.image.save(post.image.name, post.image.file, save=False)
+    try:
+        retry_on_locked(post.save)()
+    except OperationalError:
+        if stored:
+            post.image.delete(save=False)
+        raise
+
+
+def backfill_image_meta(posts, workers: Optional[int] = None,
+                        chunk_size: int = 100) -> int:
+    """Fill the image fields of `posts`, reading the files in parallel.
+
+    Files are read by a thread pool, the rows are written from the calling
+    thread. Returns the number of updated posts.
+    """
+    workers = workers or settings.IMAGE_META_WORKERS
+    posts = posts.exclude(image='').order_by('id')
+    count = 0
+    last_id = 0
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        while True:
+            chunk = list(posts.filter(id__gt=last_id)[:chunk_size])
+            if not chunk:
+                return count
+            metas = executor.map(
+                read_stored_image_meta, [post.image for post in chunk])
+            for post, meta in zip(chunk, metas):
+                for field, value in meta.items():
+                    setattr(post, field, value)
+            posts.model.objects.bulk_update(chunk, IMAGE_META_FIELDS)
+            count += len(chunk)
+            last_id = chunk[-1].id
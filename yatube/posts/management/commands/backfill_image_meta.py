@@ -0,0 +1,30 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from posts.feed import rebuild_feed
+from posts.images import backfill_image_meta
+from posts.models import Post
+
+
+class Command(BaseCommand):
+    help = ('Read the size and dominant color of post images from storage, '
+            'e.g. of images assigned by name, and rebuild the feed.')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--workers', type=int, default=settings.IMAGE_META_WORKERS,
+            help='Number of threads reading the files.'
+        )
+        parser.add_argument(
+            '--missing', action='store_true',
+            help='Only read the images whose fields are empty.'
+        )
+
+    def handle(self, *args, **options):
+        posts = Post.objects.all()
+        if options['missing']:
+            posts = posts.filter(image_size__isnull=True)
+        count = backfill_image_meta(posts, workers=options['workers'])
+        self.stdout.write(f'posts updated: {count}')
+        if count:
+            self.stdout.write(f'feed items: {rebuild_feed()}')
@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+
+from posts.feed import rebuild_feed
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the FeedItem table with thumbnails from the posts.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--chunk-size', type=int, default=None,
+            help='Posts per transaction, FEED_REBUILD_CHUNK_SIZE by default.'
+        )
+
+    def handle(self, *args, **options):
+        count = rebuild_feed(options['chunk_size'])
+        self.stdout.write(f'feed items: {count}')
@@ -0,0 +1,29 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from posts.thumbnails import render_pending_thumbnails
+
+
+class Command(BaseCommand):
+    help = 'Render the feed thumbnails of new and changed post images.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--loop', action='store_true',
+            help='Keep polling the queue instead of exiting when empty.'
+        )
+        parser.add_argument(
+            '--interval', type=float, default=5,
+            help='Seconds to sleep between polls in --loop mode.'
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            count = render_pending_thumbnails()
+            if count:
+                self.stdout.write(f'thumbnails rendered: {count}')
+                continue
+            if not options['loop']:
+                break
+            time.sleep(options['interval'])
@@ -0,0 +1,28 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from posts.moderation import run_pending_jobs
+
+
+class Command(BaseCommand):
+    help = 'Run moderation jobs queued from the admin.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--loop', action='store_true',
+            help='Keep polling the queue instead of exiting when empty.'
+        )
+        parser.add_argument(
+            '--interval', type=float, default=5,
+            help='Seconds to sleep between polls in --loop mode.'
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            count = run_pending_jobs()
+            if count:
+                self.stdout.write(f'jobs finished: {count}')
+            if not options['loop']:
+                break
+            time.sleep(options['interval'])
@@ -0,0 +1,37 @@
+# Generated by Django 2.2.16 on 2026-10-19 09:51
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('posts', '0013_post_comment_created_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ModerationJob',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created', models.DateTimeField(auto_now_add=True, verbose_name='Дата создания')),
+                ('action', models.CharField(choices=[('delete_posts', 'Удаление постов'), ('move_posts', 'Перенос постов в группу'), ('delete_comments', 'Удаление комментариев'), ('delete_follows', 'Удаление подписок'), ('purge_users', 'Удаление контента пользователей')], max_length=32, verbose_name='Действие')),
+                ('object_ids', models.TextField(help_text='JSON список id постов, комментариев, подписок или пользователей', verbose_name='Объекты')),
+                ('status', models.CharField(choices=[('pending', 'В очереди'), ('running', 'Выполняется'), ('done', 'Завершено'), ('failed', 'Ошибка')], default='pending', max_length=16, verbose_name='Статус')),
+                ('total', models.PositiveIntegerField(default=0, verbose_name='Всего')),
+                ('processed', models.PositiveIntegerField(default=0, verbose_name='Обработано')),
+                ('finished', models.DateTimeField(blank=True, null=True, verbose_name='Дата завершения')),
+                ('error', models.TextField(blank=True, verbose_name='Ошибка')),
+                ('created_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to=settings.AUTH_USER_MODEL, verbose_name='Модератор')),
+                ('group', models.ForeignKey(blank=True, help_text='Группа, в которую переносятся посты', null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='posts.Group', verbose_name='Группа')),
+            ],
+            options={
+                'verbose_name': 'moderation job',
+                'verbose_name_plural': 'moderation jobs',
+                'ordering': ('-created',),
+            },
+        ),
+    ]
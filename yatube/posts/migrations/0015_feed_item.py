@@ -0,0 +1,73 @@
+# Generated by Django 2.2.16 on 2026-10-19 10:11
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def fill_feed_items(apps, schema_editor):
+    """Copy the posts, thumbnails are filled by the rebuild_feed command."""
+    Post = apps.get_model('posts', 'Post')
+    FeedItem = apps.get_model('posts', 'FeedItem')
+    posts = Post.objects.select_related('author').order_by('id')
+    for start in range(0, posts.count(), 500):
+        FeedItem.objects.bulk_create(
+            FeedItem(
+                post_id=post.id,
+                created=post.created,
+                text=post.text,
+                author_id=post.author_id,
+                author_username=post.author.username,
+                author_first_name=post.author.first_name,
+                author_last_name=post.author.last_name,
+                group_id=post.group_id,
+                image=post.image.name or '',
+            )
+            for post in posts[start:start + 500]
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('posts', '0014_moderation_job'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='FeedItem',
+            fields=[
+                ('post', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='feed_item', serialize=False, to='posts.Post', verbose_name='Пост')),
+                ('created', models.DateTimeField(verbose_name='Дата публикации')),
+                ('text', models.TextField(verbose_name='Текст')),
+                ('author_username', models.CharField(max_length=150, verbose_name='Имя пользователя')),
+                ('author_first_name', models.CharField(blank=True, max_length=30, verbose_name='Имя')),
+                ('author_last_name', models.CharField(blank=True, max_length=150, verbose_name='Фамилия')),
+                ('image', models.CharField(blank=True, max_length=100, verbose_name='Картинка')),
+                ('thumbnail_url', models.CharField(blank=True, max_length=255, verbose_name='Миниатюра')),
+                ('thumbnail_width', models.PositiveIntegerField(blank=True, null=True, verbose_name='Ширина миниатюры')),
+                ('thumbnail_height', models.PositiveIntegerField(blank=True, null=True, verbose_name='Высота миниатюры')),
+                ('author', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to=settings.AUTH_USER_MODEL, verbose_name='Автор')),
+                ('group', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='posts.Group', verbose_name='Группа')),
+            ],
+            options={
+                'verbose_name': 'feed item',
+                'verbose_name_plural': 'feed items',
+                'ordering': ('-created',),
+            },
+        ),
+        migrations.AddIndex(
+            model_name='feeditem',
+            index=models.Index(fields=['created'], name='feed_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='feeditem',
+            index=models.Index(fields=['group', 'created'], name='feed_group_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='feeditem',
+            index=models.Index(fields=['author', 'created'], name='feed_author_created_idx'),
+        ),
+        migrations.RunPython(fill_feed_items, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,95 @@
+# Generated by Django 2.2.16 on 2026-10-19 10:15
+
+from concurrent.futures import ThreadPoolExecutor
+
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery
+from PIL import Image
+
+# The backfill is a frozen copy of posts.images as of this migration, so
+# later changes to the app code don't change what the migration does.
+FIELDS = ('image_width', 'image_height', 'image_size', 'image_color')
+COLOR_SAMPLE_SIZE = (64, 64)
+COLOR_PALETTE_SIZE = 4
+WORKERS = 4
+CHUNK_SIZE = 100
+
+
+def read_meta(field_file) -> dict:
+    meta = {
+        'image_width': None,
+        'image_height': None,
+        'image_size': None,
+        'image_color': '',
+    }
+    try:
+        with field_file.storage.open(field_file.name, 'rb') as file:
+            meta['image_size'] = file.size
+            with Image.open(file) as image:
+                meta['image_width'], meta['image_height'] = image.size
+                sample = image.convert('RGB')
+                sample.thumbnail(COLOR_SAMPLE_SIZE)
+                sample = sample.quantize(colors=COLOR_PALETTE_SIZE)
+                _, index = max(sample.getcolors())
+                red, green, blue = sample.getpalette()[index * 3:index * 3 + 3]
+                meta['image_color'] = f'#{red:02x}{green:02x}{blue:02x}'
+    except Exception:
+        pass
+    return meta
+
+
+def fill_image_meta(apps, schema_editor):
+    """Read the stored images in parallel and copy colors to the feed."""
+    Post = apps.get_model('posts', 'Post')
+    FeedItem = apps.get_model('posts', 'FeedItem')
+    posts = Post.objects.exclude(image='').order_by('id')
+    last_id = 0
+    with ThreadPoolExecutor(max_workers=WORKERS) as executor:
+        while True:
+            chunk = list(posts.filter(id__gt=last_id)[:CHUNK_SIZE])
+            if not chunk:
+                break
+            metas = executor.map(read_meta, [post.image for post in chunk])
+            for post, meta in zip(chunk, metas):
+                for field, value in meta.items():
+                    setattr(post, field, value)
+            Post.objects.bulk_update(chunk, FIELDS)
+            last_id = chunk[-1].id
+    FeedItem.objects.exclude(image='').update(image_color=Subquery(
+        Post.objects.filter(pk=OuterRef('post_id')).values('image_color')))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0015_feed_item'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='feeditem',
+            name='image_color',
+            field=models.CharField(blank=True, max_length=7, verbose_name='Основной цвет картинки'),
+        ),
+        migrations.AddField(
+            model_name='post',
+            name='image_color',
+            field=models.CharField(blank=True, max_length=7, verbose_name='Основной цвет картинки'),
+        ),
+        migrations.AddField(
+            model_name='post',
+            name='image_height',
+            field=models.PositiveIntegerField(blank=True, null=True, verbose_name='Высота картинки'),
+        ),
+        migrations.AddField(
+            model_name='post',
+            name='image_size',
+            field=models.PositiveIntegerField(blank=True, null=True, verbose_name='Размер картинки'),
+        ),
+        migrations.AddField(
+            model_name='post',
+            name='image_width',
+            field=models.PositiveIntegerField(blank=True, null=True, verbose_name='Ширина картинки'),
+        ),
+        migrations.RunPython(fill_image_meta, migrations.RunPython.noop),
+    ]
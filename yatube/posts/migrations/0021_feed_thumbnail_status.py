@@ -0,0 +1,32 @@
+# Generated by Django 2.2.16 on 2026-10-19 10:42
+
+from django.db import migrations, models
+
+
+def set_thumbnail_status(apps, schema_editor):
+    FeedItem = apps.get_model('posts', 'FeedItem')
+    FeedItem.objects.exclude(thumbnail_url='').update(
+        thumbnail_status='ready')
+    FeedItem.objects.filter(thumbnail_url='').exclude(image='').update(
+        thumbnail_status='pending')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0020_moderation_job_heartbeat'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='feeditem',
+            name='thumbnail_status',
+            field=models.CharField(blank=True, choices=[('pending', 'В очереди'), ('ready', 'Готова'), ('failed', 'Ошибка')], help_text='Пусто у постов без картинки', max_length=8, verbose_name='Статус миниатюры'),
+        ),
+        migrations.AddIndex(
+            model_name='feeditem',
+            index=models.Index(fields=['thumbnail_status'], name='feed_thumbnail_status_idx'),
+        ),
+        migrations.RunPython(
+            set_thumbnail_status, migrations.RunPython.noop),
+    ]
@@ -1,8 +1,7 @@
 from django.db import models
 from django.contrib.auth import get_user_model
-from django.urls import reverse
-
 from core.models import CreatedModel
+from core.reverse import fast_reverse
 
 
 User = get_user_model()
@@ -30,6 +29,9 @@ class Group(models.Model):
     def __str__(self):
         return self.title
 
+    def get_absolute_url(self):
+        return fast_reverse('posts:group_posts', args=(self.slug,))
+
 
 class Post(CreatedModel):
     text = models.TextField(
@@ -56,17 +58,37 @@ class Post(CreatedModel):
         upload_to='posts/',
         blank=True
     )
+    # Filled from the upload by posts.signals, see posts.images.
+    image_width = models.PositiveIntegerField(
+        'Ширина картинки', blank=True, null=True)
+    image_height = models.PositiveIntegerField(
+        'Высота картинки', blank=True, null=True)
+    image_size = models.PositiveIntegerField(
+        'Размер картинки', blank=True, null=True)
+    image_color = models.CharField(
+        'Основной цвет картинки', max_length=7, blank=True)
 
     class Meta:
         verbose_name = 'post'
         verbose_name_plural = 'posts'
         ordering = ('-created',)
+        indexes = (
+            models.Index(fields=('created',), name='post_created_idx'),
+            models.Index(
+                fields=('group', 'created'),
+                name='post_group_created_idx'
+            ),
+            models.Index(
+                fields=('author', 'created'),
+                name='post_author_created_idx'
+            ),
+        )
 
     def __str__(self) -> str:
         return self.text[:15]
 
     def get_absolute_url(self):
-        return reverse("posts:post_detail", kwargs={"post_id": self.id})
+        return fast_reverse('posts:post_detail', kwargs={'post_id': self.id})
 
 
 class Comment(CreatedModel):
@@ -92,6 +114,13 @@ class Comment(CreatedModel):
         verbose_name = 'comment'
         verbose_name_plural = 'comments'
         ordering = ('-created',)
+        indexes = (
+            models.Index(fields=('created',), name='comment_created_idx'),
+            models.Index(
+                fields=('post', 'created'),
+                name='comment_post_created_idx'
+            ),
+        )
 
     def __str__(self) -> str:
         return self.text[:10]
@@ -122,3 +151,319 @@ class Follow(models.Model):
                 name='user_not_equal_author'
             )
         )
+
+
+class Block(CreatedModel):
+    """`user` hides the posts of `author`, who can't follow or comment
+    on the posts of `user` any more."""
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='blocks',
+        verbose_name='Пользователь'
+    )
+    author = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='blocked_by',
+        verbose_name='Заблокированный автор'
+    )
+
+    class Meta:
+        verbose_name = 'block'
+        verbose_name_plural = 'blocks'
+        constraints = (
+            models.UniqueConstraint(
+                fields=('user', 'author'),
+                name='unique_block'
+            ),
+            models.CheckConstraint(
+                check=~models.Q(user=models.F('author')),
+                name='block_user_not_equal_author'
+            )
+        )
+
+
+class Mute(CreatedModel):
+    """`user` hides the posts of `author` from the feeds."""
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='mutes',
+        verbose_name='Пользователь'
+    )
+    author = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='muted_by',
+        verbose_name='Скрытый автор'
+    )
+
+    class Meta:
+        verbose_name = 'mute'
+        verbose_name_plural = 'mutes'
+        constraints = (
+            models.UniqueConstraint(
+                fields=('user', 'author'),
+                name='unique_mute'
+            ),
+            models.CheckConstraint(
+                check=~models.Q(user=models.F('author')),
+                name='mute_user_not_equal_author'
+            )
+        )
+
+
+class Reaction(CreatedModel):
+    LIKE = 'like'
+    LOVE = 'love'
+    LAUGH = 'laugh'
+    SAD = 'sad'
+    KINDS = (
+        (LIKE, 'Нравится'),
+        (LOVE, 'Люблю'),
+        (LAUGH, 'Смешно'),
+        (SAD, 'Грустно'),
+    )
+
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='reactions',
+        verbose_name='Пользователь'
+    )
+    post = models.ForeignKey(
+        Post,
+        on_delete=models.CASCADE,
+        related_name='reactions',
+        verbose_name='Пост'
+    )
+    kind = models.CharField(
+        'Реакция',
+        max_length=16,
+        choices=KINDS
+    )
+
+    class Meta:
+        verbose_name = 'reaction'
+        verbose_name_plural = 'reactions'
+        constraints = (
+            models.UniqueConstraint(
+                fields=('user', 'post', 'kind'),
+                name='unique_reaction'
+            ),
+        )
+
+
+class ReactionCounter(models.Model):
+    """One of the shards of a post reactions count, see posts.reactions."""
+    post = models.ForeignKey(
+        Post,
+        on_delete=models.CASCADE,
+        related_name='+',
+        verbose_name='Пост'
+    )
+    kind = models.CharField(
+        'Реакция',
+        max_length=16,
+        choices=Reaction.KINDS
+    )
+    shard = models.PositiveSmallIntegerField('Шард')
+    count = models.IntegerField('Количество', default=0)
+
+    class Meta:
+        verbose_name = 'reaction counter'
+        verbose_name_plural = 'reaction counters'
+        constraints = (
+            models.UniqueConstraint(
+                fields=('post', 'kind', 'shard'),
+                name='unique_reaction_counter_shard'
+            ),
+        )
+
+
+class PostStats(models.Model):
+    """Counters of a post, written in batches by posts.stats."""
+    post = models.OneToOneField(
+        Post,
+        primary_key=True,
+        on_delete=models.CASCADE,
+        related_name='stats',
+        verbose_name='Пост'
+    )
+    views = models.PositiveIntegerField('Просмотры', default=0)
+
+    class Meta:
+        verbose_name = 'post stats'
+        verbose_name_plural = 'post stats'
+
+
+class FeedItem(models.Model):
+    """Denormalized copy of a post with everything its feed card shows.
+
+    Maintained by posts.signals, rebuilt with the rebuild_feed command.
+    Thumbnails not rendered yet are left to the render_thumbnails worker.
+    """
+    THUMBNAIL_PENDING = 'pending'
+    THUMBNAIL_READY = 'ready'
+    THUMBNAIL_FAILED = 'failed'
+    THUMBNAIL_STATUSES = (
+        (THUMBNAIL_PENDING, 'В очереди'),
+        (THUMBNAIL_READY, 'Готова'),
+        (THUMBNAIL_FAILED, 'Ошибка'),
+    )
+
+    post = models.OneToOneField(
+        Post,
+        primary_key=True,
+        on_delete=models.CASCADE,
+        related_name='feed_item',
+        verbose_name='Пост'
+    )
+    created = models.DateTimeField('Дата публикации')
+    text = models.TextField('Текст')
+    author = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='+',
+        verbose_name='Автор'
+    )
+    author_username = models.CharField('Имя пользователя', max_length=150)
+    author_first_name = models.CharField('Имя', max_length=30, blank=True)
+    author_last_name = models.CharField('Фамилия', max_length=150, blank=True)
+    group = models.ForeignKey(
+        Group,
+        blank=True,
+        null=True,
+        on_delete=models.SET_NULL,
+        related_name='+',
+        verbose_name='Группа'
+    )
+    image = models.CharField('Картинка', max_length=100, blank=True)
+    image_color = models.CharField(
+        'Основной цвет картинки', max_length=7, blank=True)
+    thumbnail_url = models.CharField('Миниатюра', max_length=255, blank=True)
+    thumbnail_width = models.PositiveIntegerField(
+        'Ширина миниатюры', blank=True, null=True)
+    thumbnail_height = models.PositiveIntegerField(
+        'Высота миниатюры', blank=True, null=True)
+    thumbnail_status = models.CharField(
+        'Статус миниатюры',
+        max_length=8,
+        choices=THUMBNAIL_STATUSES,
+        blank=True,
+        help_text='Пусто у постов без картинки'
+    )
+
+    class Meta:
+        verbose_name = 'feed item'
+        verbose_name_plural = 'feed items'
+        ordering = ('-created',)
+        indexes = (
+            models.Index(fields=('created',), name='feed_created_idx'),
+            models.Index(
+                fields=('thumbnail_status',),
+                name='feed_thumbnail_status_idx'
+            ),
+            models.Index(
+                fields=('group', 'created'),
+                name='feed_group_created_idx'
+            ),
+            models.Index(
+                fields=('author', 'created'),
+                name='feed_author_created_idx'
+            ),
+        )
+
+    def __str__(self) -> str:
+        return self.text[:15]
+
+
+class ModerationJob(CreatedModel):
+    DELETE_POSTS = 'delete_posts'
+    MOVE_POSTS = 'move_posts'
+    DELETE_COMMENTS = 'delete_comments'
+    DELETE_FOLLOWS = 'delete_follows'
+    PURGE_USERS = 'purge_users'
+    ACTIONS = (
+        (DELETE_POSTS, 'Удаление постов'),
+        (MOVE_POSTS, 'Перенос постов в группу'),
+        (DELETE_COMMENTS, 'Удаление комментариев'),
+        (DELETE_FOLLOWS, 'Удаление подписок'),
+        (PURGE_USERS, 'Удаление контента пользователей'),
+    )
+    PENDING = 'pending'
+    RUNNING = 'running'
+    DONE = 'done'
+    FAILED = 'failed'
+    STATUSES = (
+        (PENDING, 'В очереди'),
+        (RUNNING, 'Выполняется'),
+        (DONE, 'Завершено'),
+        (FAILED, 'Ошибка'),
+    )
+
+    action = models.CharField(
+        'Действие',
+        max_length=32,
+        choices=ACTIONS
+    )
+    object_ids = models.TextField(
+        'Объекты',
+        help_text='JSON список id постов, комментариев, подписок '
+                  'или пользователей'
+    )
+    group = models.ForeignKey(
+        Group,
+        blank=True,
+        null=True,
+        on_delete=models.SET_NULL,
+        related_name='+',
+        verbose_name='Группа',
+        help_text='Группа, в которую переносятся посты'
+    )
+    created_by = models.ForeignKey(
+        User,
+        blank=True,
+        null=True,
+        on_delete=models.SET_NULL,
+        related_name='+',
+        verbose_name='Модератор'
+    )
+    status = models.CharField(
+        'Статус',
+        max_length=16,
+        choices=STATUSES,
+        default=PENDING
+    )
+    total = models.PositiveIntegerField('Всего', default=0)
+    processed = models.PositiveIntegerField('Обработано', default=0)
+    heartbeat = models.DateTimeField(
+        'Последняя активность',
+        blank=True,
+        null=True,
+        help_text='Обновляется исполнителем после каждой пачки'
+    )
+    finished = models.DateTimeField(
+        'Дата завершения',
+        blank=True,
+        null=True
+    )
+    error = models.TextField(
+        'Ошибка',
+        blank=True
+    )
+
+    class Meta:
+        verbose_name = 'moderation job'
+        verbose_name_plural = 'moderation jobs'
+        ordering = ('-created',)
+
+    def __str__(self) -> str:
+        return f'{self.get_action_display()} #{self.pk}'
+
+    @property
+    def progress(self) -> int:
+        if not self.total:
+            return 100 if self.status == self.DONE else 0
+        return min(100, self.processed * 100 // self.total)
@@ -0,0 +1,185 @@
+import json
+from datetime import timedelta
+from typing import Iterable, Iterator, List, Optional
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+from sorl.thumbnail import delete as delete_image
+
+from .cache import (
+    bump_posts_version, invalidate_groups_posts_count, touch_posts
+)
+from .models import (
+    Comment, FeedItem, Follow, Group, ModerationJob, Post, User
+)
+
+
+def enqueue_job(action: str, object_ids: Iterable[int],
+                created_by: Optional[User] = None,
+                group: Optional[Group] = None) -> ModerationJob:
+    """Store the moderation job, the worker runs it chunk by chunk."""
+    object_ids = sorted(set(object_ids))
+    if action == ModerationJob.PURGE_USERS:
+        total = (
+            Post.objects.filter(author_id__in=object_ids).count()
+            + Comment.objects.filter(author_id__in=object_ids).count()
+            + Follow.objects.filter(
+                Q(user_id__in=object_ids) | Q(author_id__in=object_ids)
+            ).count()
+        )
+    else:
+        total = len(object_ids)
+    return ModerationJob.objects.create(
+        action=action,
+        object_ids=json.dumps(object_ids),
+        group=group,
+        created_by=created_by,
+        total=total,
+    )
+
+
+def chunks(ids: List[int], size: int) -> Iterator[List[int]]:
+    for start in range(0, len(ids), size):
+        yield ids[start:start + size]
+
+
+def delete_posts(ids: List[int]) -> None:
+    """Delete posts with their comments and the uploaded images."""
+    with transaction.atomic():
+        images = list(
+            Post.objects.filter(id__in=ids).exclude(image='')
+            .values_list('image', flat=True)
+        )
+        Post.objects.filter(id__in=ids).delete()
+    for image in images:
+        delete_image(image)
+
+
+def delete_posts_job(job: ModerationJob) -> Iterator[int]:
+    ids = json.loads(job.object_ids)[job.processed:]
+    for chunk in chunks(ids, settings.MODERATION_CHUNK_SIZE):
+        delete_posts(chunk)
+        yield len(chunk)
+
+
+def move_posts_job(job: ModerationJob) -> Iterator[int]:
+    ids = json.loads(job.object_ids)[job.processed:]
+    for chunk in chunks(ids, settings.MODERATION_CHUNK_SIZE):
+        with transaction.atomic():
+            Post.objects.filter(id__in=chunk).update(group=job.group)
+            FeedItem.objects.filter(post_id__in=chunk).update(
+                group=job.group)
+        yield len(chunk)
+    invalidate_groups_posts_count()
+    bump_posts_version()
+    touch_posts()
+
+
+def delete_comments_job(job: ModerationJob) -> Iterator[int]:
+    ids = json.loads(job.object_ids)[job.processed:]
+    for chunk in chunks(ids, settings.MODERATION_CHUNK_SIZE):
+        Comment.objects.filter(id__in=chunk).delete()
+        yield len(chunk)
+
+
+def delete_follows_job(job: ModerationJob) -> Iterator[int]:
+    ids = json.loads(job.object_ids)[job.processed:]
+    for chunk in chunks(ids, settings.MODERATION_CHUNK_SIZE):
+        Follow.objects.filter(id__in=chunk).delete()
+        yield len(chunk)
+
+
+def purge_users_job(job: ModerationJob) -> Iterator[int]:
+    """Delete posts, comments and follows of the users.
+
+    Every chunk is selected anew, so a restarted job just continues
+    with whatever content is left.
+    """
+    user_ids = json.loads(job.object_ids)
+    size = settings.MODERATION_CHUNK_SIZE
+    querysets = (
+        (Post.objects.filter(author_id__in=user_ids), delete_posts),
+        (Comment.objects.filter(author_id__in=user_ids), None),
+        (Follow.objects.filter(
+            Q(user_id__in=user_ids) | Q(author_id__in=user_ids)), None),
+    )
+    for queryset, delete in querysets:
+        while True:
+            ids = list(queryset.values_list('id', flat=True)[:size])
+            if not ids:
+                break
+            if delete is None:
+                queryset.model.objects.filter(id__in=ids).delete()
+            else:
+                delete(ids)
+            yield len(ids)
+
+
+JOB_HANDLERS = {
+    ModerationJob.DELETE_POSTS: delete_posts_job,
+    ModerationJob.MOVE_POSTS: move_posts_job,
+    ModerationJob.DELETE_COMMENTS: delete_comments_job,
+    ModerationJob.DELETE_FOLLOWS: delete_follows_job,
+    ModerationJob.PURGE_USERS: purge_users_job,
+}
+
+
+def claimable(now) -> Q:
+    """Pending jobs and running ones with no progress for a while.
+
+    Jobs left running by a worker before the heartbeat was added have
+    none, they are taken over too.
+    """
+    stale = now - timedelta(seconds=settings.MODERATION_JOB_TIMEOUT)
+    return Q(status=ModerationJob.PENDING) | Q(
+        Q(heartbeat__lt=stale) | Q(heartbeat__isnull=True),
+        status=ModerationJob.RUNNING,
+    )
+
+
+def claim_job(job: ModerationJob) -> bool:
+    """Mark the job running, unless another worker has done it first.
+
+    A pending job is claimed by a conditional UPDATE, so only one of the
+    workers racing for it gets a row back. A running job is taken over
+    once its worker has shown no progress for MODERATION_JOB_TIMEOUT.
+    """
+    now = timezone.now()
+    claimed = ModerationJob.objects.filter(
+        claimable(now), id=job.id,
+    ).update(status=ModerationJob.RUNNING, heartbeat=now)
+    return claimed == 1
+
+
+def run_job(job: ModerationJob) -> None:
+    """Run a claimed job, saving the progress after every chunk."""
+    jobs = ModerationJob.objects.filter(id=job.id)
+    job.refresh_from_db()
+    try:
+        for count in JOB_HANDLERS[job.action](job):
+            job.processed += count
+            jobs.update(processed=job.processed, heartbeat=timezone.now())
+    except Exception as error:
+        job.status = ModerationJob.FAILED
+        job.error = str(error)
+    else:
+        job.status = ModerationJob.DONE
+    job.finished = timezone.now()
+    jobs.update(status=job.status, error=job.error, finished=job.finished)
+
+
+def run_pending_jobs() -> int:
+    """Run queued jobs and the jobs whose worker has died.
+
+    Return the number of jobs run by this worker.
+    """
+    jobs = list(ModerationJob.objects.filter(
+        claimable(timezone.now())).order_by('created'))
+    count = 0
+    for job in jobs:
+        if claim_job(job):
+            run_job(job)
+            count += 1
+    return count
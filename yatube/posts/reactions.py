@@ -0,0 +1,136 @@
+"""Reactions to posts and their sharded counters.
+
+Each post and reaction kind has up to REACTION_COUNTER_SHARDS counter
+rows, a reaction updates a random one of them, so concurrent reactions
+to a hot post don't all wait for the same row. A count is the sum of
+the shards, the sums are cached until the next reaction to the post.
+"""
+import random
+from typing import Dict, Iterable, List
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import IntegrityError, transaction
+from django.db.models import F, Sum
+
+from .models import Reaction, ReactionCounter
+
+
+KIND_NAMES = dict(Reaction.KINDS)
+REACTION_COUNTS_KEY = 'post:reactions:{}'
+
+
+def change_counter(post_id: int, kind: str, delta: int) -> None:
+    shard = random.randrange(settings.REACTION_COUNTER_SHARDS)
+    counter = ReactionCounter.objects.filter(
+        post_id=post_id, kind=kind, shard=shard)
+    if counter.update(count=F('count') + delta):
+        return
+    ReactionCounter.objects.bulk_create(
+        [ReactionCounter(post_id=post_id, kind=kind, shard=shard)],
+        ignore_conflicts=True
+    )
+    counter.update(count=F('count') + delta)
+
+
+def release_counter(reaction: Reaction) -> None:
+    """Take a deleted reaction off the counters of its post.
+
+    Called by posts.signals for every deleted reaction, cascades from
+    deleted users included. Only shards above zero are decremented and
+    none is created: when the post itself is deleted, its counters may be
+    gone already.
+    """
+    shards = ReactionCounter.objects.filter(
+        post_id=reaction.post_id, kind=reaction.kind, count__gt=0)
+    shard = random.randrange(settings.REACTION_COUNTER_SHARDS)
+    if not shards.filter(shard=shard).update(count=F('count') - 1):
+        ids = shards.values_list('id', flat=True)[:1]
+        ReactionCounter.objects.filter(id__in=list(ids)).update(
+            count=F('count') - 1)
+    cache.delete(REACTION_COUNTS_KEY.format(reaction.post_id))
+
+
+def add_reaction(user, post_id: int, kind: str) -> bool:
+    """Add the reaction, return False if the user already has it."""
+    with transaction.atomic():
+        try:
+            with transaction.atomic():
+                Reaction.objects.create(user=user, post_id=post_id, kind=kind)
+        except IntegrityError:
+            return False
+        change_counter(post_id, kind, 1)
+    cache.delete(REACTION_COUNTS_KEY.format(post_id))
+    return True
+
+
+def remove_reaction(user, post_id: int, kind: str) -> bool:
+    """Remove the reaction, return False if the user has none.
+
+    The counter is decremented by the post_delete signal.
+    """
+    with transaction.atomic():
+        deleted, _ = Reaction.objects.filter(
+            user=user, post_id=post_id, kind=kind).delete()
+    if not deleted:
+        return False
+    cache.delete(REACTION_COUNTS_KEY.format(post_id))
+    return True
+
+
+def get_counts(post_ids: Iterable[int]) -> Dict[int, Dict[str, int]]:
+    """Return the counts by kind of the posts, cached or summed at once."""
+    keys = {post_id: REACTION_COUNTS_KEY.format(post_id)
+            for post_id in post_ids}
+    cached = cache.get_many(keys.values())
+    counts = {
+        post_id: cached[key] for post_id, key in keys.items() if key in cached
+    }
+    missing = [post_id for post_id in keys if post_id not in counts]
+    if missing:
+        fetched = {post_id: {} for post_id in missing}
+        rows = ReactionCounter.objects.filter(
+            post_id__in=missing
+        ).values_list('post_id', 'kind').annotate(
+            total=Sum('count')).order_by()
+        for post_id, kind, total in rows:
+            fetched[post_id][kind] = total
+        cache.set_many(
+            {keys[post_id]: kinds for post_id, kinds in fetched.items()},
+            settings.REACTION_COUNTS_CACHE_TIMEOUT
+        )
+        counts.update(fetched)
+    return counts
+
+
+def get_reactions(post_ids: Iterable[int],
+                  user=None) -> Dict[int, List[dict]]:
+    """Return counts and "did I react" flags of every kind for the posts.
+
+    The flags of a logged-in user take one more query.
+    """
+    counts = get_counts(post_ids)
+    mine = set()
+    if user is not None and user.is_authenticated:
+        mine = set(Reaction.objects.filter(
+            user=user, post_id__in=list(counts)
+        ).values_list('post_id', 'kind'))
+    return {
+        post_id: [{
+            'kind': kind,
+            'label': label,
+            'count': kinds.get(kind, 0),
+            'mine': (post_id, kind) in mine,
+        } for kind, label in Reaction.KINDS]
+        for post_id, kinds in counts.items()
+    }
+
+
+def attach_reactions(posts: Iterable, user=None) -> None:
+    """Set `reaction_counts`, the nonzero counts, of a page of posts."""
+    posts = [post for post in posts if post.id is not None]
+    reactions = get_reactions((post.id for post in posts), user)
+    for post in posts:
+        post.reaction_counts = [
+            reaction for reaction in reactions[post.id] if reaction['count']
+        ]
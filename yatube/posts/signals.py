@@ -0,0 +1,90 @@
+from django.db import connections
+from django.db.models.signals import (
+    post_delete, post_migrate, post_save, pre_save
+)
+from django.dispatch import receiver
+
+from core.decorators import touch_user_pages
+from core.search import ensure_fts_index
+from .blocks import invalidate_block_lists
+from .cache import (
+    bump_posts_version, invalidate_group, invalidate_groups_posts_count,
+    touch_posts
+)
+from .feed import update_author, update_feed_item
+from .images import fill_image_meta
+from .models import (
+    Block, Comment, Follow, Group, Mute, Post, Reaction, User
+)
+from .reactions import release_counter
+
+
+@receiver((post_save, post_delete), sender=Group)
+def group_changed(sender, instance, **kwargs):
+    invalidate_group(instance)
+    invalidate_groups_posts_count()
+    touch_posts()
+
+
+@receiver((post_save, post_delete), sender=Post)
+def post_changed(sender, instance, **kwargs):
+    invalidate_groups_posts_count()
+    bump_posts_version()
+    if not kwargs.get('created'):
+        touch_posts()
+
+
+@receiver(pre_save, sender=Post)
+def post_saving(sender, instance, **kwargs):
+    fill_image_meta(instance)
+
+
+@receiver(post_save, sender=Post)
+def post_saved(sender, instance, **kwargs):
+    update_feed_item(instance)
+
+
+@receiver(post_save, sender=User)
+def author_saved(sender, instance, update_fields=None, **kwargs):
+    if update_author(instance, update_fields) and not kwargs.get('created'):
+        touch_posts()
+
+
+@receiver((post_save, post_delete), sender=Comment)
+def comment_changed(sender, instance, **kwargs):
+    if not kwargs.get('created'):
+        touch_posts()
+
+
+@receiver((post_save, post_delete), sender=Follow)
+def follow_changed(sender, instance, **kwargs):
+    touch_posts()
+
+
+@receiver((post_save, post_delete), sender=Reaction)
+def reaction_changed(sender, instance, **kwargs):
+    touch_user_pages(instance.user_id)
+
+
+@receiver(post_delete, sender=Reaction)
+def reaction_deleted(sender, instance, **kwargs):
+    release_counter(instance)
+
+
+@receiver((post_save, post_delete), sender=Block)
+@receiver((post_save, post_delete), sender=Mute)
+def block_lists_changed(sender, instance, **kwargs):
+    invalidate_block_lists(instance.user_id)
+    touch_user_pages(instance.user_id)
+    if sender is Block:
+        # The comment form of the author's posts shows or hides for them.
+        touch_user_pages(instance.author_id)
+
+
+@receiver(post_migrate)
+def create_search_indexes(sender, using, **kwargs):
+    if sender.name != 'posts':
+        return
+    connection = connections[using]
+    ensure_fts_index(connection, Post, 'text')
+    ensure_fts_index(connection, Comment, 'text')
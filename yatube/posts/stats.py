@@ -0,0 +1,179 @@
+"""Write-behind view counters of the posts.
+
+A page view only increments a counter in process memory. The pending
+deltas are written to PostStats in a few batch UPDATEs by a background
+thread every POST_VIEWS_FLUSH_INTERVAL seconds, or sooner once
+POST_VIEWS_FLUSH_SIZE posts have pending views. A worker that dies loses
+at most one interval of its views, a graceful exit flushes them.
+
+Counts shown on the pages are cached for POST_VIEWS_CACHE_TIMEOUT and
+include the views still pending in this process.
+"""
+import atexit
+import logging
+import threading
+from collections import Counter, defaultdict
+from functools import wraps
+from typing import Dict, Iterable
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DatabaseError, close_old_connections
+from django.db.models import F
+
+from core.db import retry_on_locked
+from .models import Post, PostStats
+
+
+logger = logging.getLogger(__name__)
+
+POST_VIEWS_KEY = 'post:views:{}'
+# Keeps the IN lists below the SQLite variables limit.
+WRITE_CHUNK_SIZE = 500
+
+
+def write_deltas(deltas: Dict[int, int]) -> None:
+    """Add the view deltas to PostStats, skipping deleted posts."""
+    ids = list(deltas)
+    for start in range(0, len(ids), WRITE_CHUNK_SIZE):
+        chunk = list(Post.objects.filter(
+            id__in=ids[start:start + WRITE_CHUNK_SIZE]
+        ).values_list('id', flat=True))
+        PostStats.objects.bulk_create(
+            [PostStats(post_id=post_id) for post_id in chunk],
+            ignore_conflicts=True
+        )
+        by_delta = defaultdict(list)
+        for post_id in chunk:
+            by_delta[deltas[post_id]].append(post_id)
+        for delta, post_ids in by_delta.items():
+            PostStats.objects.filter(post_id__in=post_ids).update(
+                views=F('views') + delta)
+
+
+class ViewCounter:
+    """Per-process buffer of post views."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._deltas = Counter()
+        self._wake = threading.Event()
+        self._thread = None
+        self._atexit_registered = False
+
+    def add(self, post_id: int, count: int = 1) -> None:
+        with self._lock:
+            self._deltas[post_id] += count
+            size = len(self._deltas)
+        if settings.POST_VIEWS_BACKGROUND_FLUSH:
+            self.start()
+            if size >= settings.POST_VIEWS_FLUSH_SIZE:
+                self._wake.set()
+
+    def pending(self, post_id: int) -> int:
+        with self._lock:
+            return self._deltas.get(post_id, 0)
+
+    def drain(self) -> Counter:
+        with self._lock:
+            deltas, self._deltas = self._deltas, Counter()
+        return deltas
+
+    def flush(self) -> int:
+        """Write the pending views, return the number of posts written.
+
+        On a database error the views are put back into the buffer.
+        """
+        deltas = self.drain()
+        if not deltas:
+            return 0
+        try:
+            retry_on_locked(write_deltas)(deltas)
+        except DatabaseError:
+            logger.exception('Writing views of %d posts failed', len(deltas))
+            with self._lock:
+                self._deltas.update(deltas)
+            return 0
+        cache.delete_many([POST_VIEWS_KEY.format(pk) for pk in deltas])
+        return len(deltas)
+
+    def start(self) -> None:
+        """Start the flushing thread unless it runs in this process.
+
+        Checked on every view, a forked worker starts its own thread.
+        """
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._thread = threading.Thread(
+                target=self.run, name='post-views-flush', daemon=True)
+            self._thread.start()
+            if not self._atexit_registered:
+                atexit.register(self.flush)
+                self._atexit_registered = True
+
+    def run(self) -> None:
+        while True:
+            self._wake.wait(settings.POST_VIEWS_FLUSH_INTERVAL)
+            self._wake.clear()
+            close_old_connections()
+            self.flush()
+
+
+view_counter = ViewCounter()
+
+
+def record_view(post_id: int) -> None:
+    view_counter.add(post_id)
+
+
+def count_views(view_func):
+    """Record a view of the post page, revalidations answered with 304
+    included.
+
+    Goes outside conditional_page, which answers them without calling
+    the view.
+    """
+    @wraps(view_func)
+    def wrapped_view(request, post_id, *args, **kwargs):
+        response = view_func(request, post_id, *args, **kwargs)
+        if response.status_code in (200, 304):
+            record_view(post_id)
+        return response
+    return wrapped_view
+
+
+def get_views(post_ids: Iterable[int],
+              pending: bool = True) -> Dict[int, int]:
+    """Return views of the posts: cached counts plus pending views."""
+    keys = {post_id: POST_VIEWS_KEY.format(post_id) for post_id in post_ids}
+    cached = cache.get_many(keys.values())
+    views = {
+        post_id: cached[key] for post_id, key in keys.items() if key in cached
+    }
+    missing = [post_id for post_id in keys if post_id not in views]
+    if missing:
+        stored = dict(PostStats.objects.filter(
+            post_id__in=missing).values_list('post_id', 'views'))
+        fetched = {post_id: stored.get(post_id, 0) for post_id in missing}
+        cache.set_many(
+            {keys[post_id]: count for post_id, count in fetched.items()},
+            settings.POST_VIEWS_CACHE_TIMEOUT
+        )
+        views.update(fetched)
+    if not pending:
+        return views
+    return {
+        post_id: count + view_counter.pending(post_id)
+        for post_id, count in views.items()
+    }
+
+
+def attach_views(posts: Iterable) -> None:
+    """Set `views` of a page of posts."""
+    posts = [post for post in posts if post.id is not None]
+    views = get_views(post.id for post in posts)
+    for post in posts:
+        post.views = views[post.id]
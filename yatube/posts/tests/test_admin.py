@@ -0,0 +1,299 @@
+import os
+import shutil
+import tempfile
+from datetime import timedelta
+from unittest import mock
+
+from django.test import TestCase, Client, override_settings
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import Permission
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.conf import settings
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.utils import timezone
+
+from core.paginator import EstimatedCountPaginator
+from posts.models import Group, Post, Comment, Follow, ModerationJob
+from posts.moderation import claim_job, enqueue_job, run_pending_jobs
+
+
+TEMP_MEDIA_ROOT = tempfile.mkdtemp(dir=settings.BASE_DIR)
+User = get_user_model()
+
+
+class PostAdminTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.admin = User.objects.create_superuser(
+            username='PostAdminTests',
+            email='post-admin@example.com',
+            password='post-admin-password'
+        )
+        cls.group = Group.objects.create(
+            title='admin group',
+            slug='admin-group',
+            description='admin group description'
+        )
+        cls.post = Post.objects.create(
+            text='needle in the haystack',
+            author=cls.admin,
+            group=cls.group
+        )
+        Post.objects.create(
+            text='just another post',
+            author=cls.admin
+        )
+        Comment.objects.create(
+            text='needle comment',
+            author=cls.admin,
+            post=cls.post
+        )
+        cls.POST_CHANGELIST_URL = reverse('admin:posts_post_changelist')
+        cls.COMMENT_CHANGELIST_URL = reverse(
+            'admin:posts_comment_changelist')
+
+    def setUp(self):
+        cache.clear()
+        self.admin_client = Client()
+        self.admin_client.force_login(self.admin)
+
+    def test_changelist_queries_do_not_grow_with_rows(self):
+        """Число запросов списка постов не зависит от числа строк."""
+        self.admin_client.get(self.POST_CHANGELIST_URL)
+        with CaptureQueriesContext(connection) as before:
+            self.admin_client.get(self.POST_CHANGELIST_URL)
+        for _ in range(5):
+            Post.objects.create(
+                text='more posts',
+                author=self.admin,
+                group=self.group
+            )
+        with self.assertNumQueries(len(before)):
+            self.admin_client.get(self.POST_CHANGELIST_URL)
+
+    def test_search_uses_full_text_index(self):
+        """Поиск находит посты и комментарии по словам."""
+        cases = {
+            self.POST_CHANGELIST_URL: 'needle in the haystack',
+            self.COMMENT_CHANGELIST_URL: 'needle comment',
+        }
+        for url, expected in cases.items():
+            with self.subTest(url=url):
+                response = self.admin_client.get(url, {'q': 'needl'})
+                results = response.context['cl'].result_list
+                self.assertEqual([obj.text for obj in results], [expected])
+
+    def test_search_index_follows_updates(self):
+        """Изменённый текст поста попадает в индекс поиска."""
+        post = Post.objects.create(text='before edit', author=self.admin)
+        post.text = 'after edit'
+        post.save()
+
+        response = self.admin_client.get(
+            self.POST_CHANGELIST_URL, {'q': 'after'})
+
+        self.assertIn(post, response.context['cl'].result_list)
+
+
+class EstimatedCountPaginatorTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(
+            username='EstimatedCountPaginatorTests')
+        for _ in range(3):
+            Post.objects.create(text='estimated', author=cls.user)
+
+    def test_small_table_counted_exactly(self):
+        paginator = EstimatedCountPaginator(Post.objects.all(), 2)
+        self.assertEqual(paginator.count, 3)
+
+    def test_large_table_count_estimated(self):
+        """Большая таблица не считается через COUNT(*)."""
+        paginator = EstimatedCountPaginator(
+            Post.objects.all(), 2, threshold=1)
+        with self.assertNumQueries(2) as queries:
+            self.assertGreaterEqual(paginator.count, 3)
+        self.assertFalse(any(
+            'COUNT(' in query['sql'] for query in queries.captured_queries))
+
+    def test_overestimated_count_is_clamped(self):
+        """Завышенная оценка не даёт ссылок на пустые страницы."""
+        paginator = EstimatedCountPaginator(
+            Post.objects.all(), 2, threshold=1)
+        with mock.patch('core.paginator.estimate_count', return_value=100):
+            self.assertEqual(paginator.num_pages, 50)
+            page = paginator.page(2)
+        self.assertEqual(len(page), 1)
+        self.assertFalse(page.has_next())
+        self.assertEqual(paginator.num_pages, 2)
+        self.assertEqual(paginator.count, 3)
+
+    def test_filtered_queryset_counted_exactly(self):
+        paginator = EstimatedCountPaginator(
+            Post.objects.filter(author=self.user), 2, threshold=1)
+        self.assertEqual(paginator.count, 3)
+
+
+@override_settings(MEDIA_ROOT=TEMP_MEDIA_ROOT, MODERATION_CHUNK_SIZE=2)
+class ModerationJobTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.admin = User.objects.create_superuser(
+            username='ModerationJobTests',
+            email='moderation@example.com',
+            password='moderation-password'
+        )
+        self.author = User.objects.create_user(username='moderated_author')
+        self.group = Group.objects.create(
+            title='moderation group',
+            slug='moderation-group',
+            description='moderation group description'
+        )
+        small_gif = (
+            b'\x47\x49\x46\x38\x39\x61\x02\x00'
+            b'\x01\x00\x80\x00\x00\x00\x00\x00'
+            b'\xFF\xFF\xFF\x21\xF9\x04\x00\x00'
+            b'\x00\x00\x00\x2C\x00\x00\x00\x00'
+            b'\x02\x00\x01\x00\x00\x02\x02\x0C'
+            b'\x0A\x00\x3B'
+        )
+        self.image_post = Post.objects.create(
+            text='post with image',
+            author=self.author,
+            image=SimpleUploadedFile(
+                name='moderated.gif',
+                content=small_gif,
+                content_type='image/gif'
+            )
+        )
+        for _ in range(4):
+            post = Post.objects.create(text='moderated', author=self.author)
+            Comment.objects.create(
+                text='moderated comment', author=self.admin, post=post)
+        Follow.objects.create(user=self.author, author=self.admin)
+        self.admin_client = Client()
+        self.admin_client.force_login(self.admin)
+        self.POST_CHANGELIST_URL = reverse('admin:posts_post_changelist')
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(TEMP_MEDIA_ROOT, ignore_errors=True)
+        super().tearDownClass()
+
+    def run_action(self, action, **data):
+        ids = Post.objects.values_list('id', flat=True)
+        return self.admin_client.post(self.POST_CHANGELIST_URL, {
+            'action': action,
+            '_selected_action': list(ids),
+            **data,
+        })
+
+    def test_action_only_enqueues_job(self):
+        """Действие админки создаёт задачу, не удаляя посты."""
+        posts_count = Post.objects.count()
+
+        response = self.run_action('delete_in_background')
+
+        job = ModerationJob.objects.get()
+        self.assertRedirects(response, reverse(
+            'admin:posts_moderationjob_progress', args=(job.id,)))
+        self.assertEqual(Post.objects.count(), posts_count)
+        self.assertEqual(job.total, posts_count)
+
+    def test_delete_job_removes_posts_comments_and_images(self):
+        """Фоновое удаление удаляет посты, комментарии и картинки."""
+        image_path = self.image_post.image.path
+        self.run_action('delete_in_background')
+
+        run_pending_jobs()
+
+        job = ModerationJob.objects.get()
+        self.assertEqual(job.status, ModerationJob.DONE)
+        self.assertEqual(job.progress, 100)
+        self.assertFalse(Post.objects.exists())
+        self.assertFalse(Comment.objects.exists())
+        self.assertFalse(os.path.exists(image_path))
+
+    def test_move_job_changes_group(self):
+        """Фоновый перенос меняет группу постов."""
+        self.run_action('move_to_group', group=self.group.id)
+
+        run_pending_jobs()
+
+        self.assertFalse(Post.objects.exclude(group=self.group).exists())
+
+    def test_purge_job_removes_user_content(self):
+        """Очистка удаляет посты, комментарии и подписки автора."""
+        self.run_action('purge_authors')
+
+        run_pending_jobs()
+
+        self.assertFalse(Post.objects.filter(author=self.author).exists())
+        self.assertFalse(Follow.objects.filter(user=self.author).exists())
+        self.assertTrue(User.objects.filter(id=self.author.id).exists())
+
+    def test_progress_page(self):
+        """Страница прогресса задачи доступна администратору."""
+        self.run_action('delete_in_background')
+        job = ModerationJob.objects.get()
+
+        response = self.admin_client.get(reverse(
+            'admin:posts_moderationjob_progress', args=(job.id,)))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, '0 из 5')
+
+    def test_view_only_staff_cannot_run_actions(self):
+        """Сотрудник с правом просмотра не ставит задачи модерации."""
+        viewer = User.objects.create_user(username='viewer', is_staff=True)
+        viewer.user_permissions.add(
+            Permission.objects.get(codename='view_post'))
+        self.admin_client.force_login(viewer)
+        for action in ('delete_in_background', 'purge_authors',
+                       'move_to_group'):
+            with self.subTest(action=action):
+                self.run_action(action, group=self.group.id)
+        self.assertFalse(ModerationJob.objects.exists())
+
+    def test_progress_page_requires_view_permission(self):
+        job = enqueue_job(ModerationJob.DELETE_FOLLOWS, [])
+        staff = User.objects.create_user(username='staff', is_staff=True)
+        self.admin_client.force_login(staff)
+        response = self.admin_client.get(reverse(
+            'admin:posts_moderationjob_progress', args=(job.id,)))
+        self.assertEqual(response.status_code, 403)
+
+    def test_move_to_unknown_group_is_rejected(self):
+        self.run_action('move_to_group', group=0)
+        self.assertFalse(ModerationJob.objects.exists())
+
+    def test_job_is_claimed_once(self):
+        """Задачу берёт в работу только один исполнитель."""
+        job = enqueue_job(ModerationJob.DELETE_FOLLOWS, [])
+        self.assertTrue(claim_job(job))
+        self.assertFalse(claim_job(job))
+        self.assertEqual(run_pending_jobs(), 0)
+
+    @override_settings(MODERATION_JOB_TIMEOUT=60)
+    def test_stale_running_job_is_taken_over(self):
+        job = enqueue_job(ModerationJob.DELETE_FOLLOWS, [])
+        claim_job(job)
+        ModerationJob.objects.filter(id=job.id).update(
+            heartbeat=timezone.now() - timedelta(minutes=2))
+        self.assertEqual(run_pending_jobs(), 1)
+        job.refresh_from_db()
+        self.assertEqual(job.status, ModerationJob.DONE)
+
+    def test_running_job_without_heartbeat_is_taken_over(self):
+        """Задача, зависшая до появления heartbeat, не остаётся навсегда."""
+        job = enqueue_job(ModerationJob.DELETE_FOLLOWS, [])
+        ModerationJob.objects.filter(id=job.id).update(
+            status=ModerationJob.RUNNING, heartbeat=None)
+        self.assertEqual(run_pending_jobs(), 1)
+        job.refresh_from_db()
+        self.assertEqual(job.status, ModerationJob.DONE)
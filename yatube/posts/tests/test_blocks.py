@@ -0,0 +1,145 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from posts.blocks import exclude_hidden, get_block_lists
+from posts.models import Block, Comment, Follow, Group, Mute, Post
+
+
+User = get_user_model()
+
+
+class BlocksTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='blocks_reader')
+        self.blocked = User.objects.create_user(username='blocks_blocked')
+        self.muted = User.objects.create_user(username='blocks_muted')
+        self.author = User.objects.create_user(username='blocks_author')
+        self.group = Group.objects.create(
+            title='Группа', slug='blocks', description='Описание')
+        self.posts = {
+            author: Post.objects.create(
+                text=f'post of {author.username}', author=author,
+                group=self.group)
+            for author in (self.blocked, self.muted, self.author)
+        }
+        self.client.force_login(self.user)
+
+    def get_shown(self, url):
+        response = self.client.get(url)
+        return {post.author for post in response.context['page_obj']}
+
+    def test_feeds_hide_blocked_and_muted(self):
+        """Заблокированные и скрытые авторы пропадают из лент."""
+        for author in (self.blocked, self.muted, self.author):
+            Follow.objects.create(user=self.user, author=author)
+        self.client.post(reverse(
+            'posts:profile_block', args=(self.blocked.username,)))
+        self.client.post(reverse(
+            'posts:profile_mute', args=(self.muted.username,)))
+        for url in (
+            reverse('posts:index'),
+            reverse('posts:group_posts', args=(self.group.slug,)),
+            reverse('posts:follow_index'),
+        ):
+            with self.subTest(url=url):
+                self.assertEqual(self.get_shown(url), {self.author})
+        self.client.post(reverse(
+            'posts:profile_unmute', args=(self.muted.username,)))
+        self.assertEqual(
+            self.get_shown(reverse('posts:index')), {self.muted, self.author})
+
+    def test_block_lists_are_cached(self):
+        Block.objects.create(user=self.user, author=self.blocked)
+        Mute.objects.create(user=self.user, author=self.muted)
+        self.assertEqual(get_block_lists(self.user.id), {
+            'blocked': {self.blocked.id}, 'muted': {self.muted.id}})
+        with self.assertNumQueries(0):
+            get_block_lists(self.user.id)
+        Mute.objects.filter(user=self.user).delete()
+        self.assertEqual(get_block_lists(self.user.id)['muted'], set())
+
+    def test_nobody_hidden_keeps_query(self):
+        posts = Post.objects.all()
+        self.assertIs(exclude_hidden(posts, self.user), posts)
+
+    @override_settings(HIDDEN_AUTHORS_INLINE_LIMIT=1)
+    def test_long_lists_use_subquery(self):
+        Block.objects.create(user=self.user, author=self.blocked)
+        Mute.objects.create(user=self.user, author=self.muted)
+        posts = exclude_hidden(Post.objects.all(), self.user)
+        self.assertIn('posts_block', str(posts.query))
+        self.assertEqual(
+            {post.author for post in posts}, {self.author})
+
+    def test_block_drops_follows(self):
+        Follow.objects.create(user=self.user, author=self.blocked)
+        Follow.objects.create(user=self.blocked, author=self.user)
+        self.client.post(reverse(
+            'posts:profile_block', args=(self.blocked.username,)))
+        self.assertFalse(Follow.objects.exists())
+
+    def test_blocked_user_cannot_follow_or_comment(self):
+        """Заблокированный пользователь не подписывается и не комментирует."""
+        Block.objects.create(user=self.author, author=self.user)
+        response = self.client.get(reverse(
+            'posts:profile_follow', args=(self.author.username,)))
+        self.assertEqual(response.status_code, 403)
+        response = self.client.post(
+            reverse('posts:add_comment',
+                    args=(self.posts[self.author].id,)),
+            {'text': 'комментарий'}
+        )
+        self.assertEqual(response.status_code, 403)
+        self.assertFalse(Follow.objects.exists())
+        self.assertFalse(Comment.objects.exists())
+
+    def test_block_and_mute_require_post(self):
+        """Блокировка и скрытие не меняются по GET-запросу."""
+        Block.objects.create(user=self.user, author=self.blocked)
+        Mute.objects.create(user=self.user, author=self.muted)
+        for name, author in (
+            ('posts:profile_block', self.author),
+            ('posts:profile_unblock', self.blocked),
+            ('posts:profile_mute', self.author),
+            ('posts:profile_unmute', self.muted),
+        ):
+            with self.subTest(name=name):
+                response = self.client.get(
+                    reverse(name, args=(author.username,)))
+                self.assertEqual(response.status_code, 405)
+        self.assertEqual(
+            get_block_lists(self.user.id),
+            {'blocked': {self.blocked.id}, 'muted': {self.muted.id}})
+
+    def test_profile_forms_post_with_csrf(self):
+        response = self.client.get(
+            reverse('posts:profile', args=(self.author.username,)))
+        for name in ('posts:profile_block', 'posts:profile_mute'):
+            with self.subTest(name=name):
+                self.assertContains(
+                    response, 'method="post" action="{}"'.format(
+                        reverse(name, args=(self.author.username,))))
+        self.assertContains(response, 'csrfmiddlewaretoken')
+
+    def test_blocked_user_sees_no_comment_form(self):
+        """Заблокированному автором пользователю форма комментария не видна."""
+        post = self.posts[self.author]
+        url = reverse('posts:add_comment', args=(post.id,))
+        for cached in (True, False):
+            with self.subTest(cached=cached), \
+                    self.settings(POST_DETAIL_CACHE=cached):
+                response = self.client.get(post.get_absolute_url())
+                self.assertContains(response, f'action="{url}"')
+                block = Block.objects.create(
+                    user=self.author, author=self.user)
+                response = self.client.get(post.get_absolute_url())
+                self.assertNotContains(response, f'action="{url}"')
+                block.delete()
+
+    def test_cannot_block_self(self):
+        response = self.client.post(reverse(
+            'posts:profile_block', args=(self.user.username,)))
+        self.assertEqual(response.status_code, 403)
@@ -0,0 +1,143 @@
+import shutil
+import tempfile
+from io import StringIO
+from types import SimpleNamespace
+from unittest import mock
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from posts.cache import get_groups
+from posts.feed import feed_posts
+from posts.models import FeedItem, Group, Post
+from posts.thumbnails import render_pending_thumbnails
+
+
+TEMP_MEDIA_ROOT = tempfile.mkdtemp(dir=settings.BASE_DIR)
+User = get_user_model()
+
+SMALL_GIF = (
+    b'\x47\x49\x46\x38\x39\x61\x02\x00'
+    b'\x01\x00\x80\x00\x00\x00\x00\x00'
+    b'\xFF\xFF\xFF\x21\xF9\x04\x00\x00'
+    b'\x00\x00\x00\x2C\x00\x00\x00\x00'
+    b'\x02\x00\x01\x00\x00\x02\x02\x0C'
+    b'\x0A\x00\x3B'
+)
+
+
+@override_settings(MEDIA_ROOT=TEMP_MEDIA_ROOT)
+class FeedItemTests(TestCase):
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(TEMP_MEDIA_ROOT, ignore_errors=True)
+        super().tearDownClass()
+
+    def setUp(self):
+        cache.clear()
+        # Миниатюра подменяется: тест проверяет ленту, а не движок картинок.
+        thumbnail = SimpleNamespace(
+            url='/media/cache/small.gif', size=(960, 339),
+            width=960, height=339)
+        patcher = mock.patch(
+            'posts.thumbnails.get_thumbnail', return_value=thumbnail)
+        self.get_thumbnail = patcher.start()
+        self.addCleanup(patcher.stop)
+        self.user = User.objects.create_user(
+            username='feed_author', first_name='Feed', last_name='Author')
+        self.group = Group.objects.create(
+            title='feed group', slug='feed-group', description='feed')
+        self.post = Post.objects.create(
+            text='feed post',
+            author=self.user,
+            group=self.group,
+            image=SimpleUploadedFile('small.gif', SMALL_GIF, 'image/gif')
+        )
+
+    def test_feed_item_follows_post(self):
+        """Элемент ленты создаётся, меняется и удаляется вместе с постом."""
+        item = FeedItem.objects.get(post=self.post)
+        self.assertEqual(item.author_username, 'feed_author')
+        self.assertEqual(item.thumbnail_status, FeedItem.THUMBNAIL_PENDING)
+        self.get_thumbnail.assert_not_called()
+
+        self.assertEqual(render_pending_thumbnails(), 1)
+        item = FeedItem.objects.get(post=self.post)
+        self.assertEqual(item.thumbnail_status, FeedItem.THUMBNAIL_READY)
+        self.assertTrue(item.thumbnail_url)
+        self.assertEqual(
+            (item.thumbnail_width, item.thumbnail_height), (960, 339))
+        self.assertEqual(render_pending_thumbnails(), 0)
+
+        self.post.text = 'edited feed post'
+        self.post.save()
+        self.assertEqual(
+            FeedItem.objects.get(post=self.post).text, 'edited feed post')
+
+        self.post.delete()
+        self.assertFalse(FeedItem.objects.exists())
+
+    def test_failed_thumbnail_is_not_retried(self):
+        """Миниатюра с ошибкой не рендерится заново на каждой странице."""
+        self.get_thumbnail.side_effect = OSError
+        render_pending_thumbnails()
+        item = FeedItem.objects.get(post=self.post)
+        self.assertEqual(item.thumbnail_status, FeedItem.THUMBNAIL_FAILED)
+        self.get_thumbnail.reset_mock()
+        self.client.get(reverse('posts:index'))
+        self.assertEqual(render_pending_thumbnails(), 0)
+        self.get_thumbnail.assert_not_called()
+
+    def test_author_rename_updates_feed(self):
+        self.user.first_name = 'Renamed'
+        self.user.save()
+        item = FeedItem.objects.get(post=self.post)
+        self.assertEqual(item.author_first_name, 'Renamed')
+
+    def test_feed_yields_posts(self):
+        """Лента отдаёт посты с автором, группой и миниатюрой."""
+        render_pending_thumbnails()
+        get_groups()
+        with self.assertNumQueries(1):
+            post = feed_posts().get()
+            self.assertEqual(post, self.post)
+            self.assertEqual(post.author.get_full_name(), 'Feed Author')
+            self.assertEqual(post.group, self.group)
+        self.assertEqual(post.thumbnail['width'], 960)
+
+    def test_feed_pages_read_single_table(self):
+        urls = (
+            reverse('posts:index'),
+            reverse('posts:group_posts', kwargs={'slug': self.group.slug}),
+            reverse('posts:profile', kwargs={'username': 'feed_author'}),
+        )
+        for url in urls:
+            with self.subTest(url=url):
+                with CaptureQueriesContext(connection) as queries:
+                    response = self.client.get(url)
+                self.assertContains(response, 'feed post')
+                page_queries = [
+                    query['sql'] for query in queries.captured_queries
+                    if 'posts_feeditem' in query['sql']
+                    and '"text"' in query['sql']
+                ]
+                self.assertEqual(len(page_queries), 1)
+                self.assertNotIn('JOIN', page_queries[0])
+
+    def test_rebuild_feed(self):
+        Post.objects.bulk_create([
+            Post(text='bulk post', author=self.user) for _ in range(3)])
+        FeedItem.objects.filter(post=self.post).update(text='stale')
+
+        call_command('rebuild_feed', chunk_size=2, stdout=StringIO())
+
+        self.assertEqual(FeedItem.objects.count(), 4)
+        self.assertEqual(
+            FeedItem.objects.get(post=self.post).text, 'feed post')
@@ -0,0 +1,158 @@
+import os
+import shutil
+import tempfile
+from io import StringIO
+from types import SimpleNamespace
+from unittest import mock
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.files.storage import FileSystemStorage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import OperationalError
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.urls import reverse
+
+from posts.images import backfill_image_meta, save_with_image
+from posts.models import FeedItem, Post
+from posts.thumbnails import render_pending_thumbnails
+
+
+TEMP_MEDIA_ROOT = tempfile.mkdtemp(dir=settings.BASE_DIR)
+User = get_user_model()
+
+SMALL_GIF = (
+    b'\x47\x49\x46\x38\x39\x61\x02\x00'
+    b'\x01\x00\x80\x00\x00\x00\x00\x00'
+    b'\xFF\xFF\xFF\x21\xF9\x04\x00\x00'
+    b'\x00\x00\x00\x2C\x00\x00\x00\x00'
+    b'\x02\x00\x01\x00\x00\x02\x02\x0C'
+    b'\x0A\x00\x3B'
+)
+
+
+@override_settings(MEDIA_ROOT=TEMP_MEDIA_ROOT)
+class PostImageMetaTests(TestCase):
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(TEMP_MEDIA_ROOT, ignore_errors=True)
+        super().tearDownClass()
+
+    def setUp(self):
+        cache.clear()
+        thumbnail = SimpleNamespace(
+            url='/media/cache/small.gif', size=(960, 339),
+            width=960, height=339)
+        patcher = mock.patch(
+            'posts.thumbnails.get_thumbnail', return_value=thumbnail)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.user = User.objects.create_user(username='image_author')
+        self.post = Post.objects.create(
+            text='image post',
+            author=self.user,
+            image=SimpleUploadedFile('small.gif', SMALL_GIF, 'image/gif')
+        )
+
+    def test_upload_stores_meta(self):
+        """Размеры, вес и цвет картинки сохраняются при загрузке."""
+        post = Post.objects.get(pk=self.post.pk)
+        self.assertEqual((post.image_width, post.image_height), (2, 1))
+        self.assertEqual(post.image_size, len(SMALL_GIF))
+        self.assertRegex(post.image_color, r'^#[0-9a-f]{6}$')
+        self.assertEqual(
+            FeedItem.objects.get(post=post).image_color, post.image_color)
+
+        post.image = None
+        post.save()
+        post.refresh_from_db()
+        self.assertIsNone(post.image_width)
+        self.assertEqual(post.image_color, '')
+
+    def test_backfill_image_meta(self):
+        Post.objects.update(
+            image_width=None, image_height=None, image_size=None,
+            image_color='')
+        Post.objects.create(
+            text='missing image', author=self.user, image='posts/none.gif')
+
+        self.assertEqual(
+            backfill_image_meta(Post.objects.all(), workers=2), 2)
+
+        post = Post.objects.get(pk=self.post.pk)
+        self.assertEqual((post.image_width, post.image_height), (2, 1))
+        self.assertTrue(post.image_color)
+        missing = Post.objects.get(text='missing image')
+        self.assertIsNone(missing.image_width)
+
+    def test_backfill_command_updates_feed(self):
+        """Команда backfill_image_meta заполняет поля и обновляет ленту."""
+        Post.objects.update(
+            image_width=None, image_height=None, image_size=None,
+            image_color='')
+        FeedItem.objects.update(image_color='')
+
+        call_command('backfill_image_meta', '--missing', stdout=StringIO())
+
+        post = Post.objects.get(pk=self.post.pk)
+        self.assertEqual((post.image_width, post.image_height), (2, 1))
+        self.assertEqual(
+            FeedItem.objects.get(post=post).image_color, post.image_color)
+
+    def test_feed_renders_without_storage(self):
+        """Карточки ленты не обращаются к хранилищу картинок."""
+        render_pending_thumbnails()
+        with mock.patch.object(
+                FileSystemStorage, 'open', side_effect=AssertionError), \
+                mock.patch.object(
+                    FileSystemStorage, 'exists', side_effect=AssertionError):
+            response = self.client.get(reverse('posts:index'))
+        self.assertContains(response, 'width="960" height="339"')
+        self.assertContains(response, 'loading="lazy"')
+        self.assertContains(
+            response, f'background-color: {self.post.image_color}')
+
+
+@override_settings(MEDIA_ROOT=TEMP_MEDIA_ROOT, DB_WRITE_RETRY_DELAY=0)
+class SaveWithImageTests(TransactionTestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='save_with_image')
+        self.posts_dir = os.path.join(TEMP_MEDIA_ROOT, 'posts')
+        shutil.rmtree(self.posts_dir, ignore_errors=True)
+
+    def tearDown(self):
+        shutil.rmtree(self.posts_dir, ignore_errors=True)
+
+    def locked_save(self, failures):
+        do_insert = Post._do_insert
+        calls = []
+
+        def side_effect(post, *args, **kwargs):
+            calls.append(post)
+            if len(calls) <= failures:
+                raise OperationalError('database is locked')
+            return do_insert(post, *args, **kwargs)
+        return mock.patch.object(
+            Post, '_do_insert', autospec=True, side_effect=side_effect)
+
+    def get_post(self):
+        image = SimpleUploadedFile('retried.gif', SMALL_GIF, 'image/gif')
+        return Post(text='retried', author=self.user, image=image)
+
+    def test_retried_write_stores_image_once(self):
+        """Повтор записи при блокировке не сохраняет картинку дважды."""
+        post = self.get_post()
+        with self.locked_save(1):
+            save_with_image(post)
+        self.assertEqual(len(os.listdir(self.posts_dir)), 1)
+        post = Post.objects.get(pk=post.pk)
+        self.assertEqual((post.image_width, post.image_height), (2, 1))
+
+    @override_settings(DB_WRITE_RETRIES=1)
+    def test_failed_write_removes_image(self):
+        with self.locked_save(2), self.assertRaises(OperationalError):
+            save_with_image(self.get_post())
+        self.assertEqual(os.listdir(self.posts_dir), [])
+        self.assertFalse(Post.objects.exists())
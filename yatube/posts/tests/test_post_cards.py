@@ -0,0 +1,97 @@
+import os
+import re
+from datetime import datetime, timezone
+
+from django.test import TestCase, RequestFactory
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import AnonymousUser
+from django.core.cache import cache
+from django.template.loader import render_to_string
+
+from posts.models import Group, Post
+from posts.utils import get_page_obj
+
+
+GOLDEN_DIR = os.path.join(os.path.dirname(__file__), 'golden')
+# UPDATE_GOLDEN=1 python manage.py test posts.tests.test_post_cards
+UPDATE_GOLDEN = os.getenv('UPDATE_GOLDEN') == '1'
+User = get_user_model()
+
+
+class PostCardsGoldenTests(TestCase):
+    """Страницы с карточками постов совпадают с эталонным HTML.
+
+    Пробельные символы между тегами не сравниваются.
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(
+            username='golden_author',
+            first_name='Голден',
+            last_name='Автор'
+        )
+        cls.group = Group.objects.create(
+            title='Golden group',
+            slug='golden-group',
+            description='Golden group description'
+        )
+        texts = ('первый <пост>', 'второй пост', 'третий пост без группы')
+        for number, text in enumerate(texts, start=1):
+            post = Post.objects.create(
+                id=900 + number,
+                text=text,
+                author=cls.author,
+                group=cls.group if number < 3 else None
+            )
+            Post.objects.filter(id=post.id).update(
+                created=datetime(2022, 10, number, tzinfo=timezone.utc))
+
+    def setUp(self):
+        cache.clear()
+        self.request = RequestFactory().get('/', {'page': 1})
+        self.request.user = AnonymousUser()
+
+    def get_page_obj(self, posts):
+        return get_page_obj(self.request, posts.order_by('-id'), 2)
+
+    def assertGolden(self, name, html):
+        path = os.path.join(GOLDEN_DIR, name)
+        if UPDATE_GOLDEN:
+            with open(path, 'w', encoding='utf-8') as golden:
+                golden.write(html)
+        with open(path, encoding='utf-8') as golden:
+            expected = golden.read()
+        self.assertEqual(
+            re.sub(r'\s+', ' ', html), re.sub(r'\s+', ' ', expected))
+
+    def render(self, template_name, context):
+        return render_to_string(
+            template_name, {**context, 'year': 2022}, self.request)
+
+    def test_index_cards(self):
+        html = self.render('posts/index.html', {
+            'page_obj': self.get_page_obj(
+                Post.objects.select_related('author', 'group')),
+            'index': True,
+        })
+        self.assertGolden('index.html', html)
+
+    def test_group_list_cards(self):
+        html = self.render('posts/group_list.html', {
+            'group': self.group,
+            'page_obj': self.get_page_obj(
+                self.group.posts.select_related('author')),
+        })
+        self.assertGolden('group_list.html', html)
+
+    def test_profile_cards(self):
+        html = self.render('posts/profile.html', {
+            'author': self.author,
+            'posts_count': 3,
+            'page_obj': self.get_page_obj(
+                self.author.posts.select_related('group')),
+            'following': False,
+        })
+        self.assertGolden('profile.html', html)
@@ -0,0 +1,146 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from posts.models import Post, Reaction, ReactionCounter
+from posts.reactions import (
+    add_reaction, attach_reactions, get_reactions, remove_reaction
+)
+
+
+User = get_user_model()
+
+
+class ReactionsTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.author = User.objects.create_user(username='reactions_author')
+        self.user = User.objects.create_user(username='reactions_reader')
+        self.post = Post.objects.create(text='post', author=self.author)
+        self.other = Post.objects.create(text='other', author=self.author)
+
+    def get_counts(self, post, user=None):
+        return {
+            reaction['kind']: (reaction['count'], reaction['mine'])
+            for reaction in get_reactions([post.id], user)[post.id]
+        }
+
+    def test_reactions_are_idempotent(self):
+        """Повторная реакция и повторная отмена ничего не меняют."""
+        self.assertTrue(add_reaction(self.user, self.post.id, Reaction.LIKE))
+        self.assertFalse(add_reaction(self.user, self.post.id, Reaction.LIKE))
+        self.assertEqual(
+            self.get_counts(self.post, self.user)[Reaction.LIKE], (1, True))
+        self.assertTrue(
+            remove_reaction(self.user, self.post.id, Reaction.LIKE))
+        self.assertFalse(
+            remove_reaction(self.user, self.post.id, Reaction.LIKE))
+        self.assertEqual(
+            self.get_counts(self.post, self.user)[Reaction.LIKE], (0, False))
+
+    @override_settings(REACTION_COUNTER_SHARDS=4)
+    def test_count_is_sum_of_shards(self):
+        """Счётчик реакции складывается из всех его строк."""
+        for number in range(20):
+            user = User.objects.create_user(username=f'reader_{number}')
+            add_reaction(user, self.post.id, Reaction.LOVE)
+        shards = ReactionCounter.objects.filter(post=self.post)
+        self.assertGreater(shards.count(), 1)
+        self.assertLessEqual(shards.count(), 4)
+        self.assertEqual(
+            self.get_counts(self.post)[Reaction.LOVE], (20, False))
+
+    def test_page_counts_take_one_query(self):
+        add_reaction(self.user, self.post.id, Reaction.LIKE)
+        add_reaction(self.author, self.other.id, Reaction.SAD)
+        posts = list(Post.objects.order_by('id'))
+        with self.assertNumQueries(1):
+            attach_reactions(posts)
+        self.assertEqual(
+            [[(reaction['kind'], reaction['count'])
+              for reaction in post.reaction_counts] for post in posts],
+            [[(Reaction.LIKE, 1)], [(Reaction.SAD, 1)]]
+        )
+        with self.assertNumQueries(0):
+            attach_reactions(posts)
+
+    def test_page_flags_take_one_query(self):
+        """Отметки «я отреагировал» для страницы берутся одним запросом."""
+        add_reaction(self.user, self.post.id, Reaction.LIKE)
+        add_reaction(self.author, self.other.id, Reaction.LIKE)
+        posts = list(Post.objects.order_by('id'))
+        attach_reactions(posts)
+        with self.assertNumQueries(1):
+            attach_reactions(posts, self.user)
+        self.assertEqual(
+            [post.reaction_counts[0]['mine'] for post in posts],
+            [True, False]
+        )
+
+    @override_settings(REACTION_COUNTER_SHARDS=4)
+    def test_deleted_user_leaves_counts(self):
+        """Реакции удалённого пользователя пропадают из счётчиков."""
+        for kind in (Reaction.LIKE, Reaction.SAD):
+            add_reaction(self.user, self.post.id, kind)
+        add_reaction(self.author, self.post.id, Reaction.LIKE)
+        self.get_counts(self.post)
+        self.user.delete()
+        counts = self.get_counts(self.post)
+        self.assertEqual(counts[Reaction.LIKE], (1, False))
+        self.assertEqual(counts[Reaction.SAD], (0, False))
+
+    def test_deleted_post_leaves_no_counters(self):
+        add_reaction(self.user, self.post.id, Reaction.LIKE)
+        self.post.delete()
+        self.assertFalse(
+            ReactionCounter.objects.filter(post_id=self.post.id).exists())
+
+    def test_reaction_drops_cached_counts(self):
+        counts = self.get_counts(self.post)
+        self.assertEqual(counts[Reaction.LAUGH], (0, False))
+        add_reaction(self.user, self.post.id, Reaction.LAUGH)
+        counts = self.get_counts(self.post)
+        self.assertEqual(counts[Reaction.LAUGH], (1, False))
+
+
+class ReactionViewsTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.author = User.objects.create_user(username='reactions_author')
+        self.user = User.objects.create_user(username='reactions_reader')
+        self.post = Post.objects.create(text='post', author=self.author)
+        self.react_url = reverse(
+            'posts:post_react', args=(self.post.id, Reaction.LIKE))
+        self.unreact_url = reverse(
+            'posts:post_unreact', args=(self.post.id, Reaction.LIKE))
+
+    def test_react_requires_login_and_post(self):
+        response = self.client.post(self.react_url)
+        self.assertRedirects(
+            response, f'{reverse("users:login")}?next={self.react_url}')
+        self.client.force_login(self.user)
+        self.assertEqual(self.client.get(self.react_url).status_code, 405)
+        self.assertFalse(Reaction.objects.exists())
+
+    def test_unknown_kind_is_not_found(self):
+        self.client.force_login(self.user)
+        for name in ('posts:post_react', 'posts:post_unreact'):
+            with self.subTest(name=name):
+                response = self.client.post(
+                    reverse(name, args=(self.post.id, 'angry')))
+                self.assertEqual(response.status_code, 404)
+
+    def test_react_and_unreact(self):
+        """Реакция ставится и снимается со страницы поста."""
+        self.client.force_login(self.user)
+        response = self.client.post(self.react_url)
+        self.assertRedirects(response, self.post.get_absolute_url())
+        self.assertTrue(Reaction.objects.filter(
+            user=self.user, post=self.post, kind=Reaction.LIKE).exists())
+        response = self.client.get(self.post.get_absolute_url())
+        self.assertContains(response, f'action="{self.unreact_url}"')
+        self.client.post(self.unreact_url)
+        self.assertFalse(Reaction.objects.exists())
+        response = self.client.get(self.post.get_absolute_url())
+        self.assertContains(response, f'action="{self.react_url}"')
@@ -0,0 +1,104 @@
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import DatabaseError
+from django.test import TestCase
+from django.urls import reverse
+
+from posts.models import Post, PostStats, Reaction
+from posts.reactions import add_reaction
+from posts.stats import ViewCounter, get_views, record_view, view_counter
+
+
+User = get_user_model()
+
+
+class PostViewsTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        view_counter.drain()
+        self.user = User.objects.create_user(username='stats_author')
+        self.first = Post.objects.create(text='first', author=self.user)
+        self.second = Post.objects.create(text='second', author=self.user)
+
+    def get_stored(self):
+        return dict(PostStats.objects.values_list('post_id', 'views'))
+
+    def test_views_are_flushed_in_batches(self):
+        """Просмотры копятся в памяти и записываются одной пачкой."""
+        for _ in range(3):
+            record_view(self.first.id)
+        record_view(self.second.id)
+        self.assertFalse(PostStats.objects.exists())
+
+        with self.assertNumQueries(4):
+            self.assertEqual(view_counter.flush(), 2)
+        self.assertEqual(
+            self.get_stored(), {self.first.id: 3, self.second.id: 1})
+
+        record_view(self.first.id)
+        view_counter.flush()
+        self.assertEqual(self.get_stored()[self.first.id], 4)
+        self.assertEqual(view_counter.flush(), 0)
+
+    def test_deleted_posts_are_skipped(self):
+        record_view(self.first.id)
+        self.first.delete()
+        view_counter.flush()
+        self.assertFalse(PostStats.objects.exists())
+
+    def test_failed_flush_keeps_views(self):
+        record_view(self.first.id)
+        with mock.patch(
+                'posts.stats.write_deltas', side_effect=DatabaseError):
+            self.assertEqual(view_counter.flush(), 0)
+        self.assertEqual(view_counter.pending(self.first.id), 1)
+
+    def test_views_include_pending(self):
+        """Счётчик на странице учитывает ещё не записанные просмотры."""
+        PostStats.objects.create(post=self.first, views=10)
+        record_view(self.first.id)
+        self.assertEqual(
+            get_views([self.first.id, self.second.id]),
+            {self.first.id: 11, self.second.id: 0}
+        )
+        view_counter.flush()
+        with self.assertNumQueries(1):
+            self.assertEqual(get_views([self.first.id]), {self.first.id: 11})
+
+    def test_post_detail_counts_views(self):
+        url = reverse('posts:post_detail', kwargs={'post_id': self.first.id})
+        self.client.get(url)
+        self.client.get(url)
+        self.assertEqual(view_counter.pending(self.first.id), 2)
+        response = self.client.get(reverse('posts:index'))
+        self.assertContains(response, 'Просмотров: 2')
+
+    def test_revalidated_page_is_counted(self):
+        """Ответ 304 на повторный запрос тоже считается просмотром."""
+        url = reverse('posts:post_detail', kwargs={'post_id': self.first.id})
+        etag = self.client.get(url)['ETag']
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(view_counter.pending(self.first.id), 2)
+
+    def test_etag_follows_counters(self):
+        """ETag страницы поста меняется вместе со счётчиками."""
+        url = reverse('posts:post_detail', kwargs={'post_id': self.first.id})
+        etag = self.client.get(url)['ETag']
+        view_counter.flush()
+        self.assertNotEqual(self.client.get(url)['ETag'], etag)
+        etag = self.client.get(url)['ETag']
+        view_counter.drain()
+        add_reaction(self.user, self.first.id, Reaction.LIKE)
+        self.assertNotEqual(self.client.get(url)['ETag'], etag)
+
+    def test_exit_flush_registered_once(self):
+        counter = ViewCounter()
+        with mock.patch.object(counter, 'run'), \
+                mock.patch('posts.stats.atexit.register') as register:
+            counter.start()
+            counter._thread.join()
+            counter.start()
+        self.assertEqual(register.call_count, 1)
@@ -0,0 +1,62 @@
+from types import SimpleNamespace
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase
+from sorl.thumbnail import default
+
+from posts.models import Post
+from posts.thumbnails import attach_thumbnails, get_thumbnail_file
+
+
+User = get_user_model()
+
+
+class AttachThumbnailsTests(TestCase):
+    def setUp(self):
+        self.rendered = SimpleNamespace(
+            url='/media/cache/rendered.gif', size=(960, 339),
+            width=960, height=339)
+        patcher = mock.patch(
+            'posts.thumbnails.get_thumbnail', return_value=self.rendered)
+        self.get_thumbnail = patcher.start()
+        self.addCleanup(patcher.stop)
+        user = User.objects.create_user(username='thumbnail_author')
+        for number in range(3):
+            post = Post.objects.create(
+                text=f'post {number}', author=user,
+                image=f'posts/stored_{number}.gif')
+            thumbnail = get_thumbnail_file(post.image)
+            thumbnail.set_size((960, 339))
+            default.kvstore.set(thumbnail)
+        Post.objects.create(
+            text='new image', author=user, image='posts/new.gif')
+        Post.objects.create(text='no image', author=user)
+        self.get_thumbnail.reset_mock()
+
+    def get_posts(self):
+        return list(Post.objects.order_by('id'))
+
+    def test_page_is_resolved_in_one_lookup(self):
+        """Миниатюры страницы ищутся одним запросом к хранилищу sorl."""
+        cache.clear()
+        posts = self.get_posts()
+        with self.assertNumQueries(1):
+            attach_thumbnails(posts[:3])
+        self.assertEqual(
+            [post.thumbnail['width'] for post in posts[:3]], [960] * 3)
+        self.assertTrue(posts[0].thumbnail['url'].startswith('/media/cache/'))
+        self.get_thumbnail.assert_not_called()
+
+        posts = self.get_posts()
+        with self.assertNumQueries(0):
+            attach_thumbnails(posts[:3])
+
+    def test_missing_thumbnails_are_not_rendered(self):
+        """Недостающие миниатюры не рендерятся во время запроса."""
+        posts = self.get_posts()
+        attach_thumbnails(posts)
+        self.get_thumbnail.assert_not_called()
+        self.assertIsNone(posts[3].thumbnail)
+        self.assertIsNone(posts[4].thumbnail)
@@ -31,6 +31,7 @@ class PostURLTests(TestCase):
         cls.POST_URL = f'/posts/{cls.post.id}/'
         cls.POST_EDIT_URL = f'/posts/{cls.post.id}/edit/'
         cls.GROUP_URL = f'/group/{cls.group.slug}/'
+        cls.GROUPS_URL = '/group/'
         cls.PROFILE_URL = f'/profile/{cls.user.username}/'
         cls.CREATE_URL = '/create/'
         cls.FOLLOW_INDEX_URL = '/follow/'
@@ -51,6 +52,7 @@ class PostURLTests(TestCase):
         """Страницы доступные любому пользователю."""
         urls = (
             self.INDEX_URL,
+            self.GROUPS_URL,
             self.GROUP_URL,
             self.PROFILE_URL,
             self.POST_URL,
@@ -98,6 +100,7 @@ class PostURLTests(TestCase):
         """URL-адрес использует соответствующий шаблон."""
         url_names_templates = {
             self.INDEX_URL: 'posts/index.html',
+            self.GROUPS_URL: 'posts/groups.html',
             self.GROUP_URL: 'posts/group_list.html',
             self.PROFILE_URL: 'posts/profile.html',
             self.POST_URL: 'posts/post_detail.html',
@@ -0,0 +1,142 @@
+from unittest import mock
+
+from django.test import TestCase, RequestFactory, override_settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.paginator import Paginator
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from posts.models import Post
+from posts.utils import get_elided_page_range, get_posts_page_obj
+
+
+User = get_user_model()
+
+
+class ElidedPageRangeTests(TestCase):
+    def get_range(self, number, num_pages, **kwargs):
+        page = Paginator(range(num_pages), 1).page(number)
+        return get_elided_page_range(page, **kwargs)
+
+    def test_short_range_is_not_elided(self):
+        self.assertEqual(self.get_range(2, 5), [1, 2, 3, 4, 5])
+
+    def test_window_around_current_page(self):
+        """Выводятся первая, последняя и соседние с текущей страницы."""
+        cases = {
+            1: [1, 2, 3, None, 10000],
+            5000: [1, None, 4998, 4999, 5000, 5001, 5002, None, 10000],
+            10000: [1, None, 9998, 9999, 10000],
+        }
+        for number, expected in cases.items():
+            with self.subTest(number=number):
+                self.assertEqual(self.get_range(number, 10000), expected)
+
+    def test_adjacent_gap_is_not_elided(self):
+        self.assertEqual(self.get_range(4, 10), [1, 2, 3, 4, 5, 6, None, 10])
+
+    def test_on_each_side_and_on_ends(self):
+        self.assertEqual(
+            self.get_range(10, 20, on_each_side=1, on_ends=2),
+            [1, 2, None, 9, 10, 11, None, 19, 20]
+        )
+
+
+class PostsPageObjTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='PostsPageObjTests')
+        Post.objects.bulk_create(
+            Post(text='page obj', author=cls.user) for _ in range(25))
+
+    @override_settings(POSTS_PER_PAGE=2, ESTIMATED_COUNT_THRESHOLD=1)
+    def test_estimated_count_skips_count_query(self):
+        """Большая таблица пагинируется без COUNT(*)."""
+        request = RequestFactory().get('/', {'page': 3})
+        with self.assertNumQueries(4) as queries:
+            page_obj = get_posts_page_obj(request, Post.objects.all())
+            self.assertEqual(len(page_obj), 2)
+        self.assertFalse(any(
+            'COUNT(' in query['sql'] for query in queries.captured_queries))
+        self.assertIn(None, page_obj.elided_page_range)
+
+    @override_settings(ESTIMATED_COUNT_THRESHOLD=1)
+    def test_last_page_of_overestimated_feed(self):
+        """Короткая страница завышенной оценки считается последней."""
+        for prefetch in (True, False):
+            with self.subTest(prefetch=prefetch), \
+                    self.settings(POSTS_PREFETCH_NEXT_PAGE=prefetch), \
+                    mock.patch('core.paginator.estimate_count',
+                               return_value=1000):
+                cache.clear()
+                page_obj = self.get_page_obj({'limit': 10, 'page': 3})
+                self.assertEqual(len(page_obj), 5)
+                self.assertFalse(page_obj.has_next())
+                self.assertEqual(page_obj.elided_page_range, [1, 2, 3])
+
+    def setUp(self):
+        cache.clear()
+
+    def get_page_obj(self, params, **kwargs):
+        request = RequestFactory().get('/', params)
+        return get_posts_page_obj(request, Post.objects.all(), **kwargs)
+
+    def test_per_view_default_and_limit(self):
+        """Размер страницы берётся из ?limit=, иначе из настроек view."""
+        cases = (
+            ({}, {}, 10),
+            ({}, {'per_page': 5}, 5),
+            ({'limit': '3'}, {'per_page': 5}, 3),
+            ({'limit': 'abc'}, {'per_page': 5}, 5),
+            ({'limit': '-1'}, {}, 1),
+        )
+        for params, kwargs, expected in cases:
+            with self.subTest(params=params, kwargs=kwargs):
+                page_obj = self.get_page_obj(params, **kwargs)
+                self.assertEqual(page_obj.paginator.per_page, expected)
+
+    @override_settings(POSTS_MAX_PER_PAGE=20)
+    def test_limit_is_capped(self):
+        page_obj = self.get_page_obj({'limit': '1000'})
+        self.assertEqual(len(page_obj), 20)
+        self.assertEqual(page_obj.limit_query, '&limit=20')
+
+    @override_settings(POSTS_PREFETCH_NEXT_PAGE=True)
+    def test_next_page_is_prefetched(self):
+        """Следующая страница выбирается по закэшированным id."""
+        first = self.get_page_obj({'limit': 10})
+        with CaptureQueriesContext(connection) as queries:
+            second = list(self.get_page_obj({'limit': 10, 'page': 2}))
+        offsets = [
+            query['sql'] for query in queries.captured_queries
+            if 'OFFSET' in query['sql']
+        ]
+        self.assertEqual(len(offsets), 1)
+        self.assertTrue(offsets[0].startswith('SELECT "posts_post"."id" FROM'))
+        expected = list(Post.objects.all()[10:20])
+        self.assertEqual(second, expected)
+        self.assertTrue(set(first).isdisjoint(second))
+        with CaptureQueriesContext(connection) as queries:
+            third = list(self.get_page_obj({'limit': 10, 'page': 3}))
+        self.assertFalse(any(
+            'OFFSET' in query['sql'] for query in queries.captured_queries))
+        self.assertEqual(third, list(Post.objects.all()[20:]))
+
+    @override_settings(POSTS_PREFETCH_NEXT_PAGE=True)
+    def test_user_feed_is_not_prefetched(self):
+        """Лента одного пользователя не кэширует id следующей страницы."""
+        self.get_page_obj({'limit': 10}, prefetch_next=False)
+        with CaptureQueriesContext(connection) as queries:
+            self.get_page_obj({'limit': 10, 'page': 2}, prefetch_next=False)
+        self.assertTrue(any(
+            'OFFSET' in query['sql'] for query in queries.captured_queries))
+
+    @override_settings(POSTS_PREFETCH_NEXT_PAGE=True)
+    def test_prefetched_ids_dropped_on_post_change(self):
+        self.get_page_obj({'limit': 10})
+        Post.objects.create(text='new post', author=self.user)
+        page_obj = self.get_page_obj({'limit': 10, 'page': 2})
+        self.assertEqual(
+            list(page_obj), list(Post.objects.all()[10:20]))
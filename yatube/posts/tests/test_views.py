@@ -1,3 +1,4 @@
+import re
 import shutil
 import tempfile
 
@@ -10,10 +11,13 @@ from django.core.files.uploadedfile import SimpleUploadedFile
 from django.core.cache import cache
 
 from posts.models import Group, Post, Comment, Follow
+from posts.forms import PostForm
+from posts.stats import view_counter
 
 
 TEMP_MEDIA_ROOT = tempfile.mkdtemp(dir=settings.BASE_DIR)
 User = get_user_model()
+VIEWS_RE = re.compile(r'Просмотров:\s*<span>(\d+)</span>')
 
 
 class PostPagesTests(TestCase):
@@ -444,3 +448,307 @@ class FollowViewsTest(TestCase):
 
         self.assertIn(post, response_by_follow_user.context['page_obj'])
         self.assertNotIn(post, response_by_unfollow_user.context['page_obj'])
+
+
+class GroupCacheViewsTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='GroupCacheViewsTest')
+        self.group = Group.objects.create(
+            title='cached group',
+            slug='cached-group',
+            description='cached group description'
+        )
+        self.empty_group = Group.objects.create(
+            title='empty group',
+            slug='empty-group',
+            description='empty group description'
+        )
+        posts_count = 3
+        for _ in range(posts_count):
+            Post.objects.create(
+                text='cached group post',
+                author=self.user,
+                group=self.group
+            )
+        self.GROUPS_URL = reverse('posts:groups')
+        self.GROUP_POSTS_URL = reverse(
+            'posts:group_posts',
+            kwargs={'slug': self.group.slug}
+        )
+
+    def test_groups_page_show_posts_count(self):
+        """Шаблон groups показывает группы с количеством постов."""
+        response = self.client.get(self.GROUPS_URL)
+
+        groups = {group.slug: group for group in response.context['page_obj']}
+        self.assertEqual(groups[self.group.slug].posts_count, 3)
+        self.assertEqual(groups[self.empty_group.slug].posts_count, 0)
+
+    def test_groups_posts_count_invalidated_on_post_create(self):
+        """Новый пост сбрасывает закэшированное количество постов групп."""
+        self.client.get(self.GROUPS_URL)
+        Post.objects.create(
+            text='new cached group post',
+            author=self.user,
+            group=self.empty_group
+        )
+
+        response = self.client.get(self.GROUPS_URL)
+
+        groups = {group.slug: group for group in response.context['page_obj']}
+        self.assertEqual(groups[self.empty_group.slug].posts_count, 1)
+
+    def test_group_cache_invalidated_on_group_save(self):
+        """Изменение группы сбрасывает её кэш по slug и id."""
+        self.client.get(self.GROUP_POSTS_URL)
+        self.group.title = 'renamed group'
+        self.group.slug = 'renamed-group'
+        self.group.save()
+
+        old_response = self.client.get(self.GROUP_POSTS_URL)
+        new_response = self.client.get(
+            reverse('posts:group_posts', kwargs={'slug': 'renamed-group'}))
+
+        self.assertEqual(old_response.status_code, 404)
+        self.assertEqual(new_response.context['group'].title, 'renamed group')
+
+    def test_group_page_cached_lookup(self):
+        """Повторный запрос группы не обращается к таблице групп."""
+        self.client.get(self.GROUP_POSTS_URL)
+        with self.assertNumQueries(3) as queries:
+            self.client.get(self.GROUP_POSTS_URL)
+        self.assertFalse(any(
+            'posts_group' in query['sql']
+            for query in queries.captured_queries))
+
+    def test_post_form_group_choices_without_queries(self):
+        """Рендеринг поля group формы PostForm не выполняет запросов."""
+        PostForm()
+        form = PostForm()
+        with self.assertNumQueries(0):
+            rendered = str(form['group'])
+        self.assertIn(self.group.title, rendered)
+
+
+@override_settings(POSTS_PER_PAGE=2)
+class PartialFeedViewsTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='PartialFeedViewsTest')
+        self.follower = User.objects.create_user(username='follower')
+        Follow.objects.create(user=self.follower, author=self.user)
+        self.group = Group.objects.create(
+            title='partial group',
+            slug='partial-group',
+            description='partial group description'
+        )
+        for number in range(3):
+            Post.objects.create(
+                text='partial post {}'.format(number),
+                author=self.user,
+                group=self.group
+            )
+        self.follower_client = Client()
+        self.follower_client.force_login(self.follower)
+        self.FEED_URLS = (
+            (self.client, reverse('posts:index')),
+            (self.client, reverse(
+                'posts:group_posts', kwargs={'slug': self.group.slug})),
+            (self.client, reverse(
+                'posts:profile', kwargs={'username': self.user.username})),
+            (self.follower_client, reverse('posts:follow_index')),
+        )
+
+    def test_partial_returns_cards_only(self):
+        """Фрагмент ленты содержит только карточки и курсор."""
+        for client, url in self.FEED_URLS:
+            for kwargs in ({'data': {'partial': 1}}, {'HTTP_X_PARTIAL': '1'}):
+                with self.subTest(url=url, kwargs=kwargs):
+                    cache.clear()
+                    response = client.get(url, **kwargs)
+                    content = response.content.decode()
+                    self.assertNotIn('<html', content)
+                    self.assertIn('partial post 2', content)
+                    self.assertNotIn('partial post 0', content)
+                    self.assertEqual(
+                        response['X-Next-Page'],
+                        url + '?page=2&partial=1'
+                    )
+                    self.assertIn('X-Partial', response['Vary'])
+
+    def test_partial_last_page_has_no_cursor(self):
+        url = reverse('posts:index')
+        response = self.client.get(url, {'partial': 1, 'page': 2})
+        self.assertNotIn('X-Next-Page', response)
+        self.assertIn('partial post 0', response.content.decode())
+
+    def test_partial_cache_control(self):
+        """Фрагмент общей ленты публичный, ленты подписок - приватный."""
+        for client, url in self.FEED_URLS:
+            with self.subTest(url=url):
+                response = client.get(url, {'partial': 1})
+                expected = 'private' if client is self.follower_client else (
+                    'public')
+                self.assertIn(expected, response['Cache-Control'])
+
+    def test_cached_index_varies_on_partial_header(self):
+        """Закэшированная страница не отдаётся вместо фрагмента."""
+        url = reverse('posts:index')
+        self.client.get(url)
+        response = self.client.get(url, HTTP_X_PARTIAL='1')
+        self.assertNotIn('<html', response.content.decode())
+
+
+class ConditionalViewsTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='ConditionalViews')
+        self.group = Group.objects.create(
+            title='conditional group',
+            slug='conditional-group',
+            description='conditional group description'
+        )
+        self.post = Post.objects.create(
+            text='conditional post',
+            author=self.user,
+            group=self.group
+        )
+        self.authorized_client = Client()
+        self.authorized_client.force_login(self.user)
+        self.URLS = (
+            reverse('posts:index'),
+            reverse('posts:group_posts', kwargs={'slug': self.group.slug}),
+            reverse('posts:profile', kwargs={'username': self.user.username}),
+            reverse('posts:post_detail', kwargs={'post_id': self.post.id}),
+            reverse('about:author'),
+            reverse('about:tech'),
+        )
+
+    def test_not_modified_without_rendering(self):
+        """Повторный запрос с валидаторами получает 304 без рендеринга."""
+        for url in self.URLS:
+            with self.subTest(url=url):
+                cache.clear()
+                response = self.client.get(url)
+                self.assertTrue(response.has_header('Last-Modified'))
+                self.assertIn('public', response['Cache-Control'])
+                self.assertIn('Cookie', response['Vary'])
+                response = self.client.get(
+                    url,
+                    HTTP_IF_NONE_MATCH=response['ETag'],
+                    HTTP_IF_MODIFIED_SINCE=response['Last-Modified'],
+                )
+                self.assertEqual(response.status_code, 304)
+                self.assertEqual(response.templates, [])
+
+    def test_authorized_pages_are_private(self):
+        for url in self.URLS:
+            with self.subTest(url=url):
+                response = self.authorized_client.get(url)
+                self.assertIn('private', response['Cache-Control'])
+                anonymous_response = self.client.get(url)
+                self.assertNotEqual(
+                    response['ETag'], anonymous_response['ETag'])
+
+    def test_login_changes_etag(self):
+        """После нового входа страница не отдаётся из кэша браузера."""
+        url = reverse('posts:post_detail', kwargs={'post_id': self.post.id})
+        etag = self.authorized_client.get(url)['ETag']
+        self.authorized_client.logout()
+        self.authorized_client.force_login(self.user)
+        response = self.authorized_client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_validators_change_with_content(self):
+        """Новый комментарий и правка поста меняют ETag страницы поста."""
+        url = reverse('posts:post_detail', kwargs={'post_id': self.post.id})
+        etags = [self.client.get(url)['ETag']]
+        Comment.objects.create(
+            post=self.post, author=self.user, text='new comment')
+        etags.append(self.client.get(url)['ETag'])
+        self.post.text = 'edited post'
+        self.post.save()
+        etags.append(self.client.get(url)['ETag'])
+        self.assertEqual(len(set(etags)), 3)
+
+
+@override_settings(POST_DETAIL_CACHE=True)
+class CachedPostDetailTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.author = User.objects.create_user(username='detail_author')
+        self.reader = User.objects.create_user(username='detail<reader>')
+        self.post = Post.objects.create(
+            text='cached detail post', author=self.author)
+        self.url = reverse(
+            'posts:post_detail', kwargs={'post_id': self.post.id})
+        view_counter.drain()
+
+    def get_views(self, response):
+        return int(VIEWS_RE.search(response.content.decode()).group(1))
+
+    def test_anonymous_page_is_cached(self):
+        """Анонимная страница поста рендерится один раз."""
+        response = self.client.get(self.url)
+        self.assertContains(response, 'cached detail post')
+        self.assertNotContains(response, 'csrfmiddlewaretoken')
+        with self.assertNumQueries(1):
+            cached = self.client.get(self.url)
+        self.assertEqual(self.get_views(response), 0)
+        self.assertEqual(self.get_views(cached), 1)
+        self.assertEqual(
+            VIEWS_RE.sub('', cached.content.decode()),
+            VIEWS_RE.sub('', response.content.decode())
+        )
+
+    def test_user_parts_are_filled_in(self):
+        """Имя, CSRF и ссылка редактирования подставляются в кэш."""
+        client = Client(enforce_csrf_checks=True)
+        client.force_login(self.reader)
+        client.get(self.url)
+        response = client.get(self.url)
+        self.assertContains(response, 'detail&lt;reader&gt;')
+        self.assertNotContains(response, 'редактировать запись')
+        content = response.content.decode()
+        token = content.split('name="csrfmiddlewaretoken" value="')[1][:64]
+        response = client.post(
+            reverse('posts:add_comment', kwargs={'post_id': self.post.id}),
+            {'text': 'cached comment', 'csrfmiddlewaretoken': token}
+        )
+        self.assertEqual(response.status_code, 302)
+        self.assertContains(client.get(self.url), 'cached comment')
+
+        author_client = Client()
+        author_client.force_login(self.author)
+        response = author_client.get(self.url)
+        self.assertContains(response, 'редактировать запись')
+        self.assertContains(response, 'detail_author')
+
+    def test_user_text_is_not_substituted(self):
+        """Текст поста и комментариев не подменяется как заполнитель."""
+        text = ('__prerender_username__ __post_detail_csrf__ '
+                '__post_detail_comment_form__ __post_detail_views__')
+        self.post.text = text
+        self.post.save()
+        Comment.objects.create(post=self.post, author=self.author, text=text)
+        self.client.force_login(self.reader)
+        self.client.get(self.url)
+        response = self.client.get(self.url)
+        self.assertContains(response, text, count=2)
+        self.assertContains(response, 'Добавить комментарий', count=1)
+
+    def test_page_is_invalidated_on_changes(self):
+        self.client.get(self.url)
+        self.post.text = 'edited detail post'
+        self.post.save()
+        self.assertContains(self.client.get(self.url), 'edited detail post')
+        Comment.objects.create(
+            post=self.post, author=self.reader, text='new comment')
+        self.assertContains(self.client.get(self.url), 'new comment')
+
+    def test_missing_post(self):
+        response = self.client.get(
+            reverse('posts:post_detail', kwargs={'post_id': 0}))
+        self.assertEqual(response.status_code, 404)
@@ -0,0 +1,160 @@
+"""Card thumbnails of a whole page of posts resolved in one batch.
+
+The `{% thumbnail %}` tag asks the sorl key value store once per post.
+Here the thumbnail names are computed without any I/O, looked up with
+a single cache multi-get plus one query for the cache misses. Requests
+never render: the thumbnails missing from the store are left out of the
+page and rendered by the render_thumbnails worker.
+"""
+import logging
+from typing import Dict, Iterable, Optional
+
+from django.conf import settings
+from sorl.thumbnail import default, get_thumbnail
+from sorl.thumbnail.conf import defaults as sorl_defaults
+from sorl.thumbnail.conf import settings as sorl_settings
+from sorl.thumbnail.images import ImageFile, deserialize_image_file
+from sorl.thumbnail.kvstores.base import add_prefix
+from sorl.thumbnail.kvstores.cached_db_kvstore import (
+    EMPTY_VALUE, KVStore as CachedDBKVStore
+)
+from sorl.thumbnail.models import KVStore as KVStoreModel
+
+from .models import FeedItem
+
+
+logger = logging.getLogger(__name__)
+
+# Thumbnail of the post card and of the post page.
+THUMBNAIL_GEOMETRY = '960x339'
+THUMBNAIL_OPTIONS = {'crop': 'center', 'upscale': True}
+
+
+def to_dict(thumbnail) -> dict:
+    return {
+        'url': thumbnail.url,
+        'width': thumbnail.width,
+        'height': thumbnail.height,
+    }
+
+
+def render_thumbnail(image) -> Optional[dict]:
+    """Return the thumbnail of the image, rendering it when needed."""
+    try:
+        thumbnail = get_thumbnail(
+            image, THUMBNAIL_GEOMETRY, **THUMBNAIL_OPTIONS)
+        if thumbnail.size is None:
+            raise ValueError('unreadable image')
+        return to_dict(thumbnail)
+    except Exception:
+        logger.exception('Thumbnail of %s failed', image)
+        return None
+
+
+def get_thumbnail_file(image) -> ImageFile:
+    """Return the thumbnail file sorl would use for the image.
+
+    Mirrors the option handling of sorl's ThumbnailBackend.get_thumbnail().
+    """
+    backend = default.backend
+    source = ImageFile(image)
+    options = dict(THUMBNAIL_OPTIONS)
+    if sorl_settings.THUMBNAIL_PRESERVE_FORMAT:
+        options.setdefault('format', backend._get_format(source))
+    for key, value in backend.default_options.items():
+        options.setdefault(key, value)
+    for key, attr in backend.extra_options:
+        value = getattr(sorl_settings, attr)
+        if value != getattr(sorl_defaults, attr):
+            options.setdefault(key, value)
+    name = backend._get_thumbnail_filename(
+        source, THUMBNAIL_GEOMETRY, options)
+    return ImageFile(name, default.storage)
+
+
+def get_stored(raw_keys) -> Dict[str, str]:
+    """Multi-get serialized thumbnails from the sorl key value store."""
+    kvstore = default.kvstore
+    if not isinstance(kvstore, CachedDBKVStore):
+        values = ((key, kvstore._get_raw(key)) for key in raw_keys)
+        return {key: value for key, value in values if value}
+    values = {
+        key: value for key, value in kvstore.cache.get_many(raw_keys).items()
+        if value != EMPTY_VALUE
+    }
+    missing = [key for key in raw_keys if key not in values]
+    if missing:
+        found = dict(KVStoreModel.objects.filter(
+            key__in=missing).values_list('key', 'value'))
+        kvstore.cache.set_many(found, sorl_settings.THUMBNAIL_CACHE_TIMEOUT)
+        values.update(found)
+    return values
+
+
+def get_stored_thumbnails(images: Iterable) -> Dict[str, Optional[dict]]:
+    """Return the thumbnails already in the sorl store, None for the rest.
+
+    Nothing is rendered, the image files aren't even opened.
+    """
+    images = {image.name: image for image in images if image}
+    raw_keys = {
+        name: add_prefix(get_thumbnail_file(image).key)
+        for name, image in images.items()
+    }
+    stored = get_stored(list(raw_keys.values()))
+    return {
+        name: to_dict(deserialize_image_file(stored[raw_keys[name]]))
+        if stored.get(raw_keys[name]) else None
+        for name in images
+    }
+
+
+def attach_thumbnails(posts: Iterable) -> None:
+    """Set `thumbnail` of the posts that do not have one yet.
+
+    Posts read from the feed come with theirs, None while it is pending.
+    The others get the stored thumbnail or None, the missing ones are
+    already queued for render_thumbnails by their feed items.
+    """
+    pending = []
+    for post in posts:
+        if hasattr(post, 'thumbnail'):
+            continue
+        post.thumbnail = None
+        if post.image:
+            pending.append(post)
+    if not pending:
+        return
+    thumbnails = get_stored_thumbnails(post.image for post in pending)
+    for post in pending:
+        post.thumbnail = thumbnails[post.image.name]
+
+
+def render_pending_thumbnails(batch_size: Optional[int] = None) -> int:
+    """Render the feed thumbnails queued by posts.feed.
+
+    Returns the number of feed items processed. A thumbnail that fails to
+    render is marked failed and not retried until the image changes or
+    the feed is rebuilt.
+    """
+    batch_size = batch_size or settings.THUMBNAIL_BATCH_SIZE
+    items = list(FeedItem.objects.filter(
+        thumbnail_status=FeedItem.THUMBNAIL_PENDING
+    ).values_list('post_id', 'image')[:batch_size])
+    for post_id, image in items:
+        thumbnail = render_thumbnail(image)
+        if thumbnail is None:
+            fields = {'thumbnail_status': FeedItem.THUMBNAIL_FAILED}
+        else:
+            fields = {
+                'thumbnail_status': FeedItem.THUMBNAIL_READY,
+                'thumbnail_url': thumbnail['url'],
+                'thumbnail_width': thumbnail['width'],
+                'thumbnail_height': thumbnail['height'],
+            }
+        # The post may have got another image while this one rendered.
+        FeedItem.objects.filter(
+            post_id=post_id, image=image,
+            thumbnail_status=FeedItem.THUMBNAIL_PENDING
+        ).update(**fields)
+    return len(items)
@@ -8,15 +8,28 @@ app_name = 'posts'
 urlpatterns = [
     path('', views.index, name='index'),
     path('follow/', views.follow_index, name='follow_index'),
+    path('group/', views.groups, name='groups'),
     path('group/<slug:slug>/', views.group_posts, name='group_posts'),
     path('profile/<str:username>/', views.profile, name='profile'),
     path('profile/<str:username>/follow/',
          views.profile_follow, name='profile_follow'),
     path('profile/<str:username>/unfollow/',
          views.profile_unfollow, name='profile_unfollow'),
+    path('profile/<str:username>/block/',
+         views.profile_block, name='profile_block'),
+    path('profile/<str:username>/unblock/',
+         views.profile_unblock, name='profile_unblock'),
+    path('profile/<str:username>/mute/',
+         views.profile_mute, name='profile_mute'),
+    path('profile/<str:username>/unmute/',
+         views.profile_unmute, name='profile_unmute'),
     path('posts/<int:post_id>/', views.post_detail, name='post_detail'),
     path('create/', views.post_create, name='post_create'),
     path('posts/<int:post_id>/edit/', views.post_edit, name='post_edit'),
     path('posts/<int:post_id>/comment/',
          views.add_comment, name='add_comment'),
+    path('posts/<int:post_id>/react/<slug:kind>/',
+         views.post_react, name='post_react'),
+    path('posts/<int:post_id>/unreact/<slug:kind>/',
+         views.post_unreact, name='post_unreact'),
 ]
@@ -1,12 +1,187 @@
-from django.core.paginator import Paginator, Page
+import hashlib
+from typing import List, Optional, Sequence
+
+from django.core.cache import cache
+from django.core.paginator import EmptyPage, Page, PageNotAnInteger
 from django.core.handlers.wsgi import WSGIRequest
 from django.conf import settings
 from django.db.models.query import QuerySet
+from django.http import HttpResponse
+from django.template.loader import render_to_string
+from django.utils.cache import patch_cache_control
+
+from core.paginator import EstimatedCountPaginator
+from .cache import get_posts_version
+from .reactions import attach_reactions
+
+NEXT_PAGE_IDS_KEY = 'posts:next_page:{}:{}:{}:{}'
+FRAGMENT_TEMPLATE = 'includes/posts/feed_fragment.html'
+
+
+def get_elided_page_range(page: Page, on_each_side: int = 2,
+                          on_ends: int = 1) -> List[Optional[int]]:
+    """Return page numbers around the current page and at the ends.
+
+    Gaps are marked with None, e.g. [1, None, 7, 8, 9, 10, 11, None, 50].
+    """
+    number = page.number
+    num_pages = page.paginator.num_pages
+    window = range(
+        max(1, number - on_each_side),
+        min(num_pages, number + on_each_side) + 1
+    )
+    pages = sorted(
+        set(window)
+        | set(range(1, min(on_ends, num_pages) + 1))
+        | set(range(max(1, num_pages - on_ends + 1), num_pages + 1))
+    )
+    page_range = []
+    for page_number in pages:
+        if page_range and page_number - page_range[-1] > 1:
+            page_range.append(None)
+        page_range.append(page_number)
+    return page_range
+
+
+def get_limit(request: WSGIRequest, default: int) -> int:
+    """Return page size from ?limit=, capped by POSTS_MAX_PER_PAGE.
+
+    Missing or malformed values fall back to the view default.
+    """
+    try:
+        limit = int(request.GET['limit'])
+    except (KeyError, ValueError):
+        return default
+    return max(1, min(limit, settings.POSTS_MAX_PER_PAGE))
+
+
+def get_page_number(paginator: EstimatedCountPaginator, number) -> int:
+    """Validate page number the same way Paginator.get_page() does."""
+    try:
+        return paginator.validate_number(number)
+    except PageNotAnInteger:
+        return 1
+    except EmptyPage:
+        return paginator.num_pages
+
+
+def get_next_page_ids_key(posts: QuerySet, per_page: int,
+                          number: int) -> str:
+    query_hash = hashlib.md5(str(posts.query).encode()).hexdigest()
+    return NEXT_PAGE_IDS_KEY.format(
+        get_posts_version(), query_hash, per_page, number)
+
+
+def get_prefetched_page(paginator: EstimatedCountPaginator,
+                        number: int) -> Page:
+    """Return page, fetching ids of the next page along with it.
+
+    Ids of page N+1 are cached, so the next request selects its rows by
+    primary key instead of scanning past the OFFSET again. Without cached
+    ids the rows of both pages are read by one query. With them the ids
+    of the page after are read from the index alone, so every page of a
+    scroll-through skips the OFFSET scan of the rows.
+    """
+    posts = paginator.object_list
+    per_page = paginator.per_page
+    top = number * per_page
+    ids = cache.get(get_next_page_ids_key(posts, per_page, number))
+    if ids is not None:
+        rows = list(posts.filter(pk__in=ids))
+        next_ids = []
+        if len(rows) == per_page:
+            next_ids = list(
+                posts.values_list('pk', flat=True)[top:top + per_page])
+    else:
+        rows = list(posts[top - per_page:top + per_page])
+        next_ids = [row.pk for row in rows[per_page:]]
+        del rows[per_page:]
+    if next_ids:
+        cache.set(
+            get_next_page_ids_key(posts, per_page, number + 1),
+            next_ids, settings.POSTS_PREFETCH_TIMEOUT)
+    return paginator._get_page(rows, number, paginator)
+
+
+def get_page_obj(request: WSGIRequest, objects: Sequence,
+                 per_page: int, prefetch_next: bool = False) -> Page:
+    """Return page object with elided_page_range attached.
+
+    Large unfiltered querysets are paginated by the estimated count.
+    With prefetch_next the ids of the next page are warmed in the cache.
+    """
+    paginator = EstimatedCountPaginator(
+        objects, per_page, threshold=settings.ESTIMATED_COUNT_THRESHOLD)
+    number = get_page_number(paginator, request.GET.get('page'))
+    if prefetch_next and isinstance(objects, QuerySet):
+        page_obj = get_prefetched_page(paginator, number)
+    else:
+        page_obj = paginator.page(number)
+    page_obj.elided_page_range = get_elided_page_range(page_obj)
+    return page_obj
+
+
+def get_posts_page_obj(request: WSGIRequest, posts: QuerySet,
+                       per_page: Optional[int] = None,
+                       prefetch_next: bool = True) -> Page:
+    """Return posts page object.
+
+    per_page is the view default, a client may override it with ?limit=.
+    Feeds of one user pass prefetch_next=False: the cached next page ids
+    are only invalidated by the posts version, not by the follows.
+    The reaction counts of the posts and the flags of the visitor are
+    fetched for the whole page at once.
+    """
+    limit = get_limit(request, per_page or settings.POSTS_PER_PAGE)
+    page_obj = get_page_obj(
+        request, posts, limit,
+        prefetch_next=prefetch_next and settings.POSTS_PREFETCH_NEXT_PAGE)
+    page_obj.limit_query = (
+        '&limit={}'.format(limit) if 'limit' in request.GET else '')
+    attach_reactions(page_obj, getattr(request, 'user', None))
+    return page_obj
+
+
+def is_partial(request: WSGIRequest) -> bool:
+    """Whether the client asked for the feed fragment only.
+
+    Infinite scroll requests either ?partial=1 or the X-Partial: 1 header.
+    """
+    return (request.GET.get('partial') == '1'
+            or request.META.get('HTTP_X_PARTIAL') == '1')
+
+
+def get_next_fragment_url(request: WSGIRequest, page_obj: Page) -> str:
+    """Return URL of the fragment with the next page, '' on the last one."""
+    if not page_obj.has_next():
+        return ''
+    query = request.GET.copy()
+    query.pop('page', None)
+    query.pop('partial', None)
+    query['page'] = page_obj.next_page_number()
+    query['partial'] = '1'
+    return '{}?{}'.format(request.path, query.urlencode())
+
 
+def render_feed_fragment(request: WSGIRequest, page_obj: Page,
+                         card_flags: str = '',
+                         private: bool = False) -> HttpResponse:
+    """Render only the post cards of the page and the next page cursor.
 
-def get_posts_page_obj(request: WSGIRequest,
-                       posts: QuerySet) -> Page:
-    """Return posts page object."""
-    paginator = Paginator(posts, settings.POSTS_PER_PAGE)
-    page_number = request.GET.get('page')
-    return paginator.get_page(page_number)
+    The fragment is rendered without the base layout and context
+    processors. It doesn't depend on the visitor unless `private` is set,
+    so it may be cached by browsers and proxies for POSTS_FRAGMENT_MAX_AGE.
+    """
+    next_url = get_next_fragment_url(request, page_obj)
+    content = render_to_string(FRAGMENT_TEMPLATE, {
+        'page_obj': page_obj,
+        'card_flags': card_flags,
+        'next_url': next_url,
+    })
+    response = HttpResponse(content)
+    if next_url:
+        response['X-Next-Page'] = next_url
+    patch_cache_control(
+        response, public=not private, private=private,
+        max_age=settings.POSTS_FRAGMENT_MAX_AGE)
+    return response
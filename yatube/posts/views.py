@@ -1,17 +1,51 @@
 from django.shortcuts import render, get_object_or_404, redirect
 from django.contrib.auth.decorators import login_required
-from django.views.decorators.cache import cache_page
+from django.views.decorators.http import require_POST
+from django.views.decorators.vary import vary_on_headers
 from django.core.exceptions import PermissionDenied
+from django.http import Http404
+from django.conf import settings
 
-from .models import Post, Group, User, Follow
+from core.cache import cache_page
+from core.db import retry_on_locked
+from core.decorators import (
+    conditional_page, read_from_replica, skip_anonymous_session
+)
+from .models import Post, User, Follow, Block, Mute
+from .blocks import (
+    block_author, exclude_hidden, get_block_lists, is_blocked
+)
+from .detail import get_post_detail_context, render_cached_post_detail
+from .feed import feed_posts
 from .forms import CommentForm, PostForm
-from .utils import get_posts_page_obj
+from .images import save_with_image
+from .reactions import (
+    KIND_NAMES, add_reaction, get_reactions, remove_reaction
+)
+from .stats import count_views, get_views
+from .utils import (
+    get_page_obj, get_posts_page_obj, is_partial, render_feed_fragment
+)
+from .cache import get_group_or_404, get_groups, get_groups_posts_count
+from .conditional import (
+    group_last_modified, index_last_modified, post_detail_counters,
+    post_detail_last_modified, profile_last_modified
+)
 
 
-@cache_page(20, key_prefix='index_page')
+@skip_anonymous_session
+@read_from_replica
+@cache_page(
+    settings.INDEX_CACHE_FRESH, settings.INDEX_CACHE_STALE,
+    key_prefix='index_page'
+)
+@conditional_page(index_last_modified)
+@vary_on_headers('X-Partial')
 def index(request):
-    posts = Post.objects.select_related('author', 'group')
+    posts = exclude_hidden(feed_posts(), request.user)
     page_obj = get_posts_page_obj(request, posts)
+    if is_partial(request):
+        return render_feed_fragment(request, page_obj)
     context = {
         'page_obj': page_obj,
         'index': True,
@@ -20,11 +54,15 @@ def index(request):
 
 
 @login_required
+@read_from_replica
+@vary_on_headers('X-Partial')
 def follow_index(request):
-    posts = Post.objects.filter(
+    posts = exclude_hidden(Post.objects.filter(
         author__following__user=request.user
-    ).select_related('author', 'group')
-    page_obj = get_posts_page_obj(request, posts)
+    ).select_related('author', 'group'), request.user)
+    page_obj = get_posts_page_obj(request, posts, prefetch_next=False)
+    if is_partial(request):
+        return render_feed_fragment(request, page_obj, private=True)
     context = {
         'page_obj': page_obj,
         'follow': True,
@@ -32,10 +70,30 @@ def follow_index(request):
     return render(request, 'posts/index.html', context)
 
 
+@skip_anonymous_session
+@read_from_replica
+def groups(request):
+    page_obj = get_page_obj(request, get_groups(), settings.GROUPS_PER_PAGE)
+    posts_count = get_groups_posts_count()
+    for group in page_obj:
+        group.posts_count = posts_count.get(group.id, 0)
+    context = {
+        'page_obj': page_obj,
+    }
+    return render(request, 'posts/groups.html', context)
+
+
+@skip_anonymous_session
+@read_from_replica
+@conditional_page(group_last_modified)
+@vary_on_headers('X-Partial')
 def group_posts(request, slug):
-    group = get_object_or_404(Group, slug=slug)
-    posts = group.posts.select_related('author').all()
+    group = get_group_or_404(slug)
+    posts = exclude_hidden(feed_posts().filter(group=group), request.user)
     page_obj = get_posts_page_obj(request, posts)
+    if is_partial(request):
+        return render_feed_fragment(
+            request, page_obj, 'hide_all_group_posts_link')
     context = {
         'group': group,
         'page_obj': page_obj,
@@ -43,22 +101,34 @@ def group_posts(request, slug):
     return render(request, 'posts/group_list.html', context)
 
 
+@skip_anonymous_session
+@read_from_replica
+@conditional_page(profile_last_modified)
+@vary_on_headers('X-Partial')
 def profile(request, username):
     author = get_object_or_404(User, username=username)
+    posts = feed_posts().filter(author=author)
+    page_obj = get_posts_page_obj(request, posts)
+    if is_partial(request):
+        return render_feed_fragment(request, page_obj, 'hide_author')
+    is_blocking = is_muting = False
     if request.user.is_authenticated:
         is_following = Follow.objects.filter(
             user=request.user,
             author=author
         ).exists()
+        block_lists = get_block_lists(request.user.id)
+        is_blocking = author.id in block_lists['blocked']
+        is_muting = author.id in block_lists['muted']
     else:
         is_following = False
-    posts = author.posts.select_related('group').all()
-    page_obj = get_posts_page_obj(request, posts)
     context = {
         'author': author,
         'posts_count': posts.count(),
         'page_obj': page_obj,
         'following': is_following,
+        'blocking': is_blocking,
+        'muting': is_muting,
     }
     return render(request, 'posts/profile.html', context)
 
@@ -70,9 +140,10 @@ def profile_follow(request, username):
         user=request.user,
         author=author
     ).exists()
-    if author == request.user or is_follow:
+    if (author == request.user or is_follow
+            or is_blocked(author.id, request.user)):
         raise PermissionDenied()
-    Follow.objects.create(
+    retry_on_locked(Follow.objects.create)(
         user=request.user,
         author=author
     )
@@ -84,25 +155,66 @@ def profile_unfollow(request, username):
     follow = get_object_or_404(
         Follow, user=request.user, author__username=username
     )
-    follow.delete()
+    retry_on_locked(follow.delete)()
     return redirect('posts:profile', username)
 
 
+@login_required
+@require_POST
+def profile_block(request, username):
+    author = get_object_or_404(User, username=username)
+    if author == request.user:
+        raise PermissionDenied()
+    retry_on_locked(block_author)(request.user, author)
+    return redirect('posts:profile', username)
+
+
+@login_required
+@require_POST
+def profile_unblock(request, username):
+    block = get_object_or_404(
+        Block, user=request.user, author__username=username
+    )
+    retry_on_locked(block.delete)()
+    return redirect('posts:profile', username)
+
+
+@login_required
+@require_POST
+def profile_mute(request, username):
+    author = get_object_or_404(User, username=username)
+    if author == request.user:
+        raise PermissionDenied()
+    retry_on_locked(Mute.objects.get_or_create)(
+        user=request.user,
+        author=author
+    )
+    return redirect('posts:profile', username)
+
+
+@login_required
+@require_POST
+def profile_unmute(request, username):
+    mute = get_object_or_404(
+        Mute, user=request.user, author__username=username
+    )
+    retry_on_locked(mute.delete)()
+    return redirect('posts:profile', username)
+
+
+@skip_anonymous_session
+@read_from_replica
+@count_views
+@conditional_page(post_detail_last_modified, post_detail_counters)
 def post_detail(request, post_id):
-    post = get_object_or_404(
-        Post.objects.select_related(
-            'author',
-            'group'
-        ).prefetch_related(
-            'comments'
-        ), id=post_id)
-    posts_count = post.author.posts.count()
-    context = {
-        'post': post,
-        'posts_count': posts_count,
-        'comment_form': CommentForm(),
-        'comments': post.comments.all(),
-    }
+    if settings.POST_DETAIL_CACHE:
+        return render_cached_post_detail(request, post_id)
+    context = get_post_detail_context(post_id)
+    context['comment_blocked'] = (
+        request.user.is_authenticated
+        and is_blocked(context['post'].author_id, request.user))
+    context['views'] = get_views([post_id])[post_id]
+    context['reactions'] = get_reactions([post_id], request.user)[post_id]
     return render(request, 'posts/post_detail.html', context)
 
 
@@ -115,7 +227,7 @@ def post_create(request):
     if request.method == 'POST' and form.is_valid():
         post_obj = form.save(commit=False)
         post_obj.author = request.user
-        post_obj.save()
+        save_with_image(post_obj)
         return redirect('posts:profile', username=post_obj.author.username)
     return render(request, 'posts/create_post.html', {'form': form})
 
@@ -133,7 +245,8 @@ def post_edit(request, post_id):
         instance=instance
     )
     if request.method == 'POST' and form.is_valid():
-        form.save()
+        save_with_image(form.save(commit=False))
+        form.save_m2m()
         return redirect(instance)
 
     context = {
@@ -149,10 +262,32 @@ def add_comment(request, post_id):
     post = get_object_or_404(
         Post, id=post_id
     )
+    if is_blocked(post.author_id, request.user):
+        raise PermissionDenied()
     form = CommentForm(request.POST or None)
     if request.method == 'POST' and form.is_valid():
         comment = form.save(commit=False)
         comment.author = request.user
         comment.post = post
-        comment.save()
+        retry_on_locked(comment.save)()
+    return redirect(post)
+
+
+@login_required
+@require_POST
+def post_react(request, post_id, kind):
+    post = get_object_or_404(Post, id=post_id)
+    if kind not in KIND_NAMES:
+        raise Http404('Unknown reaction.')
+    retry_on_locked(add_reaction)(request.user, post.id, kind)
+    return redirect(post)
+
+
+@login_required
+@require_POST
+def post_unreact(request, post_id, kind):
+    post = get_object_or_404(Post, id=post_id)
+    if kind not in KIND_NAMES:
+        raise Http404('Unknown reaction.')
+    retry_on_locked(remove_reaction)(request.user, post.id, kind)
     return redirect(post)
@@ -0,0 +1,14 @@
+from django.contrib import admin
+from django.conf import settings
+
+from .models import OutgoingMail
+
+
+@admin.register(OutgoingMail)
+class OutgoingMailAdmin(admin.ModelAdmin):
+    list_display = ('pk', 'recipient', 'subject_template_name', 'status',
+                    'created', 'sent')
+    list_filter = ('status',)
+    search_fields = ('recipient',)
+    raw_id_fields = ('user',)
+    empty_value_display = settings.ADMIN_EMPTY_VALUE_DISPLAY
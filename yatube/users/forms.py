@@ -1,6 +1,8 @@
-from django.contrib.auth.forms import UserCreationForm
+from django.contrib.auth.forms import PasswordResetForm, UserCreationForm
 from django.contrib.auth import get_user_model
 
+from .mail import enqueue_mail
+
 
 User = get_user_model()
 
@@ -9,3 +11,22 @@ class CreationForm(UserCreationForm):
     class Meta:
         model = User
         fields = ('first_name', 'last_name', 'username', 'email')
+
+
+class QueuedPasswordResetForm(PasswordResetForm):
+    """Password reset form which enqueues the mail instead of sending it."""
+
+    def send_mail(self, subject_template_name, email_template_name,
+                  context, from_email, to_email,
+                  html_email_template_name=None):
+        context = dict(context)
+        user = context.pop('user')
+        enqueue_mail(
+            subject_template_name,
+            email_template_name,
+            context,
+            to_email,
+            from_email=from_email,
+            html_email_template_name=html_email_template_name,
+            user=user,
+        )
@@ -0,0 +1,150 @@
+import json
+import uuid
+from collections import Counter
+from datetime import timedelta
+from typing import List, Optional, Tuple
+
+from django.conf import settings
+from django.core.mail import EmailMultiAlternatives, get_connection
+from django.db.models import Count, Q
+from django.template import loader
+from django.utils import timezone
+
+from .models import OutgoingMail, User
+
+
+def enqueue_mail(subject_template_name: str, email_template_name: str,
+                 context: dict, to_email: str,
+                 from_email: Optional[str] = None,
+                 html_email_template_name: Optional[str] = None,
+                 user: Optional[User] = None) -> OutgoingMail:
+    """Put the mail into the queue, rendering is left to the worker."""
+    return OutgoingMail.objects.create(
+        recipient=to_email,
+        from_email=from_email or '',
+        user=user,
+        subject_template_name=subject_template_name,
+        email_template_name=email_template_name,
+        html_email_template_name=html_email_template_name or '',
+        context=json.dumps(context),
+    )
+
+
+def render_mail(mail: OutgoingMail) -> EmailMultiAlternatives:
+    context = json.loads(mail.context)
+    context['user'] = mail.user
+    subject = loader.render_to_string(mail.subject_template_name, context)
+    subject = ''.join(subject.splitlines())
+    body = loader.render_to_string(mail.email_template_name, context)
+    message = EmailMultiAlternatives(
+        subject, body, mail.from_email or None, [mail.recipient])
+    if mail.html_email_template_name:
+        html_body = loader.render_to_string(
+            mail.html_email_template_name, context)
+        message.attach_alternative(html_body, 'text/html')
+    return message
+
+
+def get_recently_sent(recipients) -> Counter:
+    """Count mails sent to every recipient within MAIL_RATE_PERIOD."""
+    since = timezone.now() - timedelta(seconds=settings.MAIL_RATE_PERIOD)
+    return Counter(dict(
+        OutgoingMail.objects.filter(
+            recipient__in=recipients,
+            status=OutgoingMail.SENT,
+            sent__gte=since,
+        ).values_list('recipient').annotate(Count('id')).order_by()
+    ))
+
+
+def claim_batch(batch_size: int) -> List[OutgoingMail]:
+    """Claim a batch of pending mails for this worker.
+
+    The conditional UPDATE moves send_after of the claimed mails past
+    MAIL_CLAIM_TIMEOUT, so other workers skip them, and mails of a worker
+    that died are retried when the claim runs out.
+    """
+    now = timezone.now()
+    ready = OutgoingMail.objects.filter(
+        Q(send_after__isnull=True) | Q(send_after__lte=now),
+        status=OutgoingMail.PENDING,
+    )
+    ids = list(ready.values_list('id', flat=True)[:batch_size])
+    claim = uuid.uuid4().hex
+    ready.filter(id__in=ids).update(
+        claim=claim,
+        send_after=now + timedelta(seconds=settings.MAIL_CLAIM_TIMEOUT))
+    return list(OutgoingMail.objects.filter(
+        claim=claim, status=OutgoingMail.PENDING).select_related('user'))
+
+
+def deliver(messages: List[Tuple[OutgoingMail, EmailMultiAlternatives]]
+            ) -> Tuple[List[int], Optional[str]]:
+    """Send the messages over one connection one by one.
+
+    Return the ids of the delivered mails and the error of the backend,
+    which stops the delivery of the rest.
+    """
+    delivered = []
+    try:
+        with get_connection() as connection:
+            for mail, message in messages:
+                connection.send_messages([message])
+                delivered.append(mail.id)
+    except Exception as error:
+        return delivered, str(error)
+    return delivered, None
+
+
+def send_queued_mail(batch_size: Optional[int] = None) -> Counter:
+    """Deliver one batch of pending mails over a single connection.
+
+    Mails to recipients over MAIL_RATE_LIMIT mails per MAIL_RATE_PERIOD
+    seconds are throttled: they stay pending until the period is over.
+    If the backend fails, the mails delivered before are marked sent and
+    the rest stay pending for MAIL_RETRY_DELAY seconds.
+    The context of sent and failed mails is cleared, since it may hold
+    a password reset token.
+    """
+    batch = claim_batch(batch_size or settings.MAIL_BATCH_SIZE)
+    now = timezone.now()
+    sent_count = get_recently_sent({mail.recipient for mail in batch})
+    throttled, failed = [], []
+    messages = []
+    for mail in batch:
+        if sent_count[mail.recipient] >= settings.MAIL_RATE_LIMIT:
+            throttled.append(mail.id)
+            continue
+        try:
+            messages.append((mail, render_mail(mail)))
+        except Exception as error:
+            mail.error = str(error)
+            failed.append(mail)
+            continue
+        sent_count[mail.recipient] += 1
+
+    delivered, error = deliver(messages)
+    OutgoingMail.objects.filter(id__in=delivered).update(
+        status=OutgoingMail.SENT, sent=timezone.now(), context='{}',
+        claim='')
+    undelivered = [
+        mail.id for mail, _ in messages[len(delivered):]]
+    OutgoingMail.objects.filter(id__in=undelivered).update(
+        send_after=now + timedelta(seconds=settings.MAIL_RETRY_DELAY),
+        error=error or '', claim='')
+    OutgoingMail.objects.filter(id__in=throttled).update(
+        send_after=now + timedelta(seconds=settings.MAIL_RATE_PERIOD),
+        claim='')
+    for mail in failed:
+        mail.status = OutgoingMail.FAILED
+        mail.context = '{}'
+        mail.claim = ''
+    OutgoingMail.objects.bulk_update(
+        failed, ('status', 'error', 'context', 'claim'))
+
+    return Counter({
+        OutgoingMail.SENT: len(delivered),
+        OutgoingMail.PENDING: len(undelivered),
+        OutgoingMail.THROTTLED: len(throttled),
+        OutgoingMail.FAILED: len(failed),
+    })
@@ -0,0 +1,45 @@
+import time
+from collections import Counter
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from users.mail import send_queued_mail
+from users.models import OutgoingMail
+
+
+class Command(BaseCommand):
+    help = 'Deliver queued mails in batches.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int, default=settings.MAIL_BATCH_SIZE,
+            help='Number of mails sent over one connection.'
+        )
+        parser.add_argument(
+            '--loop', action='store_true',
+            help='Keep polling the queue instead of exiting when empty.'
+        )
+        parser.add_argument(
+            '--interval', type=float, default=5,
+            help='Seconds to sleep between polls in --loop mode.'
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            try:
+                stats = send_queued_mail(options['batch_size'])
+            except Exception as error:
+                if not options['loop']:
+                    raise
+                self.stderr.write(f'mail batch failed: {error}')
+                stats = Counter()
+            if sum(stats.values()):
+                self.stdout.write(', '.join(
+                    f'{status}: {count}' for status, count in stats.items()))
+                # Undelivered mails mean the backend is down, wait for it.
+                if not stats[OutgoingMail.PENDING]:
+                    continue
+            if not options['loop']:
+                break
+            time.sleep(options['interval'])
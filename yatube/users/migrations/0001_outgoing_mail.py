@@ -0,0 +1,47 @@
+# Generated by Django 2.2.16 on 2026-10-19 09:46
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='OutgoingMail',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created', models.DateTimeField(auto_now_add=True, verbose_name='Дата создания')),
+                ('recipient', models.EmailField(max_length=254, verbose_name='Получатель')),
+                ('from_email', models.CharField(blank=True, max_length=254, verbose_name='Отправитель')),
+                ('subject_template_name', models.CharField(max_length=200, verbose_name='Шаблон темы')),
+                ('email_template_name', models.CharField(max_length=200, verbose_name='Шаблон письма')),
+                ('html_email_template_name', models.CharField(blank=True, max_length=200, verbose_name='HTML шаблон письма')),
+                ('context', models.TextField(default='{}', help_text='Контекст шаблонов в JSON', verbose_name='Контекст')),
+                ('status', models.CharField(choices=[('pending', 'В очереди'), ('sent', 'Отправлено'), ('failed', 'Ошибка'), ('throttled', 'Отклонено лимитом')], default='pending', max_length=16, verbose_name='Статус')),
+                ('sent', models.DateTimeField(blank=True, null=True, verbose_name='Дата отправки')),
+                ('error', models.TextField(blank=True, verbose_name='Ошибка')),
+                ('user', models.ForeignKey(blank=True, help_text='Передаётся в контекст шаблонов как user', null=True, on_delete=django.db.models.deletion.CASCADE, related_name='outgoing_mails', to=settings.AUTH_USER_MODEL, verbose_name='Пользователь')),
+            ],
+            options={
+                'verbose_name': 'outgoing mail',
+                'verbose_name_plural': 'outgoing mails',
+                'ordering': ('created',),
+            },
+        ),
+        migrations.AddIndex(
+            model_name='outgoingmail',
+            index=models.Index(fields=['status', 'created'], name='mail_status_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='outgoingmail',
+            index=models.Index(fields=['recipient', 'sent'], name='mail_recipient_sent_idx'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 2.2.16 on 2026-10-19 10:39
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0001_outgoing_mail'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='outgoingmail',
+            name='send_after',
+            field=models.DateTimeField(blank=True, help_text='Письма сверх лимита на адрес ждут конца периода', null=True, verbose_name='Отложено до'),
+        ),
+    ]
@@ -0,0 +1,21 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0002_mail_send_after'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='outgoingmail',
+            name='claim',
+            field=models.CharField(blank=True, help_text='Токен воркера, который отправляет письмо', max_length=32, verbose_name='Захват'),
+        ),
+        migrations.AlterField(
+            model_name='outgoingmail',
+            name='send_after',
+            field=models.DateTimeField(blank=True, help_text='Письма сверх лимита на адрес ждут конца периода, захваченные воркером и неотправленные — повтора', null=True, verbose_name='Отложено до'),
+        ),
+    ]
@@ -0,0 +1,101 @@
+from django.db import models
+from django.contrib.auth import get_user_model
+
+from core.models import CreatedModel
+
+
+User = get_user_model()
+
+
+class OutgoingMail(CreatedModel):
+    PENDING = 'pending'
+    SENT = 'sent'
+    FAILED = 'failed'
+    # Throttled mails are deferred now, the status is kept for old rows.
+    THROTTLED = 'throttled'
+    STATUSES = (
+        (PENDING, 'В очереди'),
+        (SENT, 'Отправлено'),
+        (FAILED, 'Ошибка'),
+        (THROTTLED, 'Отклонено лимитом'),
+    )
+
+    recipient = models.EmailField('Получатель')
+    from_email = models.CharField(
+        'Отправитель',
+        max_length=254,
+        blank=True
+    )
+    user = models.ForeignKey(
+        User,
+        blank=True,
+        null=True,
+        on_delete=models.CASCADE,
+        related_name='outgoing_mails',
+        verbose_name='Пользователь',
+        help_text='Передаётся в контекст шаблонов как user'
+    )
+    subject_template_name = models.CharField(
+        'Шаблон темы',
+        max_length=200
+    )
+    email_template_name = models.CharField(
+        'Шаблон письма',
+        max_length=200
+    )
+    html_email_template_name = models.CharField(
+        'HTML шаблон письма',
+        max_length=200,
+        blank=True
+    )
+    context = models.TextField(
+        'Контекст',
+        help_text='Контекст шаблонов в JSON',
+        default='{}'
+    )
+    status = models.CharField(
+        'Статус',
+        max_length=16,
+        choices=STATUSES,
+        default=PENDING
+    )
+    send_after = models.DateTimeField(
+        'Отложено до',
+        blank=True,
+        null=True,
+        help_text=('Письма сверх лимита на адрес ждут конца периода, '
+                   'захваченные воркером и неотправленные — повтора')
+    )
+    claim = models.CharField(
+        'Захват',
+        max_length=32,
+        blank=True,
+        help_text='Токен воркера, который отправляет письмо'
+    )
+    sent = models.DateTimeField(
+        'Дата отправки',
+        blank=True,
+        null=True
+    )
+    error = models.TextField(
+        'Ошибка',
+        blank=True
+    )
+
+    class Meta:
+        verbose_name = 'outgoing mail'
+        verbose_name_plural = 'outgoing mails'
+        ordering = ('created',)
+        indexes = (
+            models.Index(
+                fields=('status', 'created'),
+                name='mail_status_created_idx'
+            ),
+            models.Index(
+                fields=('recipient', 'sent'),
+                name='mail_recipient_sent_idx'
+            ),
+        )
+
+    def __str__(self) -> str:
+        return f'{self.recipient}: {self.subject_template_name}'
@@ -0,0 +1,159 @@
+from datetime import timedelta
+from io import StringIO
+from unittest import mock
+
+from django.test import TestCase, Client, override_settings
+from django.contrib.auth import get_user_model
+from django.core import mail
+from django.core.management import call_command
+from django.urls import reverse
+from django.utils import timezone
+
+from users.mail import claim_batch, enqueue_mail, send_queued_mail
+from users.models import OutgoingMail
+
+
+User = get_user_model()
+
+
+class MailQueueTests(TestCase):
+    def setUp(self):
+        self.guest_client = Client()
+        self.user = User.objects.create_user(
+            username='MailQueueTests',
+            email='mail-queue@example.com',
+            password='mail-queue-password'
+        )
+
+    def test_password_reset_only_enqueues_mail(self):
+        """Сброс пароля ставит письмо в очередь, не отправляя его."""
+        self.guest_client.post(
+            reverse('users:password_reset_form'),
+            data={'email': self.user.email}
+        )
+
+        self.assertEqual(len(mail.outbox), 0)
+        self.assertTrue(
+            OutgoingMail.objects.filter(
+                recipient=self.user.email,
+                user=self.user,
+                status=OutgoingMail.PENDING
+            ).exists()
+        )
+
+    def test_signup_enqueues_welcome_mail(self):
+        """Регистрация ставит приветственное письмо в очередь."""
+        form_data = {
+            'username': 'signup_mail_user',
+            'email': 'signup@example.com',
+            'password1': 'Sign-up-password-1',
+            'password2': 'Sign-up-password-1',
+        }
+
+        self.guest_client.post(reverse('users:signup'), data=form_data)
+
+        self.assertEqual(len(mail.outbox), 0)
+        self.assertTrue(
+            OutgoingMail.objects.filter(recipient=form_data['email']).exists()
+        )
+
+    def test_worker_renders_and_sends_queued_mail(self):
+        """Команда send_queued_mail отправляет письма из очереди."""
+        self.guest_client.post(
+            reverse('users:password_reset_form'),
+            data={'email': self.user.email}
+        )
+
+        call_command('send_queued_mail', stdout=StringIO())
+
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertEqual(mail.outbox[0].to, [self.user.email])
+        self.assertIn(self.user.username, mail.outbox[0].body)
+        self.assertFalse(
+            OutgoingMail.objects.filter(status=OutgoingMail.PENDING).exists()
+        )
+
+    def test_sent_mail_keeps_no_reset_token(self):
+        """После отправки токен сброса пароля не хранится в очереди."""
+        self.guest_client.post(
+            reverse('users:password_reset_form'),
+            data={'email': self.user.email}
+        )
+        self.assertIn('token', OutgoingMail.objects.get().context)
+
+        send_queued_mail()
+
+        self.assertEqual(OutgoingMail.objects.get().context, '{}')
+
+    @override_settings(MAIL_RATE_LIMIT=2)
+    def test_worker_throttles_recipient(self):
+        """Письма сверх лимита на адрес откладываются до конца периода."""
+        for _ in range(3):
+            enqueue_mail(
+                'users/emails/signup_subject.txt',
+                'users/emails/signup_email.txt',
+                {'domain': 'testserver'},
+                self.user.email,
+                user=self.user,
+            )
+
+        stats = send_queued_mail()
+
+        self.assertEqual(len(mail.outbox), 2)
+        self.assertEqual(stats[OutgoingMail.SENT], 2)
+        self.assertEqual(stats[OutgoingMail.THROTTLED], 1)
+
+        self.assertEqual(sum(send_queued_mail().values()), 0)
+        OutgoingMail.objects.filter(status=OutgoingMail.SENT).update(
+            sent=timezone.now() - timedelta(days=1))
+        OutgoingMail.objects.filter(status=OutgoingMail.PENDING).update(
+            send_after=timezone.now())
+        self.assertEqual(send_queued_mail()[OutgoingMail.SENT], 1)
+        self.assertEqual(len(mail.outbox), 3)
+
+    def enqueue(self, count):
+        for _ in range(count):
+            enqueue_mail(
+                'users/emails/signup_subject.txt',
+                'users/emails/signup_email.txt',
+                {'domain': 'testserver'},
+                self.user.email,
+                user=self.user,
+            )
+
+    def test_backend_error_keeps_delivered_mails_sent(self):
+        """Ошибка бэкенда посреди пачки не приводит к повторной отправке."""
+        self.enqueue(3)
+        send_messages = mail.get_connection().send_messages
+        calls = []
+
+        def fail_second(messages):
+            calls.append(messages)
+            if len(calls) == 2:
+                raise ConnectionError('backend is down')
+            return send_messages(messages)
+
+        with mock.patch(
+                'django.core.mail.backends.locmem.EmailBackend'
+                '.send_messages', side_effect=fail_second):
+            stats = send_queued_mail()
+
+        self.assertEqual(stats[OutgoingMail.SENT], 1)
+        self.assertEqual(stats[OutgoingMail.PENDING], 2)
+        self.assertEqual(len(mail.outbox), 1)
+        pending = OutgoingMail.objects.filter(status=OutgoingMail.PENDING)
+        self.assertEqual(
+            set(pending.values_list('error', flat=True)), {'backend is down'})
+        self.assertEqual(sum(send_queued_mail().values()), 0)
+        pending.update(send_after=timezone.now())
+        self.assertEqual(send_queued_mail()[OutgoingMail.SENT], 2)
+        self.assertEqual(len(mail.outbox), 3)
+
+    def test_claimed_mails_are_skipped(self):
+        """Письма, захваченные другим воркером, не отправляются дважды."""
+        self.enqueue(3)
+        claimed = claim_batch(2)
+        self.assertEqual(len(claimed), 2)
+        self.assertEqual(send_queued_mail()[OutgoingMail.SENT], 1)
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertEqual(claim_batch(10), [])
@@ -2,9 +2,22 @@ from django.views.generic import CreateView
 from django.urls import reverse_lazy
 
 from .forms import CreationForm
+from .mail import enqueue_mail
 
 
 class SignUp(CreateView):
     form_class = CreationForm
     success_url = reverse_lazy('posts:index')
     template_name = 'users/signup.html'
+
+    def form_valid(self, form):
+        response = super().form_valid(form)
+        if self.object.email:
+            enqueue_mail(
+                'users/emails/signup_subject.txt',
+                'users/emails/signup_email.txt',
+                {'domain': self.request.get_host()},
+                self.object.email,
+                user=self.object,
+            )
+        return response
@@ -1,4 +1,5 @@
 import os
+import sys
 
 
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
@@ -7,6 +8,8 @@ SECRET_KEY = 'mpgdk@a1a-ml0q&9%8295t5-+xxkf2)3@htm#s3n$(8=6ed(f='
 
 DEBUG = True
 
+TESTING = sys.argv[1:2] == ['test'] or 'pytest' in sys.modules
+
 INSTALLED_APPS = [
     'django.contrib.admin',
     'django.contrib.auth',
@@ -15,9 +18,9 @@ INSTALLED_APPS = [
     'django.contrib.messages',
     'django.contrib.staticfiles',
 
-    'posts',
+    'posts.apps.PostsConfig',
     'users',
-    'core',
+    'core.apps.CoreConfig',
 
     'sorl.thumbnail',
     'debug_toolbar',
@@ -25,6 +28,9 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    'core.middleware.CompressionMiddleware',
+    'django.middleware.http.ConditionalGetMiddleware',
+    'core.middleware.StickyPrimaryMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -38,12 +44,30 @@ ROOT_URLCONF = 'yatube.urls'
 
 TEMPLATES_DIR = os.path.join(BASE_DIR, 'templates')
 
+# In the production mode compiled templates are kept in memory
+# and warmed up when the WSGI application starts.
+TEMPLATE_MODE = os.getenv(
+    'TEMPLATE_MODE', 'debug' if DEBUG else 'production')
+TEMPLATE_LOADERS = [
+    'django.template.loaders.filesystem.Loader',
+    'django.template.loaders.app_directories.Loader',
+]
+if TEMPLATE_MODE == 'production':
+    TEMPLATE_LOADERS = [
+        ('django.template.loaders.cached.Loader', TEMPLATE_LOADERS),
+    ]
+# about and error pages are rendered once per process and served from memory.
+PRERENDER_PAGES = TEMPLATE_MODE == 'production'
+# Post pages are cached per post with the user parts filled in per request.
+POST_DETAIL_CACHE = TEMPLATE_MODE == 'production'
+POST_DETAIL_CACHE_TIMEOUT = 60 * 10
+
 TEMPLATES = [
     {
         'BACKEND': 'django.template.backends.django.DjangoTemplates',
         'DIRS': [TEMPLATES_DIR],
-        'APP_DIRS': True,
         'OPTIONS': {
+            'loaders': TEMPLATE_LOADERS,
             'context_processors': [
                 'django.template.context_processors.debug',
                 'django.template.context_processors.request',
@@ -55,15 +79,58 @@ TEMPLATES = [
     },
 ]
 
+# app_directories.Loader is listed in TEMPLATE_LOADERS explicitly.
+SILENCED_SYSTEM_CHECKS = ['debug_toolbar.W006']
+
 WSGI_APPLICATION = 'yatube.wsgi.application'
 
+# PRAGMAs applied to every new SQLite connection. 'production' lets
+# readers and the writer work concurrently (WAL) and waits for the lock
+# instead of failing with "database is locked".
+SQLITE_PROFILES = {
+    'default': {},
+    'production': {
+        'journal_mode': 'WAL',
+        'synchronous': 'NORMAL',
+        'busy_timeout': 5000,
+        'mmap_size': 256 * 1024 * 1024,
+        'cache_size': -64 * 1024,
+        'temp_store': 'MEMORY',
+    },
+}
+SQLITE_PROFILE = os.getenv(
+    'SQLITE_PROFILE', 'default' if TESTING else 'production')
+SQLITE_PRAGMAS = SQLITE_PROFILES[SQLITE_PROFILE]
+
 DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': os.path.join(BASE_DIR, 'db.sqlite3'),
+        'CONN_MAX_AGE': int(os.getenv(
+            'CONN_MAX_AGE', 0 if SQLITE_PROFILE == 'default' else 600)),
     }
 }
 
+# Read only copies of the primary database, e.g. DATABASE_REPLICAS=replica.
+# Locally they are SQLite files updated by the replicate_sqlite command.
+DATABASE_REPLICAS = [
+    alias for alias in os.getenv('DATABASE_REPLICAS', '').split(',') if alias
+]
+for alias in DATABASE_REPLICAS:
+    DATABASES[alias] = {
+        **DATABASES['default'],
+        'NAME': os.path.join(BASE_DIR, 'db_{}.sqlite3'.format(alias)),
+        'TEST': {'MIRROR': 'default'},
+    }
+DATABASE_ROUTERS = ['core.routers.PrimaryReplicaRouter']
+# Visitors read from the primary for this long after their last write.
+REPLICA_STICKY_SECONDS = 10
+REPLICA_STICKY_COOKIE = 'use_primary'
+
+# core.db.retry_on_locked: attempts after the first one and the first delay.
+DB_WRITE_RETRIES = 3
+DB_WRITE_RETRY_DELAY = 0.05
+
 AUTH_PASSWORD_VALIDATORS = [
     {
         'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator',
@@ -79,6 +146,55 @@ AUTH_PASSWORD_VALIDATORS = [
     },
 ]
 
+# Algorithms of every profile keep the older hashes verifiable,
+# they are upgraded to the first hasher on the next successful login.
+PASSWORD_HASHING_PROFILES = {
+    'pbkdf2': [
+        'core.hashers.PBKDF2PasswordHasher',
+        'core.hashers.Argon2PasswordHasher',
+        'core.hashers.BCryptSHA256PasswordHasher',
+    ],
+    'argon2': [
+        'core.hashers.Argon2PasswordHasher',
+        'core.hashers.PBKDF2PasswordHasher',
+        'core.hashers.BCryptSHA256PasswordHasher',
+    ],
+    'bcrypt': [
+        'core.hashers.BCryptSHA256PasswordHasher',
+        'core.hashers.PBKDF2PasswordHasher',
+        'core.hashers.Argon2PasswordHasher',
+    ],
+    'fast': [
+        'django.contrib.auth.hashers.MD5PasswordHasher',
+        'core.hashers.PBKDF2PasswordHasher',
+    ],
+}
+PASSWORD_HASHING_PROFILE = os.getenv(
+    'PASSWORD_HASHING_PROFILE', 'fast' if TESTING else 'pbkdf2')
+PASSWORD_HASHERS = PASSWORD_HASHING_PROFILES[PASSWORD_HASHING_PROFILE]
+
+PBKDF2_ITERATIONS = 150000
+# 19 MiB of memory, 2 iterations. Django 2.2 hashes with argon2i
+# (argon2.low_level.Type.I), not the argon2id variant.
+ARGON2_TIME_COST = 2
+ARGON2_MEMORY_COST = 19456
+ARGON2_PARALLELISM = 1
+BCRYPT_ROUNDS = 12
+
+AUTHENTICATION_BACKENDS = [
+    'core.backends.CachedModelBackend',
+]
+
+USER_CACHE_TIMEOUT = 60 * 15
+
+SESSION_ENGINES = {
+    'db': 'django.contrib.sessions.backends.db',
+    'cached_db': 'django.contrib.sessions.backends.cached_db',
+    'signed_cookies': 'django.contrib.sessions.backends.signed_cookies',
+}
+SESSION_MODE = 'cached_db'
+SESSION_ENGINE = SESSION_ENGINES[SESSION_MODE]
+
 LANGUAGE_CODE = 'ru'
 
 TIME_ZONE = 'UTC'
@@ -93,7 +209,72 @@ STATIC_URL = '/static/'
 
 STATICFILES_DIRS = (os.path.join(BASE_DIR, 'static'),)
 
+STATIC_ROOT = os.path.join(BASE_DIR, 'collected_static')
+
+# collectstatic writes hashed names with .gz/.br copies next to them.
+STATICFILES_STORAGE = (
+    'django.contrib.staticfiles.storage.StaticFilesStorage' if DEBUG
+    else 'core.storage.CompressedManifestStaticFilesStorage'
+)
+STATIC_COMPRESS_EXTENSIONS = ('.css', '.js', '.svg', '.html', '.txt', '.map')
+
+# Responses smaller than COMPRESSION_MIN_SIZE bytes are sent uncompressed.
+# Brotli is used when the brotli package is installed.
+COMPRESSION_MIN_SIZE = 500
+COMPRESSION_BROTLI = True
+COMPRESSION_GZIP_LEVEL = 6
+COMPRESSION_BROTLI_QUALITY = 5
+COMPRESSION_SKIP_CONTENT_TYPES = ('image/', 'video/', 'audio/')
+
 POSTS_PER_PAGE = 10
+# Upper bound for the ?limit= page size override.
+POSTS_MAX_PER_PAGE = 100
+# Fetch ids of the next page together with the current one.
+POSTS_PREFETCH_NEXT_PAGE = True
+POSTS_PREFETCH_TIMEOUT = 60
+# Browser/proxy cache lifetime of the infinite scroll fragments.
+POSTS_FRAGMENT_MAX_AGE = 20
+GROUPS_PER_PAGE = 20
+# Unfiltered lists above this size are paginated by the estimated count.
+ESTIMATED_COUNT_THRESHOLD = 10000
+
+GROUP_CACHE_TIMEOUT = 60 * 15
+
+# core.cache.cache_page: an expired page is served for CACHE_STALE_SECONDS
+# while one request refreshes it under a lock held for at most
+# CACHE_LOCK_TIMEOUT, requests for uncached pages wait CACHE_LOCK_WAIT.
+CACHE_STALE_SECONDS = 60
+CACHE_LOCK_TIMEOUT = 30
+CACHE_LOCK_WAIT = 5
+CACHE_LOCK_POLL = 0.05
+INDEX_CACHE_FRESH = 20
+INDEX_CACHE_STALE = 60
+
+MODERATION_CHUNK_SIZE = 500
+# A running job without progress for this long is taken over by another
+# worker, its previous one is considered dead.
+MODERATION_JOB_TIMEOUT = 10 * 60
+FEED_REBUILD_CHUNK_SIZE = 500
+# Post views are counted in memory and written every
+# POST_VIEWS_FLUSH_INTERVAL seconds or once POST_VIEWS_FLUSH_SIZE posts
+# have pending views, a crashed worker loses at most one interval.
+POST_VIEWS_FLUSH_INTERVAL = 10
+POST_VIEWS_FLUSH_SIZE = 500
+POST_VIEWS_BACKGROUND_FLUSH = not TESTING
+POST_VIEWS_CACHE_TIMEOUT = 30
+# Reaction counts of a post are spread over this many rows.
+REACTION_COUNTER_SHARDS = 8
+# Cached sums are dropped on every reaction, the timeout bounds a sum
+# read by a request racing with the reaction.
+REACTION_COUNTS_CACHE_TIMEOUT = 60
+# Blocked and muted authors of a user are cached until they change.
+BLOCK_LISTS_CACHE_TIMEOUT = 60 * 60
+# Longer lists of hidden authors are excluded from the feeds by a subquery.
+HIDDEN_AUTHORS_INLINE_LIMIT = 500
+# Feed thumbnails rendered by one pass of the render_thumbnails worker.
+THUMBNAIL_BATCH_SIZE = 50
+# Threads reading the stored images when their metadata is backfilled.
+IMAGE_META_WORKERS = 4
 
 LOGIN_URL = 'users:login'
 LOGIN_REDIRECT_URL = 'posts:index'
@@ -101,6 +282,14 @@ LOGIN_REDIRECT_URL = 'posts:index'
 EMAIL_BACKEND = 'django.core.mail.backends.filebased.EmailBackend'
 EMAIL_FILE_PATH = os.path.join(BASE_DIR, 'sent_mails')
 
+MAIL_BATCH_SIZE = 100
+MAIL_RATE_LIMIT = 5
+MAIL_RATE_PERIOD = 60 * 60
+# A worker claims its batch for MAIL_CLAIM_TIMEOUT seconds, mails it
+# couldn't deliver are retried after MAIL_RETRY_DELAY seconds.
+MAIL_CLAIM_TIMEOUT = 60 * 10
+MAIL_RETRY_DELAY = 60 * 5
+
 ALLOWED_HOSTS = [
     'localhost',
     '127.0.0.1',
@@ -1,7 +1,24 @@
 import os
 
+from django.conf import settings
 from django.core.wsgi import get_wsgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'yatube.settings')
 
 application = get_wsgi_application()
+
+
+def warm_up():
+    """Prepare in-process caches before the first request."""
+    from core.prerender import prerender_pages
+    from core.reverse import build_url_templates
+    from core.templates import warm_up_templates
+
+    build_url_templates()
+    if settings.TEMPLATE_MODE == 'production':
+        warm_up_templates()
+    if settings.PRERENDER_PAGES:
+        prerender_pages()
+
+
+warm_up()